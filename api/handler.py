@@ -1,10 +1,15 @@
-from app import app
-from flask import Flask
-import os
-
-# Vercel nécessite une variable application
-application = app
-
-if __name__ == "__main__":
-    port = int(os.environ.get("PORT", 8080))
+import os
+
+# Fonction serverless (maxDuration 60 s) : données chargées après la première
+# requête, /api/health et /login répondent sans attendre pandas ni le classeur
+os.environ.setdefault('STARTUP_MODE', 'lazy')
+
+from app import app
+from flask import Flask
+
+# Vercel nécessite une variable application
+application = app
+
+if __name__ == "__main__":
+    port = int(os.environ.get("PORT", 8080))
     application.run(host="0.0.0.0", port=port)
\ No newline at end of file
@@ -1,220 +1,971 @@
-#!/usr/bin/env python3
-"""
-Urban AI - Application Flask
-"""
-
-import os
-import sys
-from pathlib import Path
-
-# ==================== CONFIGURATION RENDER ====================
-IS_RENDER = 'RENDER' in os.environ
-
-if IS_RENDER:
-    BASE_DIR = Path('/opt/render/project/src')
-    print("🚀 Mode Render détecté")
-else:
-    BASE_DIR = Path(__file__).parent
-
-# Ajouter le chemin au sys.path
-sys.path.insert(0, str(BASE_DIR))
-
-# ==================== IMPORTS ====================
-import secrets
-from flask import Flask, jsonify, request, send_from_directory, render_template, session, redirect, url_for
-from flask_cors import CORS
-from werkzeug.utils import secure_filename
-import logging
-import hashlib
-from functools import wraps
-import pandas as pd
-import numpy as np
-
-# ==================== CONFIGURATION ====================
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-
-app = Flask(__name__, 
-            static_folder=str(BASE_DIR / 'static'),
-            template_folder=str(BASE_DIR / 'templates'))
-
-# Configuration
-app.config.update(
-    SECRET_KEY=os.environ.get('SECRET_KEY', secrets.token_hex(32)),
-    PASSWORD_HASH=os.environ.get('PASSWORD_HASH', 
-                                 hashlib.sha256('urbankit@1001a'.encode()).hexdigest()),
-    MAX_CONTENT_LENGTH=16 * 1024 * 1024,
-    UPLOAD_FOLDER=str(BASE_DIR / 'data' / 'uploads'),
-    EXCEL_PATH=str(BASE_DIR / 'data' / 'indicateurs_urbains.xlsx')
-)
-
-CORS(app)
-
-# ==================== AUTHENTIFICATION ====================
-def check_password(password):
-    """Vérifie le mot de passe"""
-    input_hash = hashlib.sha256(password.encode()).hexdigest()
-    return input_hash == app.config['PASSWORD_HASH']
-
-def login_required(f):
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        if not session.get('logged_in'):
-            if request.path.startswith('/api/'):
-                return jsonify({'error': 'Authentication required'}), 401
-            return redirect(url_for('login', next=request.url))
-        return f(*args, **kwargs)
-    return decorated_function
-
-@app.route('/login', methods=['GET', 'POST'])
-def login():
-    if request.method == 'POST':
-        password = request.form.get('password', '')
-        if check_password(password):
-            session['logged_in'] = True
-            session.permanent = True
-            next_page = request.args.get('next', url_for('index'))
-            return redirect(next_page)
-        return render_template('login.html', error='Mot de passe incorrect')
-    return render_template('login.html')
-
-@app.route('/logout')
-def logout():
-    session.clear()
-    return redirect(url_for('login'))
-
-# ==================== GESTION DES DONNÉES ====================
-class DataManager:
-    def __init__(self, excel_path):
-        self.excel_path = excel_path
-        self.df = self.load_data()
-    
-    def load_data(self):
-        """Charge les données depuis Excel"""
-        try:
-            if os.path.exists(self.excel_path):
-                df = pd.read_excel(self.excel_path)
-                logger.info(f"✅ Données chargées: {len(df)} lignes")
-                return df
-            else:
-                logger.warning("Fichier Excel non trouvé, création de données d'exemple")
-                return self.create_sample_data()
-        except Exception as e:
-            logger.error(f"Erreur chargement: {e}")
-            return self.create_sample_data()
-    
-    def create_sample_data(self):
-        """Crée des données d'exemple"""
-        data = {
-            'Ville': ['Douala', 'Douala', 'Yaoundé', 'Yaoundé'],
-            'Nom de la Commune': ['Douala 1', 'Douala 2', 'Yaoundé 1', 'Yaoundé 2'],
-            'tronçon de voirie': ['Boulevard 1', 'Rue 2', 'Avenue 3', 'Boulevard 4'],
-            'linéaire de voirie(ml)': [2500, 1200, 3200, 1800],
-            'Nom de la poche du quartier de taudis': ['Quartier A', 'Quartier B', 'Quartier C', 'Quartier D'],
-            'superficie de la poche du quartier de taudis': [12500, 8500, 9800, 7600],
-            'présence du nid de poule': ['Oui', 'Non', 'Oui', 'Non'],
-            'classe de voirie': ['Primaire', 'Secondaire', 'Primaire', 'Secondaire'],
-            'Nombre de point lumineux sur le tronçon': [45, 28, 62, 35]
-        }
-        return pd.DataFrame(data)
-    
-    def get_villes(self):
-        """Liste des villes"""
-        return sorted(self.df['Ville'].dropna().unique().tolist())
-    
-    def get_communes(self, ville):
-        """Communes pour une ville"""
-        return sorted(self.df[self.df['Ville'] == ville]['Nom de la Commune'].unique().tolist())
-
-# Initialisation
-data_manager = DataManager(app.config['EXCEL_PATH'])
-
-# ==================== ROUTES ====================
-@app.route('/')
-@login_required
-def index():
-    """Page d'accueil"""
-    return render_template('index.html')
-
-@app.route('/api/villes', methods=['GET'])
-@login_required
-def get_villes():
-    """Liste des villes"""
-    try:
-        villes = data_manager.get_villes()
-        return jsonify(villes)
-    except Exception as e:
-        logger.error(f"Erreur: {e}")
-        return jsonify(['Douala', 'Yaoundé'])
-
-@app.route('/api/communes', methods=['GET'])
-@login_required
-def get_communes():
-    """Communes pour une ville"""
-    ville = request.args.get('ville')
-    if not ville:
-        return jsonify({'error': 'Ville requise'}), 400
-    communes = data_manager.get_communes(ville)
-    return jsonify(communes)
-
-@app.route('/api/health', methods=['GET'])
-def health():
-    """Health check"""
-    return jsonify({
-        'status': 'healthy',
-        'render': IS_RENDER,
-        'data_loaded': len(data_manager.df) > 0
-    })
-
-@app.route('/api/upload/image', methods=['POST'])
-@login_required
-def upload_image():
-    """Upload d'image"""
-    if 'file' not in request.files:
-        return jsonify({'error': 'Aucun fichier'}), 400
-    
-    file = request.files['file']
-    image_type = request.form.get('type', 'troncons')
-    
-    if file.filename == '':
-        return jsonify({'error': 'Aucun fichier sélectionné'}), 400
-    
-    # Créer le dossier s'il n'existe pas
-    upload_dir = Path(app.config['UPLOAD_FOLDER']) / image_type
-    upload_dir.mkdir(parents=True, exist_ok=True)
-    
-    filename = secure_filename(file.filename)
-    filepath = upload_dir / filename
-    
-    try:
-        file.save(str(filepath))
-        return jsonify({
-            'message': 'Image uploadée',
-            'filename': filename,
-            'url': f'/uploads/{image_type}/{filename}'
-        })
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
-@app.route('/uploads/<image_type>/<filename>')
-def serve_uploaded_image(image_type, filename):
-    """Sert les images uploadées"""
-    if image_type not in ['troncons', 'taudis']:
-        return jsonify({'error': 'Type invalide'}), 400
-    
-    upload_dir = Path(app.config['UPLOAD_FOLDER']) / image_type
-    return send_from_directory(str(upload_dir), filename)
-
-# ==================== DÉMARRAGE ====================
-if __name__ == '__main__':
-    port = int(os.environ.get('PORT', 10000))
-    
-    print("\n" + "="*50)
-    print("🏙️  URBAN AI")
-    print("="*50)
-    print(f"📁 Base: {BASE_DIR}")
-    print(f"🔗 Port: {port}")
-    print(f"🌐 URL: http://localhost:{port}")
-    print("="*50)
-    
+#!/usr/bin/env python3
+"""
+Urban AI - Application Flask
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# ==================== CONFIGURATION RENDER ====================
+IS_RENDER = 'RENDER' in os.environ
+
+if IS_RENDER:
+    BASE_DIR = Path('/opt/render/project/src')
+    print("🚀 Mode Render détecté")
+else:
+    BASE_DIR = Path(__file__).parent
+
+# Ajouter le chemin au sys.path
+sys.path.insert(0, str(BASE_DIR))
+
+# Profil du démarrage à froid : python app.py --profile-startup [--mode lazy] [--budget 10]
+if __name__ == '__main__' and '--profile-startup' in sys.argv:
+    from startup_profile import main as profile_startup
+    sys.exit(profile_startup([arg for arg in sys.argv[1:] if arg != '--profile-startup']))
+
+# ==================== IMPORTS ====================
+import secrets
+from flask import Flask, Response, g, jsonify, request, send_file, send_from_directory, render_template, session, redirect, url_for
+from flask_cors import CORS
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.utils import secure_filename
+import logging
+import concurrent.futures
+import hashlib
+import io
+import json
+import threading
+import time
+import uuid
+from functools import wraps
+# pandas, numpy et les modules qui en dépendent (data_index, data_cache,
+# models.*) sont importés au premier chargement des données
+from models.registry import registry
+from recommendation_store import RecommendationStore
+from image_variants import (FORMATS, choose_format, create_upload_variants_async, get_variant,
+                            image_version, source_path)
+from upload_store import FileTooLargeError, StreamingUploadRequest, UploadStore, format_size
+from upload_index import UploadIndex, rebuild as rebuild_upload_index
+from metrics import HTTP_DURATION, HTTP_REQUESTS, metrics
+from logging_config import ACCESS_LOGGER, set_request_id, setup_logging
+from startup_profile import phase
+
+# ==================== CONFIGURATION ====================
+# Lignes JSON écrites par un thread de fond (LOG_FILE : fichier en plus de la console)
+setup_logging(log_file=os.environ.get('LOG_FILE') or None)
+logger = logging.getLogger(__name__)
+access_logger = logging.getLogger(ACCESS_LOGGER)
+
+app = Flask(__name__, 
+            static_folder=str(BASE_DIR / 'static'),
+            template_folder=str(BASE_DIR / 'templates'))
+app.request_class = StreamingUploadRequest
+
+# Configuration
+app.config.update(
+    SECRET_KEY=os.environ.get('SECRET_KEY', secrets.token_hex(32)),
+    PASSWORD_HASH=os.environ.get('PASSWORD_HASH', 
+                                 hashlib.sha256('urbankit@1001a'.encode()).hexdigest()),
+    MAX_CONTENT_LENGTH=16 * 1024 * 1024,
+    # /api/upload/image : taille par fichier et par requête (lot de photos)
+    UPLOAD_MAX_FILE_SIZE=int(os.environ.get('UPLOAD_MAX_FILE_SIZE', 16 * 1024 * 1024)),
+    UPLOAD_MAX_REQUEST_SIZE=int(os.environ.get('UPLOAD_MAX_REQUEST_SIZE', 1024 * 1024 * 1024)),
+    UPLOAD_FOLDER=os.environ.get('UPLOAD_FOLDER', str(BASE_DIR / 'data' / 'uploads')),
+    # Index SQLite des images uploadées (galeries, analyses)
+    UPLOAD_INDEX_PATH=os.environ.get('UPLOAD_INDEX_PATH', str(BASE_DIR / 'data' / 'upload_index.sqlite3')),
+    # Durée (s) de mise en cache navigateur des images et de leurs variantes
+    IMAGE_CACHE_MAX_AGE=int(os.environ.get('IMAGE_CACHE_MAX_AGE', 7 * 24 * 3600)),
+    EXCEL_PATH=os.environ.get('EXCEL_PATH', str(BASE_DIR / 'data' / 'indicateurs_urbains.xlsx')),
+    DEFECT_MODEL_PATH=str(BASE_DIR / 'models' / 'defect_detector.h5'),
+    MAINTENANCE_MODEL_PATH=os.environ.get('MAINTENANCE_MODEL_PATH', str(BASE_DIR / 'models' / 'maintenance_model.pkl')),
+    # File d'inférence à micro-lots de /api/ai/analyze-image
+    AI_BATCH_SIZE=int(os.environ.get('AI_BATCH_SIZE', 16)),
+    AI_BATCH_WAIT_MS=float(os.environ.get('AI_BATCH_WAIT_MS', 10)),
+    AI_QUEUE_DEPTH=int(os.environ.get('AI_QUEUE_DEPTH', 256)),
+    AI_REQUEST_TIMEOUT=float(os.environ.get('AI_REQUEST_TIMEOUT', 30)),
+    # Cache des résultats d'analyse (LRU mémoire + disque, vide = pas de disque)
+    AI_CACHE_SIZE=int(os.environ.get('AI_CACHE_SIZE', 2048)),
+    AI_CACHE_DIR=os.environ.get('AI_CACHE_DIR', str(BASE_DIR / 'data' / 'analysis_cache')),
+    # Intervalle (s) de surveillance du fichier Excel, 0 = pas de rechargement à chaud
+    DATA_RELOAD_INTERVAL=float(os.environ.get('DATA_RELOAD_INTERVAL', 30)),
+    # Intervalle (s) de vérification des versions pour les recommandations par ville
+    RECOMMENDATIONS_CHECK_INTERVAL=float(os.environ.get('RECOMMENDATIONS_CHECK_INTERVAL', 30)),
+    # Jeton exigé par /api/metrics (Authorization: Bearer), vide = accès libre
+    METRICS_TOKEN=os.environ.get('METRICS_TOKEN', ''),
+    # Démarrage : 'eager' (données chargées à l'import), 'background' (chargées
+    # dans un thread dès l'import) ou 'lazy' (à la première requête)
+    STARTUP_MODE=os.environ.get('STARTUP_MODE', 'eager')
+)
+
+CORS(app)
+
+# Réception en flux des uploads, dédupliqués par contenu
+app.extensions['upload_store'] = UploadStore(app.config['UPLOAD_FOLDER'],
+                                             max_file_size=app.config['UPLOAD_MAX_FILE_SIZE'])
+upload_index = UploadIndex(app.config['UPLOAD_INDEX_PATH'])
+
+# ==================== MÉTRIQUES ET JOURNAL D'ACCÈS ====================
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    # Identifiant repris du proxy (X-Request-ID) ou généré, présent dans chaque ligne de log
+    g.request_id = request.headers.get('X-Request-ID', '')[:64] or uuid.uuid4().hex[:16]
+    set_request_id(g.request_id)
+
+@app.after_request
+def record_request_metrics(response):
+    start = g.pop('request_start', None)
+    if start is not None:
+        duration = time.perf_counter() - start
+        # Gabarit de la route (et non l'URL) : nombre de séries borné
+        route = request.url_rule.rule if request.url_rule else 'inconnue'
+        metrics.observe(HTTP_DURATION, duration, method=request.method, route=route)
+        metrics.inc(HTTP_REQUESTS, method=request.method, route=route, status=str(response.status_code))
+        metrics.maybe_flush()
+        
+        # Journal d'accès échantillonné au-delà de ACCESS_LOG_RATE lignes/s, erreurs serveur gardées
+        access_logger.log(logging.WARNING if response.status_code >= 500 else logging.INFO,
+                          f"{request.method} {request.path} {response.status_code}",
+                          extra={'method': request.method, 'route': route,
+                                 'status': response.status_code,
+                                 'duration_ms': round(duration * 1e3, 2)})
+        response.headers['X-Request-ID'] = g.request_id
+    return response
+
+@app.teardown_request
+def clear_request_id(exc):
+    set_request_id(None)
+
+# ==================== AUTHENTIFICATION ====================
+def check_password(password):
+    """Vérifie le mot de passe"""
+    input_hash = hashlib.sha256(password.encode()).hexdigest()
+    return input_hash == app.config['PASSWORD_HASH']
+
+def login_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not session.get('logged_in'):
+            if request.path.startswith('/api/'):
+                return jsonify({'error': 'Authentication required'}), 401
+            return redirect(url_for('login', next=request.url))
+        return f(*args, **kwargs)
+    return decorated_function
+
+@app.route('/login', methods=['GET', 'POST'])
+def login():
+    if request.method == 'POST':
+        password = request.form.get('password', '')
+        if check_password(password):
+            session['logged_in'] = True
+            session.permanent = True
+            next_page = request.args.get('next', url_for('index'))
+            return redirect(next_page)
+        return render_template('login.html', error='Mot de passe incorrect')
+    return render_template('login.html')
+
+@app.route('/logout')
+def logout():
+    session.clear()
+    return redirect(url_for('login'))
+
+# ==================== GESTION DES DONNÉES ====================
+class DataManager:
+    def __init__(self, excel_path, reload_interval=0, lazy=False):
+        self.excel_path = excel_path
+        self.reload_interval = reload_interval
+        self._load_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._watcher_lock = threading.Lock()
+        self._watcher_pid = None
+        self._failed_signature = None
+        self._snapshot = None
+        
+        # lazy=True : premier chargement à la première lecture des données
+        if not lazy:
+            self.ensure_loaded()
+    
+    @property
+    def snapshot(self):
+        """Instantané courant (DataFrame, index et signature cohérents)"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self.ensure_loaded()
+        return snapshot
+    
+    @property
+    def df(self):
+        return self.snapshot.df
+    
+    @property
+    def index(self):
+        return self.snapshot.index
+    
+    @property
+    def features(self):
+        """Matrice de features des modèles IA, construite au chargement"""
+        return self.snapshot.features
+    
+    def is_loaded(self):
+        """Indique si le classeur est chargé, sans déclencher le chargement"""
+        return self._snapshot is not None
+    
+    def ensure_loaded(self):
+        """Premier chargement du classeur ; les appels concurrents attendent le même"""
+        with self._load_lock:
+            if self._snapshot is None:
+                with phase('donnees'):
+                    signature = self.file_signature()
+                    self._snapshot = self.build_snapshot(self.load_data(), signature)
+        return self._snapshot
+    
+    @staticmethod
+    def build_snapshot(df, signature):
+        """Instantané (index et features construits) d'un DataFrame normalisé"""
+        from data_index import DataIndex, DataSnapshot
+        from models.features import FeatureMatrix
+        return DataSnapshot(df, DataIndex(df), FeatureMatrix(df), signature)
+    
+    def read_workbook(self):
+        """Lit le classeur (via le cache de colonnes) et normalise ses colonnes"""
+        from data_cache import read_excel_cached
+        from data_index import normalize_columns
+        return normalize_columns(read_excel_cached(self.excel_path))
+    
+    @metrics.timed('load_data')
+    def load_data(self):
+        """Charge les données depuis Excel"""
+        try:
+            if os.path.exists(self.excel_path):
+                df = self.read_workbook()
+                logger.info(f"✅ Données chargées: {len(df)} lignes")
+                return df
+            else:
+                logger.warning("Fichier Excel non trouvé, création de données d'exemple")
+                return self.create_sample_data()
+        except Exception as e:
+            logger.error(f"Erreur chargement: {e}")
+            return self.create_sample_data()
+    
+    def create_sample_data(self):
+        """Crée des données d'exemple"""
+        data = {
+            'Ville': ['Douala', 'Douala', 'Yaoundé', 'Yaoundé'],
+            'Nom de la Commune': ['Douala 1', 'Douala 2', 'Yaoundé 1', 'Yaoundé 2'],
+            'tronçon de voirie': ['Boulevard 1', 'Rue 2', 'Avenue 3', 'Boulevard 4'],
+            'linéaire de voirie(ml)': [2500, 1200, 3200, 1800],
+            'Nom de la poche du quartier de taudis': ['Quartier A', 'Quartier B', 'Quartier C', 'Quartier D'],
+            'superficie de la poche du quartier de taudis': [12500, 8500, 9800, 7600],
+            'présence du nid de poule': ['Oui', 'Non', 'Oui', 'Non'],
+            'classe de voirie': ['Primaire', 'Secondaire', 'Primaire', 'Secondaire'],
+            'Nombre de point lumineux sur le tronçon': [45, 28, 62, 35]
+        }
+        import pandas as pd
+        return pd.DataFrame(data)
+    
+    # ---------- Rechargement à chaud ----------
+    def file_signature(self):
+        """Signature peu coûteuse du fichier Excel (mtime, taille)"""
+        try:
+            stat = os.stat(self.excel_path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+    
+    def reload_if_changed(self):
+        """Recharge le classeur s'il a changé, puis remplace l'instantané d'un bloc"""
+        # Pas encore chargé : le premier chargement lira la dernière version
+        if self._snapshot is None:
+            return False
+        
+        signature = self.file_signature()
+        if signature is None or signature in (self._snapshot.signature, self._failed_signature):
+            return False
+        
+        # Un seul rechargement à la fois, sans jamais bloquer l'appelant
+        if not self._reload_lock.acquire(blocking=False):
+            return False
+        
+        try:
+            with metrics.timer(operation='reload_data'):
+                df = self.read_workbook()
+                snapshot = self.build_snapshot(df, signature)
+            
+            # Fichier modifié pendant la lecture (copie en cours) : on réessaiera
+            if self.file_signature() != signature:
+                logger.info("Fichier Excel en cours d'écriture, rechargement reporté")
+                return False
+            
+            self._snapshot = snapshot
+            logger.info(f"🔄 Données rechargées: {len(df)} lignes")
+            link_upload_index(df)
+            return True
+        except Exception as e:
+            self._failed_signature = signature
+            logger.error(f"Erreur rechargement: {e}")
+            return False
+        finally:
+            self._reload_lock.release()
+    
+    def ensure_watcher(self):
+        """Démarre le thread de surveillance dans le processus courant"""
+        # Les threads ne survivent pas au fork des workers gunicorn : on
+        # (re)démarre la surveillance dans chaque processus
+        if not self.reload_interval or self._watcher_pid == os.getpid():
+            return
+        
+        with self._watcher_lock:
+            if self._watcher_pid == os.getpid():
+                return
+            self._watcher_pid = os.getpid()
+            threading.Thread(target=self._watch, name='excel-watcher', daemon=True).start()
+    
+    def _watch(self):
+        while True:
+            time.sleep(self.reload_interval)
+            try:
+                self.reload_if_changed()
+            except Exception as e:
+                logger.error(f"Erreur surveillance Excel: {e}")
+    
+    def get_villes(self):
+        """Liste des villes"""
+        return self.index.get_villes()
+    
+    def get_communes(self, ville):
+        """Communes pour une ville"""
+        return self.index.get_communes(ville)
+    
+    def get_troncons(self, commune):
+        """Tronçons de voirie d'une commune"""
+        return self.index.get_troncons(commune)
+    
+    def get_taudis(self, commune):
+        """Quartiers de taudis d'une commune"""
+        return self.index.get_taudis(commune)
+    
+    def get_indicateurs_json(self, commune):
+        """Réponse JSON (corps, ETag) des indicateurs d'une commune"""
+        return self.index.get_indicateurs_json(commune)
+
+# Initialisation (différée hors du mode 'eager', voir DÉMARRAGE À FROID)
+STARTUP_MODES = ('eager', 'background', 'lazy')
+if app.config['STARTUP_MODE'] not in STARTUP_MODES:
+    logger.warning(f"STARTUP_MODE inconnu: {app.config['STARTUP_MODE']}, mode 'eager' utilisé")
+    app.config['STARTUP_MODE'] = 'eager'
+
+data_manager = DataManager(app.config['EXCEL_PATH'],
+                           reload_interval=app.config['DATA_RELOAD_INTERVAL'],
+                           lazy=app.config['STARTUP_MODE'] != 'eager')
+
+@app.before_request
+def start_data_watcher():
+    data_manager.ensure_watcher()
+
+# ==================== INDEX DES IMAGES ====================
+def link_upload_index(df):
+    """Rattache les images de l'index aux villes, communes et tronçons du classeur"""
+    try:
+        upload_index.link_workbook(df)
+    except Exception as e:
+        logger.error(f"Erreur rattachement de l'index des images: {e}")
+
+def sync_upload_index():
+    """Construit l'index des images s'il n'existe pas, sinon le rattache au classeur"""
+    try:
+        with phase('index_images'):
+            if not upload_index.db_path.exists():
+                rebuild_upload_index(upload_index, app.config['UPLOAD_FOLDER'])
+            link_upload_index(data_manager.df)
+    except Exception as e:
+        logger.error(f"Erreur construction de l'index des images: {e}")
+
+# ==================== MODÈLES IA ====================
+# Les modules IA (TensorFlow, OpenCV) ne sont importés qu'à la première
+# utilisation, pour que `import app` reste rapide
+_ai_components = {}
+_ai_lock = threading.Lock()
+
+def get_defect_detector():
+    """Détecteur de défauts de voirie, construit à la première utilisation"""
+    detector = _ai_components.get('defect_detector')
+    if detector is None:
+        with _ai_lock:
+            detector = _ai_components.get('defect_detector')
+            if detector is None:
+                from models.image_analysis import RoadDefectDetector
+                from models.result_cache import AnalysisCache
+                cache = AnalysisCache(max_entries=app.config['AI_CACHE_SIZE'],
+                                      disk_dir=app.config['AI_CACHE_DIR'] or None)
+                detector = RoadDefectDetector(app.config['DEFECT_MODEL_PATH'], cache=cache)
+                _ai_components['defect_detector'] = detector
+    return detector
+
+def get_inference_queue():
+    """File d'inférence partagée par les requêtes d'analyse d'image"""
+    inference_queue = _ai_components.get('inference_queue')
+    if inference_queue is None:
+        with _ai_lock:
+            inference_queue = _ai_components.get('inference_queue')
+            if inference_queue is None:
+                from models.inference_queue import BatchingQueue
+                inference_queue = BatchingQueue(
+                    lambda images: get_defect_detector().analyze_road_images(images, batch_size=len(images)),
+                    max_batch_size=app.config['AI_BATCH_SIZE'],
+                    max_wait_ms=app.config['AI_BATCH_WAIT_MS'],
+                    max_queue=app.config['AI_QUEUE_DEPTH']
+                )
+                _ai_components['inference_queue'] = inference_queue
+    return inference_queue
+
+def get_maintenance_predictor():
+    """Prédicteur de maintenance, construit à la première utilisation"""
+    predictor = _ai_components.get('maintenance_predictor')
+    if predictor is None:
+        with _ai_lock:
+            predictor = _ai_components.get('maintenance_predictor')
+            if predictor is None:
+                from models.predictive_maintenance import MaintenancePredictor
+                predictor = MaintenancePredictor(app.config['MAINTENANCE_MODEL_PATH'])
+                _ai_components['maintenance_predictor'] = predictor
+    return predictor
+
+_scores_lock = threading.Lock()
+
+def get_maintenance_scores():
+    """Priorités de tous les tronçons, recalculées une fois par version des données ou du modèle"""
+    predictor = get_maintenance_predictor()
+    if not predictor.is_available():
+        return None
+    
+    snapshot = data_manager.snapshot
+    scores = _ai_components.get('maintenance_scores')
+    if scores is not None and scores.is_current(snapshot.index, predictor.model_version):
+        return scores
+    
+    with _scores_lock:
+        scores = _ai_components.get('maintenance_scores')
+        model_version = predictor.model_version
+        if scores is None or not scores.is_current(snapshot.index, model_version):
+            from models.predictive_maintenance import PriorityScores
+            start = time.perf_counter()
+            positions, predictions = predictor.score_troncons(snapshot.features)
+            scores = PriorityScores(snapshot.index, model_version, positions, predictions)
+            _ai_components['maintenance_scores'] = scores
+            logger.info(f"🔧 Priorités de maintenance calculées: {len(positions)} tronçons "
+                        f"en {time.perf_counter() - start:.2f}s")
+    return scores
+
+def get_resource_optimizer():
+    """Optimiseur des ressources urbaines, construit à la première utilisation"""
+    optimizer = _ai_components.get('resource_optimizer')
+    if optimizer is None:
+        with _ai_lock:
+            optimizer = _ai_components.get('resource_optimizer')
+            if optimizer is None:
+                from models.resource_optimization import UrbanResourceOptimizer
+                optimizer = UrbanResourceOptimizer()
+                _ai_components['resource_optimizer'] = optimizer
+    return optimizer
+
+# Nombre de tronçons listés par rubrique dans les recommandations d'une ville
+SMART_RECOMMENDATIONS_TOP = 20
+
+def city_features(snapshot, ville):
+    """Features des tronçons d'une ville"""
+    from data_index import COL_VILLE
+    features = snapshot.features
+    return features.frame()[snapshot.df[COL_VILLE].to_numpy()[features.positions] == ville]
+
+def compute_smart_recommendations(ville):
+    """Recommandations d'une ville (éclairage, dégradation, tronçons urgents), en JSON"""
+    from models.resource_optimization import DEFAULT_HORIZON, N_CLUSTERS
+    snapshot = data_manager.snapshot
+    data = city_features(snapshot, ville)
+    optimizer = get_resource_optimizer()
+    
+    # Éclairage : regroupement des tronçons de la ville, gardé en cache pour
+    # la pagination des tronçons cibles (/api/ai/lighting-targets)
+    eclairage = []
+    if len(data) >= N_CLUSTERS:
+        eclairage = optimizer.optimize_lighting(data, cache_key=(ville, snapshot.signature),
+                                                page_size=SMART_RECOMMENDATIONS_TOP)
+    
+    # Dégradation : répartition des priorités et tronçons les plus dégradés
+    degradation = optimizer.predict_infrastructure_degradation(data, output='frame')
+    etat_pred = f'etat_pred_{DEFAULT_HORIZON}_ans'
+    prioritaires = degradation[degradation['priorite_intervention'] == 'Haute']
+    prioritaires = prioritaires.nsmallest(SMART_RECOMMENDATIONS_TOP, etat_pred)
+    
+    # Maintenance : priorités précalculées, si un modèle est disponible
+    recommandations_globales = None
+    scores = get_maintenance_scores()
+    if scores is not None:
+        urgents = []
+        for commune in snapshot.index.get_communes(ville):
+            payload = scores.get_commune(commune)
+            if payload is not None:
+                urgents.extend({**troncon, 'commune': commune}
+                               for troncon in payload['recommandations_globales']['troncons_urgents'])
+        urgents.sort(key=lambda t: (-t['prediction_ia']['niveau'], -t['prediction_ia']['probabilite']))
+        recommandations_globales = {
+            'troncons_urgents': urgents[:SMART_RECOMMENDATIONS_TOP],
+            'nombre_troncons_urgents': len(urgents),
+            'priorite_max': urgents[0]['prediction_ia']['niveau'] if urgents else None
+        }
+    
+    return json.dumps({
+        'ville': ville,
+        'troncons_analyses': len(data),
+        'optimisation_eclairage': eclairage,
+        'degradation': {
+            'repartition': {priorite: int(nombre) for priorite, nombre
+                            in degradation['priorite_intervention'].value_counts().items()},
+            'troncons_prioritaires': prioritaires.to_dict('records')
+        },
+        'recommandations_globales': recommandations_globales,
+        'calcule_le': time.strftime('%Y-%m-%dT%H:%M:%S%z')
+    }, ensure_ascii=False).encode('utf-8')
+
+def smart_recommendations_version():
+    """Version des données et du modèle de maintenance"""
+    return (data_manager.snapshot.signature, get_maintenance_predictor().model_version)
+
+# Réponses par ville, recalculées en arrière-plan (stale-while-revalidate)
+recommendation_store = RecommendationStore(
+    compute_smart_recommendations, smart_recommendations_version, data_manager.get_villes,
+    check_interval=app.config['RECOMMENDATIONS_CHECK_INTERVAL']
+)
+
+@app.before_request
+def start_recommendations_worker():
+    recommendation_store.ensure_worker()
+
+def preload_models():
+    """Précharge les modèles IA (avec gunicorn --preload, partagés entre workers)"""
+    with phase('prechargement_modeles'):
+        if os.path.exists(app.config['DEFECT_MODEL_PATH']):
+            get_defect_detector()
+        if os.path.exists(app.config['MAINTENANCE_MODEL_PATH']):
+            get_maintenance_scores()
+        registry.preload()
+        recommendation_store.refresh_all()
+
+# ==================== DÉMARRAGE À FROID ====================
+# 'eager' : données chargées pendant l'import (comportement historique).
+# 'background' : l'import rend la main tout de suite, un thread charge les
+# données pendant que le serveur ouvre son port.
+# 'lazy' (Vercel) : rien avant la première requête, qui lance le même
+# thread ; /login et /api/health répondent sans attendre les données.
+_warm_up_lock = threading.Lock()
+_warm_up_pid = None
+
+def warm_up():
+    """Charge les données, l'index des images et les recommandations"""
+    try:
+        data_manager.ensure_loaded()
+    except Exception as e:
+        logger.error(f"Erreur chargement des données au démarrage: {e}")
+        return
+    sync_upload_index()
+    # Premier calcul des recommandations dès le chargement des données
+    recommendation_store.ensure_worker()
+
+def start_warm_up():
+    """Lance warm_up dans un thread, une fois par processus"""
+    global _warm_up_pid
+    if _warm_up_pid == os.getpid():
+        return
+    with _warm_up_lock:
+        if _warm_up_pid == os.getpid():
+            return
+        _warm_up_pid = os.getpid()
+        threading.Thread(target=warm_up, name='warm-up', daemon=True).start()
+
+if os.environ.get('PRELOAD_MODELS') == '1':
+    threading.Thread(target=sync_upload_index, name='upload-index', daemon=True).start()
+    preload_models()
+elif app.config['STARTUP_MODE'] == 'eager':
+    threading.Thread(target=sync_upload_index, name='upload-index', daemon=True).start()
+    recommendation_store.ensure_worker()
+elif app.config['STARTUP_MODE'] == 'background':
+    start_warm_up()
+
+@app.before_request
+def start_deferred_warm_up():
+    # Aussi en 'background' : le thread lancé avant un fork ne suit pas dans les workers
+    if app.config['STARTUP_MODE'] != 'eager':
+        start_warm_up()
+
+# ==================== ROUTES ====================
+@app.route('/')
+@login_required
+def index():
+    """Page d'accueil"""
+    return render_template('index.html')
+
+@app.route('/api/villes', methods=['GET'])
+@login_required
+def get_villes():
+    """Liste des villes"""
+    try:
+        villes = data_manager.get_villes()
+        return jsonify(villes)
+    except Exception as e:
+        logger.error(f"Erreur: {e}")
+        return jsonify(['Douala', 'Yaoundé'])
+
+@app.route('/api/communes', methods=['GET'])
+@login_required
+def get_communes():
+    """Communes pour une ville"""
+    ville = request.args.get('ville')
+    if not ville:
+        return jsonify({'error': 'Ville requise'}), 400
+    communes = data_manager.get_communes(ville)
+    return jsonify(communes)
+
+@app.route('/api/indicateurs', methods=['GET'])
+@login_required
+def get_indicateurs():
+    """Indicateurs agrégés, tronçons et quartiers de taudis d'une commune"""
+    commune = request.args.get('commune')
+    if not commune:
+        return jsonify({'error': 'Commune requise'}), 400
+    
+    # Corps JSON et ETag précalculés pour la version courante des données
+    payload = data_manager.get_indicateurs_json(commune)
+    if payload is None:
+        return jsonify({'error': 'Commune non trouvée'}), 404
+    
+    body, etag = payload
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+@app.route('/api/health', methods=['GET'])
+def health():
+    """Health check"""
+    return jsonify({
+        'status': 'healthy',
+        'render': IS_RENDER,
+        'startup_mode': app.config['STARTUP_MODE'],
+        'data_loaded': data_manager.is_loaded() and len(data_manager.df) > 0
+    })
+
+@app.route('/api/metrics', methods=['GET'])
+def export_metrics():
+    """Métriques de tous les workers au format texte Prometheus"""
+    token = app.config['METRICS_TOKEN']
+    if token and not secrets.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return jsonify({'error': 'Non autorisé'}), 401
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/api/ai/status', methods=['GET'])
+def ai_status():
+    """Disponibilité des modèles IA, temps de chargement et empreinte mémoire"""
+    inference_queue = _ai_components.get('inference_queue')
+    detector = _ai_components.get('defect_detector')
+    return jsonify({
+        'ia_disponible': os.path.exists(app.config['DEFECT_MODEL_PATH']),
+        'modeles': registry.stats(),
+        'file_inference': inference_queue.metrics() if inference_queue else None,
+        'cache_analyses': detector.cache.stats() if detector else None,
+        'recommandations': recommendation_store.stats()
+    })
+
+@app.route('/api/ai/analyze-image', methods=['POST'])
+@login_required
+def analyze_image():
+    """Analyse IA d'une image de voirie (regroupée en micro-lots)"""
+    if 'file' not in request.files:
+        return jsonify({'error': 'Aucun fichier'}), 400
+    
+    if not os.path.exists(app.config['DEFECT_MODEL_PATH']):
+        return jsonify({'error': 'Modèle IA indisponible'}), 503
+    
+    from models.inference_queue import QueueFullError
+    image_bytes = request.files['file'].read()
+    try:
+        future = get_inference_queue().submit(io.BytesIO(image_bytes))
+    except QueueFullError as e:
+        logger.warning(str(e))
+        return jsonify({'error': 'Service IA surchargé, réessayez'}), 503
+    
+    try:
+        result = future.result(timeout=app.config['AI_REQUEST_TIMEOUT'])
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        return jsonify({'error': "Délai d'analyse dépassé"}), 504
+    except Exception as e:
+        logger.error(f"Erreur analyse image: {e}")
+        return jsonify({'error': 'Erreur analyse IA'}), 500
+    
+    if 'erreur' in result:
+        return jsonify({'error': f"Image illisible: {result['erreur']}"}), 400
+    
+    # Résultat rattaché aux images uploadées de même contenu
+    from models.image_analysis import ANALYSE_KIND
+    try:
+        upload_index.record_analysis(ANALYSE_KIND, get_defect_detector().model_version, result,
+                                     sha256=hashlib.sha256(image_bytes).hexdigest())
+    except Exception as e:
+        logger.warning(f"Analyse non indexée: {e}")
+    return jsonify(result)
+
+@app.route('/api/ai/predict-maintenance', methods=['GET'])
+@login_required
+def predict_maintenance():
+    """Priorités de maintenance des tronçons d'une commune (précalculées)"""
+    commune = request.args.get('commune')
+    if not commune:
+        return jsonify({'error': 'Commune requise'}), 400
+    
+    try:
+        scores = get_maintenance_scores()
+    except Exception as e:
+        logger.error(f"Erreur prédiction maintenance: {e}")
+        return jsonify({'error': 'Erreur prédiction IA'}), 500
+    
+    if scores is None:
+        return jsonify({'error': 'Modèle de maintenance indisponible'}), 503
+    
+    payload = scores.get_commune(commune)
+    if payload is None:
+        return jsonify({'error': 'Commune non trouvée'}), 404
+    return jsonify(payload)
+
+@app.route('/api/ai/smart-recommendations', methods=['GET'])
+@login_required
+def smart_recommendations():
+    """Recommandations précalculées d'une ville, éventuellement périmées pendant un recalcul"""
+    ville = request.args.get('ville')
+    if not ville:
+        return jsonify({'error': 'Ville requise'}), 400
+    if ville not in data_manager.get_villes():
+        return jsonify({'error': 'Ville non trouvée'}), 404
+    
+    result = recommendation_store.get(ville)
+    if result is None:
+        response = jsonify({'error': 'Recommandations en cours de calcul'})
+        response.status_code = 503
+        response.headers['Retry-After'] = '5'
+        return response
+    
+    entry, is_current = result
+    response = Response(entry.body, mimetype='application/json')
+    response.set_etag(entry.etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    response.headers['Age'] = str(int(time.time() - entry.computed_at))
+    if not is_current:
+        response.headers['Warning'] = '110 - "Response is Stale"'
+    return response.make_conditional(request)
+
+@app.route('/api/ai/lighting-targets', methods=['GET'])
+@login_required
+def lighting_targets():
+    """Tronçons cibles d'un groupe d'éclairage d'une ville, par page (offset, limit)"""
+    from models.resource_optimization import N_CLUSTERS, TARGETS_PAGE_SIZE
+    ville = request.args.get('ville')
+    cluster = request.args.get('cluster', type=int)
+    if not ville or cluster is None:
+        return jsonify({'error': 'Ville et groupe requis'}), 400
+    if ville not in data_manager.get_villes():
+        return jsonify({'error': 'Ville non trouvée'}), 404
+    if not 0 <= cluster < N_CLUSTERS:
+        return jsonify({'error': 'Groupe invalide'}), 400
+    
+    limit = min(max(request.args.get('limit', TARGETS_PAGE_SIZE, type=int), 0), 1000)
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    snapshot = data_manager.snapshot
+    cache_key = (ville, snapshot.signature)
+    optimizer = get_resource_optimizer()
+    troncons = optimizer.get_troncons_cibles(cache_key, cluster, offset, limit)
+    if troncons is None:
+        # Groupes sortis du cache ou classeur rechargé : nouveau regroupement
+        data = city_features(snapshot, ville)
+        if len(data) < N_CLUSTERS:
+            return jsonify({'error': 'Pas assez de tronçons pour regrouper'}), 404
+        optimizer.optimize_lighting(data, cache_key=cache_key, page_size=0)
+        troncons = optimizer.get_troncons_cibles(cache_key, cluster, offset, limit)
+    return jsonify({'ville': ville, 'cluster': cluster, 'troncons_cibles': troncons,
+                    'offset': offset, 'limit': limit})
+
+# Types d'images et extensions acceptés
+IMAGE_TYPES = ['troncons', 'taudis']
+ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
+
+@app.errorhandler(RequestEntityTooLarge)
+def request_too_large(e):
+    """Requête entière au-delà de la limite : erreur JSON sur l'API"""
+    if not request.path.startswith('/api/'):
+        return e
+    limit = request.max_content_length
+    message = f'Requête supérieure à {format_size(limit)}' if limit else 'Requête trop volumineuse'
+    return jsonify({'error': message}), 413
+
+@app.route('/api/upload/image', methods=['POST'])
+@login_required
+def upload_image():
+    """Upload d'une ou plusieurs images (champ 'file' répété ou 'files')"""
+    image_type = request.form.get('type', 'troncons')
+    if image_type not in IMAGE_TYPES:
+        return jsonify({'error': 'Type invalide'}), 400
+    
+    files = request.files.getlist('file') + request.files.getlist('files')
+    if not files:
+        return jsonify({'error': 'Aucun fichier'}), 400
+    
+    # Rattachement facultatif des images à une ville, commune ou tronçon
+    ville = request.form.get('ville') or None
+    commune = request.form.get('commune') or None
+    troncon = request.form.get('troncon') or None
+    
+    store = app.extensions['upload_store']
+    uploaded, errors = [], []
+    status = 400
+    for file in files:
+        filename = secure_filename(file.filename or '')
+        if not filename:
+            errors.append({'filename': file.filename, 'error': 'Aucun fichier sélectionné'})
+            continue
+        if filename.rsplit('.', 1)[-1].lower() not in ALLOWED_EXTENSIONS:
+            errors.append({'filename': filename, 'error': 'Extension non autorisée'})
+            continue
+        
+        try:
+            result = store.save(file, image_type, filename)
+        except FileTooLargeError as e:
+            errors.append({'filename': filename, 'error': str(e)})
+            status = 413
+            continue
+        except Exception as e:
+            logger.error(f"Erreur upload {filename}: {e}")
+            errors.append({'filename': filename, 'error': str(e)})
+            status = 500
+            continue
+        
+        if not result['inchange']:
+            create_upload_variants_async(app.config['UPLOAD_FOLDER'], image_type, filename)
+        try:
+            upload_index.record_file(app.config['UPLOAD_FOLDER'], image_type, filename,
+                                     sha256=result['sha256'], ville=ville, commune=commune,
+                                     troncon=troncon)
+        except Exception as e:
+            logger.error(f"Erreur indexation {filename}: {e}")
+        stat = os.stat(Path(app.config['UPLOAD_FOLDER']) / image_type / filename)
+        result['url'] = image_url(f'{image_type}/{filename}', stat.st_mtime_ns, stat.st_size)
+        uploaded.append(result)
+    
+    # Un seul fichier : réponse d'origine, enrichie du hachage et de la déduplication
+    if len(files) == 1:
+        if errors:
+            return jsonify({'error': errors[0]['error']}), status
+        return jsonify({'message': 'Image uploadée', **uploaded[0]})
+    
+    return jsonify({
+        'message': f'{len(uploaded)} images uploadées',
+        'fichiers': uploaded,
+        'erreurs': errors
+    }), 200 if uploaded else status
+
+def image_url(chemin, mtime_ns, taille):
+    """URL versionnée (?v=) d'une image : mise en cache longue durée possible"""
+    if mtime_ns is None or taille is None:
+        return f'/uploads/{chemin}'
+    return f'/uploads/{chemin}?v={image_version(mtime_ns, taille)}'
+
+@app.route('/api/images', methods=['GET'])
+@login_required
+def list_images():
+    """Galerie d'images depuis l'index (filtres type, ville, commune, tronçon)"""
+    image_type = request.args.get('type')
+    if image_type is not None and image_type not in IMAGE_TYPES:
+        return jsonify({'error': 'Type invalide'}), 400
+    
+    limit = min(request.args.get('limit', 100, type=int), 1000)
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    images = upload_index.find(image_type=image_type,
+                               ville=request.args.get('ville'),
+                               commune=request.args.get('commune'),
+                               troncon=request.args.get('troncon'),
+                               limit=limit, offset=offset)
+    for image in images:
+        image['url'] = image_url(image['chemin'], image['mtime_ns'], image['taille'])
+    return jsonify({'images': images, 'offset': offset, 'limit': limit})
+
+@app.route('/api/images/<image_type>/<filename>', methods=['GET'])
+@login_required
+def image_metadata(image_type, filename):
+    """Métadonnées et analyses enregistrées d'une image"""
+    image = upload_index.get(f'{image_type}/{filename}')
+    if image is None:
+        return jsonify({'error': 'Image non trouvée'}), 404
+    image['url'] = image_url(image['chemin'], image['mtime_ns'], image['taille'])
+    return jsonify(image)
+
+@app.route('/uploads/<image_type>/<filename>')
+@app.route('/images/<image_type>/<filename>')
+def serve_uploaded_image(image_type, filename):
+    """Sert les images uploadées ; ?w=320 sert une variante redimensionnée
+    
+    Seule une URL versionnée à jour (?v=, voir image_url) est mise en cache
+    longtemps : une URL sans version est revalidée à chaque affichage par
+    son ETag, et montre donc une image remplacée dès le rechargement.
+    """
+    if image_type not in IMAGE_TYPES:
+        return jsonify({'error': 'Type invalide'}), 400
+    
+    upload_dir = Path(app.config['UPLOAD_FOLDER']) / image_type
+    source = source_path(app.config['UPLOAD_FOLDER'], image_type, filename)
+    if source is None:
+        return jsonify({'error': 'Image non trouvée'}), 404
+    stat = source.stat()
+    versioned = request.args.get('v') == image_version(stat.st_mtime_ns, stat.st_size)
+    max_age = app.config['IMAGE_CACHE_MAX_AGE'] if versioned else None
+    
+    width = request.args.get('w', type=int)
+    if not width or width <= 0:
+        return cache_image(send_from_directory(str(upload_dir), filename, max_age=max_age), versioned)
+    
+    fmt = choose_format(request.accept_mimetypes)
+    try:
+        variant = get_variant(app.config['UPLOAD_FOLDER'], image_type, filename, width, fmt)
+    except Exception as e:
+        # Image non décodable : l'original est servi tel quel
+        logger.warning(f"Variante impossible pour {filename}: {e}")
+        return cache_image(send_from_directory(str(upload_dir), filename, max_age=max_age), versioned)
+    
+    if variant is None:
+        return jsonify({'error': 'Image non trouvée'}), 404
+    
+    path, etag = variant
+    response = send_file(path, mimetype=FORMATS[fmt][1], etag=etag, max_age=max_age,
+                         conditional=True)
+    response.vary.add('Accept')
+    return cache_image(response, versioned)
+
+def cache_image(response, versioned):
+    """En-têtes de cache d'une image : immuable si l'URL est versionnée, sinon no-cache et ETag"""
+    response.cache_control.public = True
+    if versioned:
+        response.cache_control.immutable = True
+    return response
+
+# ==================== DÉMARRAGE ====================
+if __name__ == '__main__':
+    port = int(os.environ.get('PORT', 10000))
+    
+    print("\n" + "="*50)
+    print("🏙️  URBAN AI")
+    print("="*50)
+    print(f"📁 Base: {BASE_DIR}")
+    print(f"🔗 Port: {port}")
+    print(f"🌐 URL: http://localhost:{port}")
+    print("="*50)
+    
     app.run(host='0.0.0.0', port=port, debug=not IS_RENDER)
\ No newline at end of file
@@ -1,33 +1,284 @@
-# backup.py
-import os
-import shutil
-from datetime import datetime
-
-def backup_data():
-    """Sauvegarde des données vers Google Drive/Dropbox"""
-    
-    backup_dir = "backups"
-    os.makedirs(backup_dir, exist_ok=True)
-    
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_file = f"{backup_dir}/urban_ai_backup_{timestamp}.zip"
-    
-    # Fichiers à sauvegarder
-    files_to_backup = [
-        "data/indicateurs_urbains.xlsx",
-        "uploads/",
-        "models/"
-    ]
-    
-    # Créer l'archive
-    shutil.make_archive(
-        backup_file.replace('.zip', ''),
-        'zip',
-        root_dir='.',
-        base_dir=files_to_backup
-    )
-    
-    print(f"✅ Backup créé: {backup_file}")
-    
-    # Upload vers Google Drive (optionnel)
-    # upload_to_drive(backup_file)
\ No newline at end of file
+# backup.py
+"""
+Sauvegardes incrémentales du classeur, des images et des modèles.
+
+Chaque fichier est rangé une seule fois dans backups/blobs sous son SHA-256
+(compressé en gzip avec le suffixe .gz, sauf les formats déjà compressés).
+Une sauvegarde n'est qu'un manifeste backups/manifests/<horodatage>.json
+listant chemin, taille, date et SHA-256 de chaque fichier : seuls les
+fichiers nouveaux ou modifiés sont lus et écrits, et n'importe quelle
+sauvegarde peut être restaurée.
+
+Usage :
+    python backup.py backup [--workers 8]
+    python backup.py list
+    python backup.py restore [<sauvegarde>|latest] [--target .]
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from data_cache import file_sha256
+
+BASE_DIR = Path(__file__).parent
+BACKUP_DIR = BASE_DIR / 'backups'
+MANIFESTS_DIR = 'manifests'
+BLOBS_DIR = 'blobs'
+CHUNK_SIZE = 1024 * 1024
+
+# Fichiers et dossiers à sauvegarder (relatifs à BASE_DIR)
+FILES_TO_BACKUP = [
+    'data/indicateurs_urbains.xlsx',
+    'data/uploads',
+    'models',
+]
+
+# Formats déjà compressés : stockés tels quels
+STORED_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.xlsx', '.zip', '.gz'}
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+
+def list_files(root, paths):
+    """Fichiers à sauvegarder (dossiers cachés, fichiers cachés et __pycache__ exclus)"""
+    files = []
+    for name in paths:
+        path = root / name
+        if path.is_file():
+            files.append(path)
+        elif path.is_dir():
+            files.extend(
+                p for p in path.rglob('*')
+                if p.is_file() and not any(part.startswith('.') or part == '__pycache__'
+                                           for part in p.relative_to(path).parts)
+            )
+    return sorted(files)
+
+
+def _temp_path(target):
+    return target.with_name(f'.{target.name}.tmp-{os.getpid()}-{threading.get_ident()}')
+
+
+class BackupStore:
+    def __init__(self, backup_dir=BACKUP_DIR):
+        self.backup_dir = Path(backup_dir)
+        self.manifests_dir = self.backup_dir / MANIFESTS_DIR
+        self.blobs_dir = self.backup_dir / BLOBS_DIR
+
+    def blob_path(self, sha256, compression=None):
+        """Blob d'un contenu dans un format : le même contenu peut exister brut
+        (photo.jpg) et compressé (copie.bin), chacun sous son propre nom"""
+        suffix = '.gz' if compression else ''
+        return self.blobs_dir / sha256[:2] / f'{sha256}{suffix}'
+
+    def blob_candidates(self, entry):
+        """(blob, compressé) à essayer, dans l'ordre, pour restaurer une entrée
+
+        Les sauvegardes antérieures rangeaient les deux formats sous <sha256>
+        sans suffixe : le format est alors lu dans l'en-tête du blob, et un
+        fichier .gz stocké tel quel est essayé brut si la décompression échoue.
+        """
+        blob = self.blob_path(entry['sha256'], entry['compression'])
+        if entry['compression'] and blob.exists():
+            return [(blob, True)]
+        blob = self.blob_path(entry['sha256'])
+        with open(blob, 'rb') as f:
+            if f.read(len(GZIP_MAGIC)) == GZIP_MAGIC:
+                return [(blob, True), (blob, False)]
+        return [(blob, False)]
+
+    # ---------- Manifestes ----------
+    def snapshots(self):
+        """Noms des sauvegardes, de la plus ancienne à la plus récente"""
+        if not self.manifests_dir.is_dir():
+            return []
+        return sorted(p.stem for p in self.manifests_dir.glob('*.json'))
+
+    def load_manifest(self, name):
+        if name == 'latest':
+            snapshots = self.snapshots()
+            if not snapshots:
+                raise FileNotFoundError('Aucune sauvegarde')
+            name = snapshots[-1]
+        with open(self.manifests_dir / f'{name}.json', encoding='utf-8') as f:
+            return json.load(f)
+
+    def write_manifest(self, manifest):
+        """Écrit le manifeste en dernier et atomiquement : une sauvegarde interrompue n'existe pas"""
+        self.manifests_dir.mkdir(parents=True, exist_ok=True)
+        target = self.manifests_dir / f"{manifest['nom']}.json"
+        tmp_path = _temp_path(target)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, target)
+        return target
+
+    # ---------- Sauvegarde ----------
+    def store_file(self, path, known=None):
+        """(sha256, compression, écrit) : range le fichier dans les blobs s'il n'y est pas"""
+        stat = path.stat()
+        if known and (known['taille'], known['mtime_ns']) == (stat.st_size, stat.st_mtime_ns) \
+                and self.blob_path(known['sha256'], known['compression']).exists():
+            # Inchangé depuis la sauvegarde précédente : ni lu ni haché
+            return known['sha256'], known['compression'], False
+
+        sha256 = file_sha256(path)
+        compression = None if path.suffix.lower() in STORED_EXTENSIONS else 'gzip'
+        blob = self.blob_path(sha256, compression)
+        if blob.exists():
+            return sha256, compression, False
+
+        # Compression en flux, par blocs ; le contenu est re-haché à l'écriture
+        # pour détecter une modification du fichier pendant la lecture
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = _temp_path(blob)
+        digest = hashlib.sha256()
+        try:
+            with open(path, 'rb') as fin, open(tmp_path, 'wb') as raw:
+                fout = gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6, mtime=0) \
+                    if compression else raw
+                for chunk in iter(lambda: fin.read(CHUNK_SIZE), b''):
+                    digest.update(chunk)
+                    fout.write(chunk)
+                if compression:
+                    fout.close()
+            if digest.hexdigest() != sha256:
+                raise OSError(f'{path} modifié pendant la sauvegarde')
+            os.replace(tmp_path, blob)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        return sha256, compression, True
+
+    def backup(self, root=BASE_DIR, paths=FILES_TO_BACKUP, workers=None):
+        """Sauvegarde incrémentale ; retourne le manifeste"""
+        root = Path(root)
+        snapshots = self.snapshots()
+        previous = self.load_manifest(snapshots[-1])['fichiers'] if snapshots else {}
+        files = list_files(root, paths)
+
+        start = time.perf_counter()
+        workers = workers or min(8, os.cpu_count() or 1)
+
+        def store(path):
+            relative_path = path.relative_to(root).as_posix()
+            stat = path.stat()
+            sha256, compression, written = self.store_file(path, previous.get(relative_path))
+            return relative_path, {
+                'taille': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'sha256': sha256,
+                'compression': compression,
+            }, written
+
+        # zlib et hashlib libèrent le GIL : compression et hachage en parallèle
+        entries, written, written_bytes = {}, 0, 0
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for relative_path, entry, is_new in pool.map(store, files):
+                entries[relative_path] = entry
+                if is_new:
+                    written += 1
+                    written_bytes += entry['taille']
+
+        name = datetime.now().strftime('%Y%m%d_%H%M%S')
+        if name in snapshots:
+            name += f'_{len(snapshots)}'
+        manifest = {
+            'nom': name,
+            'cree_le': datetime.now().isoformat(timespec='seconds'),
+            'precedente': snapshots[-1] if snapshots else None,
+            'fichiers': entries,
+        }
+        self.write_manifest(manifest)
+
+        total = sum(e['taille'] for e in entries.values())
+        print(f"✅ Backup créé: {name} — {len(entries)} fichiers ({total / 2**20:.1f} Mo), "
+              f"{written} nouveaux ou modifiés ({written_bytes / 2**20:.1f} Mo) "
+              f"en {time.perf_counter() - start:.1f}s")
+        return manifest
+
+    # ---------- Restauration ----------
+    def restore_file(self, relative_path, entry, target_root):
+        """Restaure un fichier (décompression en flux, vérifiée) ; False s'il était déjà à jour"""
+        target = target_root / relative_path
+        if target.is_file() and target.stat().st_size == entry['taille'] \
+                and file_sha256(target) == entry['sha256']:
+            return False
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = _temp_path(target)
+        try:
+            for blob, compressed in self.blob_candidates(entry):
+                digest = hashlib.sha256()
+                try:
+                    with open(blob, 'rb') as raw, open(tmp_path, 'wb') as fout:
+                        fin = gzip.GzipFile(fileobj=raw, mode='rb') if compressed else raw
+                        for chunk in iter(lambda: fin.read(CHUNK_SIZE), b''):
+                            digest.update(chunk)
+                            fout.write(chunk)
+                except (OSError, EOFError):
+                    continue
+                if digest.hexdigest() == entry['sha256']:
+                    os.utime(tmp_path, ns=(entry['mtime_ns'], entry['mtime_ns']))
+                    os.replace(tmp_path, target)
+                    return True
+            raise OSError(f'Blob corrompu pour {relative_path}')
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def restore(self, name='latest', target_root=BASE_DIR, workers=None):
+        """Restaure une sauvegarde dans target_root ; retourne le nombre de fichiers écrits"""
+        manifest = self.load_manifest(name)
+        target_root = Path(target_root)
+        start = time.perf_counter()
+        workers = workers or min(8, os.cpu_count() or 1)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            restored = sum(pool.map(lambda item: self.restore_file(*item, target_root),
+                                    manifest['fichiers'].items()))
+
+        print(f"✅ Sauvegarde {manifest['nom']} restaurée dans {target_root}: "
+              f"{restored} fichiers écrits, {len(manifest['fichiers']) - restored} déjà à jour "
+              f"en {time.perf_counter() - start:.1f}s")
+        return restored
+
+
+def backup_data():
+    """Sauvegarde incrémentale des données vers backups/"""
+    manifest = BackupStore().backup()
+
+    # Upload vers Google Drive (optionnel)
+    # upload_to_drive(BACKUP_DIR)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sauvegardes incrémentales d'Urban AI")
+    parser.add_argument('command', choices=['backup', 'list', 'restore'])
+    parser.add_argument('snapshot', nargs='?', default='latest', help='sauvegarde à restaurer')
+    parser.add_argument('--backup-dir', default=str(BACKUP_DIR))
+    parser.add_argument('--target', default=str(BASE_DIR), help='dossier de restauration')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    store = BackupStore(args.backup_dir)
+    if args.command == 'backup':
+        store.backup(workers=args.workers)
+    elif args.command == 'restore':
+        store.restore(args.snapshot, args.target, workers=args.workers)
+    else:
+        for name in store.snapshots():
+            manifest = store.load_manifest(name)
+            total = sum(e['taille'] for e in manifest['fichiers'].values())
+            print(f"{name}  {len(manifest['fichiers']):>6} fichiers  {total / 2**20:>9.1f} Mo")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks hors ligne de l'application sur données synthétiques.
+
+- DataManager : premier chargement (Excel + cache), chargement depuis le
+  cache, indicateurs d'une commune ;
+- modèles : entraînement et scoring de la maintenance, éclairage,
+  dégradation ;
+- routes, via le client de test Flask : API de données, recommandations,
+  galerie, upload et service des images (originales et variantes).
+
+Les résultats sont écrits en JSON dans benchmarks/results/ (voir results.py
+pour comparer deux exécutions).
+
+Usage : python benchmarks/bench_app.py [--tailles 1000 100000] [--routes-lignes 10000]
+                                       [--images 200] [--output resultats.json]
+"""
+
+import argparse
+import hashlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from image_variants import wait_for_variants
+from results import Results, latency_stats
+from synthetic import generate_dataset, render_image, write_workbook
+
+TAILLES = [1_000, 100_000]
+ROUTES_LIGNES = 10_000
+IMAGES = 200
+REPETITIONS = 50
+MOT_DE_PASSE = 'benchmark'
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def repeat(func, n=REPETITIONS):
+    durations = []
+    for _ in range(n):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def synthetic_labels(features, seed=0):
+    """Priorités synthétiques (0 à 3) corrélées au linéaire et à l'éclairage"""
+    rng = np.random.default_rng(seed)
+    values = features.values
+    score = values[:, 0] / values[:, 0].max() + 1 - values[:, 2] / max(values[:, 2].max(), 1)
+    return np.digitize(score + rng.normal(0, 0.2, len(values)), [0.6, 1.0, 1.4])
+
+
+def bench_data_and_models(results, workdir, n_rows):
+    """DataManager et modèles sur un classeur de n_rows tronçons"""
+    from app import DataManager
+    from models.predictive_maintenance import MaintenancePredictor
+    from models.resource_optimization import UrbanResourceOptimizer
+
+    excel_path = workdir / f'indicateurs_{n_rows}.xlsx'
+    write_workbook(excel_path, n_rows)
+    prefix = f'{n_rows}'
+
+    manager, cold_s = timed(lambda: DataManager(str(excel_path)))
+    results.add(f'{prefix}/data/chargement_excel', cold_s * 1e3, 'ms')
+    manager, warm_s = timed(lambda: DataManager(str(excel_path)))
+    results.add(f'{prefix}/data/chargement_cache', warm_s * 1e3, 'ms')
+
+    communes = [c for v in manager.get_villes() for c in manager.get_communes(v)][:50]
+    _, first_s = timed(lambda: [manager.get_indicateurs_json(c) for c in communes])
+    results.add(f'{prefix}/data/indicateurs_commune_premier', first_s / len(communes) * 1e3, 'ms')
+    _, warm_s = timed(lambda: [manager.get_indicateurs_json(c) for c in communes])
+    results.add(f'{prefix}/data/indicateurs_commune_memorise', warm_s / len(communes) * 1e6, 'µs')
+
+    features = manager.features
+    predictor = MaintenancePredictor(str(workdir / f'maintenance_{n_rows}.pkl'))
+    sample = min(len(features), 20_000)
+    X, y = features.values[:sample], synthetic_labels(features)[:sample]
+    _, train_s = timed(lambda: predictor.train(X, y))
+    results.add(f'{prefix}/modeles/maintenance_entrainement_{sample}', train_s, 's')
+    _, score_s = timed(lambda: predictor.score_troncons(features))
+    results.add(f'{prefix}/modeles/maintenance_scoring', len(features) / score_s, 'lignes/s')
+
+    optimizer = UrbanResourceOptimizer()
+    _, lighting_s = timed(lambda: optimizer.optimize_lighting(features))
+    results.add(f'{prefix}/modeles/optimisation_eclairage', lighting_s * 1e3, 'ms')
+    _, degradation_s = timed(lambda: optimizer.predict_infrastructure_degradation(features, output='frame'))
+    results.add(f'{prefix}/modeles/degradation', degradation_s * 1e3, 'ms')
+
+
+def bench_routes(results, app_module, upload_dir, n_images):
+    """Routes de l'application via le client de test Flask"""
+    app = app_module.app
+    client = app.test_client()
+    client.post('/login', data={'password': MOT_DE_PASSE})
+
+    ville = app_module.data_manager.get_villes()[0]
+    commune = app_module.data_manager.get_communes(ville)[0]
+    images = sorted(p.name for p in (upload_dir / 'troncons').iterdir())
+
+    # Index des images et modèle de maintenance prêts avant les mesures
+    app_module.sync_upload_index()
+    features = app_module.data_manager.features
+    app_module.get_maintenance_predictor().train(features.values, synthetic_labels(features))
+    app_module.get_maintenance_scores()
+
+    def get(url, **kwargs):
+        response = client.get(url, **kwargs)
+        assert response.status_code in (200, 304), (url, response.status_code)
+        response.close()
+        return response
+
+    for name, url in [('villes', '/api/villes'),
+                      ('communes', f'/api/communes?ville={ville}'),
+                      ('indicateurs', f'/api/indicateurs?commune={commune}'),
+                      ('galerie', f'/api/images?commune={commune}'),
+                      ('maintenance', f'/api/ai/predict-maintenance?commune={commune}'),
+                      ('sante', '/api/health')]:
+        stats = latency_stats(repeat(lambda: get(url)))
+        results.add(f'routes/{name}_p50', stats['p50_ms'], 'ms')
+        results.add(f'routes/{name}_p95', stats['p95_ms'], 'ms')
+
+    # Recommandations : premier calcul par le thread de fond, puis réponse en mémoire
+    url = f'/api/ai/smart-recommendations?ville={ville}'
+    app_module.recommendation_store.refresh_all()
+    stats = latency_stats(repeat(lambda: get(url)))
+    results.add('routes/recommandations_p50', stats['p50_ms'], 'ms')
+
+    # Images : original, variante générée à la demande, variante déjà générée
+    sample = images[:min(len(images), REPETITIONS)]
+    stats = latency_stats([timed(lambda: get(f'/uploads/troncons/{name}'))[1] for name in sample])
+    results.add('routes/image_originale_p50', stats['p50_ms'], 'ms')
+    headers = {'Accept': 'image/webp'}
+    stats = latency_stats([timed(lambda: get(f'/uploads/troncons/{name}?w=320', headers=headers))[1]
+                           for name in sample])
+    results.add('routes/variante_premiere_p50', stats['p50_ms'], 'ms')
+    stats = latency_stats([timed(lambda: get(f'/uploads/troncons/{name}?w=320', headers=headers))[1]
+                           for name in sample])
+    results.add('routes/variante_en_cache_p50', stats['p50_ms'], 'ms')
+
+    # Upload : un fichier par requête, puis un lot
+    photo = upload_dir.parent / 'photo_upload.jpg'
+    render_image(photo, 1280, seed=12345)
+    payload = photo.read_bytes()
+
+    def upload(files):
+        response = client.post('/api/upload/image', data={'type': 'troncons', 'files': files},
+                               content_type='multipart/form-data')
+        assert response.status_code == 200, response.get_json()
+
+    durations = repeat(lambda: upload([(io.BytesIO(payload), f'bench_{time.perf_counter_ns()}.jpg')]), 20)
+    stats = latency_stats(durations)
+    results.add('routes/upload_image_p50', stats['p50_ms'], 'ms')
+    batch = [(io.BytesIO(payload), f'lot_{i}.jpg') for i in range(n_images // 4 or 1)]
+    _, batch_s = timed(lambda: upload(batch))
+    results.add(f'routes/upload_lot_{len(batch)}', len(batch) / batch_s, 'images/s')
+
+
+def run(tailles, routes_lignes, n_images, output):
+    results = Results('app', {'tailles': tailles, 'routes_lignes': routes_lignes, 'images': n_images})
+    workdir = Path(tempfile.mkdtemp(prefix='urban_ai_bench_'))
+    try:
+        # Jeu de données des routes : l'application le charge à l'import
+        print(f"⏳ Génération: {routes_lignes} tronçons, {n_images} photos")
+        excel_path, upload_dir = generate_dataset(workdir / 'routes', routes_lignes, n_images)
+        os.environ.update({
+            'EXCEL_PATH': str(excel_path),
+            'UPLOAD_FOLDER': str(upload_dir),
+            'UPLOAD_INDEX_PATH': str(workdir / 'routes' / 'upload_index.sqlite3'),
+            'MAINTENANCE_MODEL_PATH': str(workdir / 'routes' / 'maintenance_model.pkl'),
+            'METRICS_DIR': str(workdir / 'metrics'),
+            'PASSWORD_HASH': hashlib.sha256(MOT_DE_PASSE.encode()).hexdigest(),
+            'DATA_RELOAD_INTERVAL': '0',
+        })
+        app_module, import_s = timed(lambda: __import__('app'))
+        results.add('demarrage/import_app', import_s * 1e3, 'ms')
+
+        for n_rows in tailles:
+            print(f"⏳ DataManager et modèles: {n_rows} tronçons")
+            bench_data_and_models(results, workdir, n_rows)
+
+        print("⏳ Routes")
+        bench_routes(results, app_module, upload_dir, n_images)
+    finally:
+        # Variantes des images uploadées encore en cours de génération
+        wait_for_variants()
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results.save(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks hors ligne de l'application")
+    parser.add_argument('--tailles', type=int, nargs='+', default=TAILLES, help='tronçons (1 000 à 1 000 000)')
+    parser.add_argument('--routes-lignes', type=int, default=ROUTES_LIGNES)
+    parser.add_argument('--images', type=int, default=IMAGES)
+    parser.add_argument('--output', default=None, help='fichier JSON (défaut : benchmarks/results/)')
+    args = parser.parse_args()
+    run(args.tailles, args.routes_lignes, args.images, args.output)
+
+
+if __name__ == '__main__':
+    main()
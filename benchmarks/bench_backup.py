@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark et vérification des sauvegardes incrémentales (backup.py).
+
+Arborescence synthétique (classeur, photos, modèles) dont certains contenus
+sont dupliqués sous une extension stockée telle quelle (.jpg) et une
+extension compressée (.bin) : sauvegarde complète, sauvegarde incrémentale
+après modification, puis restauration de chaque sauvegarde, comparée octet
+par octet. Vérifie aussi la restauration des blobs de l'ancien format (sans
+suffixe .gz).
+
+Usage : python benchmarks/bench_backup.py [--images 200]
+"""
+
+import argparse
+import filecmp
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backup import BackupStore, FILES_TO_BACKUP
+from synthetic import generate_images, troncon_image_names, write_workbook
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def make_tree(root, n_images):
+    write_workbook(root / 'data' / 'indicateurs_urbains.xlsx', 2_000)
+    generate_images(root / 'data' / 'uploads', troncon_image_names(n_images), 'troncons', size=640)
+    models = root / 'models'
+    models.mkdir(parents=True)
+    (models / 'maintenance_model.pkl').write_bytes(os.urandom(256 * 1024) + bytes(1024 * 1024))
+    # Même contenu sous une extension brute et une extension compressée
+    photo = root / 'data' / 'uploads' / 'troncons' / 'troncon_000000.jpg'
+    shutil.copy2(photo, models / 'dup.bin')
+    shutil.copy2(models / 'maintenance_model.pkl', root / 'data' / 'uploads' / 'troncons' / 'modele.jpg')
+
+
+def same_tree(expected_root, restored_root, manifest):
+    for relative_path in manifest['fichiers']:
+        if not filecmp.cmp(expected_root / relative_path, restored_root / relative_path, shallow=False):
+            raise AssertionError(f'Restauration différente: {relative_path}')
+
+
+def run(n_images):
+    workdir = Path(tempfile.mkdtemp(prefix='urban_ai_bench_'))
+    try:
+        source = workdir / 'source'
+        make_tree(source, n_images)
+        store = BackupStore(workdir / 'backups')
+
+        first, full_s = timed(lambda: store.backup(source, FILES_TO_BACKUP))
+        snapshot_1 = workdir / 'snapshot_1'
+        shutil.copytree(source, snapshot_1)
+
+        # Modification d'une photo et du modèle, puis sauvegarde incrémentale
+        time.sleep(0.01)
+        (source / 'models' / 'maintenance_model.pkl').write_bytes(os.urandom(512 * 1024))
+        shutil.copy2(source / 'data' / 'uploads' / 'troncons' / 'troncon_000001.jpg',
+                     source / 'data' / 'uploads' / 'troncons' / 'troncon_000000.jpg')
+        second, incremental_s = timed(lambda: store.backup(source, FILES_TO_BACKUP))
+
+        _, restore_s = timed(lambda: store.restore(second['nom'], workdir / 'restore_2'))
+        same_tree(source, workdir / 'restore_2', second)
+        store.restore(first['nom'], workdir / 'restore_1')
+        same_tree(snapshot_1, workdir / 'restore_1', first)
+
+        # Ancien format : blobs compressés rangés sans suffixe
+        for blob in store.blobs_dir.rglob('*.gz'):
+            blob.rename(blob.with_suffix(''))
+        store.restore(first['nom'], workdir / 'restore_ancien')
+        same_tree(snapshot_1, workdir / 'restore_ancien', first)
+
+        print(f"\n{'sauvegarde complète':<28} {full_s:8.2f} s")
+        print(f"{'sauvegarde incrémentale':<28} {incremental_s:8.2f} s")
+        print(f"{'restauration':<28} {restore_s:8.2f} s")
+        print("✅ Restaurations identiques (doublons .jpg/.bin et ancien format compris)")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sauvegarde et restauration sur arborescence synthétique")
+    parser.add_argument('--images', type=int, default=200)
+    args = parser.parse_args()
+    run(args.images)
+
+
+if __name__ == '__main__':
+    main()
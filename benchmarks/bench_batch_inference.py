@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Débit d'inférence (images/s, CPU) : analyze_road_image image par image
+contre analyze_road_images pour des lots de 1 à 64.
+
+Sans models/defect_detector.h5, un MobileNetV2 non entraîné (4 classes)
+sert de modèle de substitution.
+
+Usage : python benchmarks/bench_batch_inference.py [nb_images]
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from models.image_analysis import DEFAULT_MODEL_PATH, RoadDefectDetector
+
+BATCH_SIZES = [1, 4, 8, 16, 32, 64]
+
+
+def sample_images(n_images):
+    """Liste de n_images chemins, en recyclant les photos de data/uploads"""
+    photos = sorted((ROOT / 'data' / 'uploads').rglob('*.jpg'))
+    return [str(photos[i % len(photos)]) for i in range(n_images)]
+
+
+def model_path(workdir):
+    path = ROOT / DEFAULT_MODEL_PATH
+    if path.exists():
+        return str(path)
+
+    import tensorflow as tf
+    substitute = workdir / 'substitute.h5'
+    tf.keras.applications.MobileNetV2(weights=None, input_shape=(224, 224, 3), classes=4).save(substitute)
+    return str(substitute)
+
+
+def run(n_images):
+    workdir = Path(tempfile.mkdtemp(prefix='urban_ai_bench_'))
+    try:
+        detector = RoadDefectDetector(model_path(workdir))
+        images = sample_images(n_images)
+        detector.analyze_road_images(images[:2], batch_size=2)  # chargement + warm-up
+
+        print(f'{n_images} images, {os.cpu_count()} CPU')
+        print(f"{'mode':>22} | {'images/s':>9}")
+        print('-' * 36)
+
+        start = time.perf_counter()
+        for path in images:
+            detector.analyze_road_image(path)
+        print(f"{'image par image':>22} | {n_images / (time.perf_counter() - start):>9.1f}")
+
+        for batch_size in BATCH_SIZES:
+            start = time.perf_counter()
+            detector.analyze_road_images(images, batch_size=batch_size)
+            print(f"{f'lot de {batch_size}':>22} | {n_images / (time.perf_counter() - start):>9.1f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 256)
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Benchmark de démarrage : lecture Excel (openpyxl) contre cache colonnaire.
+
+Usage : python benchmarks/bench_data_cache.py [nb_lignes ...]
+"""
+
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from data_cache import cache_root, read_excel_cached
+from synthetic import generate_frame
+
+TAILLES = [1_000, 10_000, 50_000]
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - start) * 1e3
+
+
+def run(tailles):
+    print(f"{'lignes':>8} | {'read_excel':>11} | {'1er (écrit)':>11} | {'cache':>9} | {'gain':>6}")
+    print('-' * 58)
+
+    workdir = Path(tempfile.mkdtemp(prefix='urban_ai_bench_'))
+    try:
+        for n_rows in tailles:
+            excel_path = workdir / f'indicateurs_{n_rows}.xlsx'
+            generate_frame(n_rows).to_excel(excel_path, index=False)
+
+            reference, excel_ms = timed(lambda: pd.read_excel(excel_path))
+            _, first_ms = timed(lambda: read_excel_cached(excel_path))
+            cached, cache_ms = timed(lambda: read_excel_cached(excel_path))
+
+            pd.testing.assert_frame_equal(cached.copy(), reference, check_dtype=False)
+            shutil.rmtree(cache_root(excel_path))
+
+            print(f'{n_rows:>8} | {excel_ms:>9.0f}ms | {first_ms:>9.0f}ms | '
+                  f'{cache_ms:>7.1f}ms | {excel_ms / cache_ms:>5.0f}x')
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    tailles = [int(arg) for arg in sys.argv[1:]] or TAILLES
+    run(tailles)
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark : recherches ville/commune par balayage du DataFrame
+(ancienne implémentation) contre les index précalculés de DataIndex.
+
+Usage : python benchmarks/bench_data_index.py [nb_lignes ...]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from data_index import DataIndex
+from synthetic import generate_frame
+
+TAILLES = [1_000, 100_000, 1_000_000]
+REPETITIONS = 50
+
+
+def old_get_villes(df):
+    return sorted(df['Ville'].dropna().unique().tolist())
+
+
+def old_get_communes(df, ville):
+    return sorted(df[df['Ville'] == ville]['Nom de la Commune'].unique().tolist())
+
+
+def timeit(func, repetitions=REPETITIONS):
+    """Temps moyen d'un appel, en microsecondes"""
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        func()
+    return (time.perf_counter() - start) / repetitions * 1e6
+
+
+def run(tailles):
+    print(f"{'lignes':>10} | {'build (ms)':>10} | {'villes old':>11} | {'villes new':>10} "
+          f"| {'communes old':>12} | {'communes new':>12} | {'gain':>8}")
+    print('-' * 92)
+
+    for n_rows in tailles:
+        df = generate_frame(n_rows)
+        ville = df['Ville'].iloc[0]
+
+        start = time.perf_counter()
+        index = DataIndex(df)
+        build_ms = (time.perf_counter() - start) * 1e3
+
+        assert index.get_villes() == old_get_villes(df)
+        assert index.get_communes(ville) == old_get_communes(df, ville)
+
+        repetitions = REPETITIONS if n_rows <= 100_000 else 5
+        villes_old = timeit(lambda: old_get_villes(df), repetitions)
+        villes_new = timeit(index.get_villes)
+        communes_old = timeit(lambda: old_get_communes(df, ville), repetitions)
+        communes_new = timeit(lambda: index.get_communes(ville))
+
+        print(f'{n_rows:>10} | {build_ms:>10.1f} | {villes_old:>9.0f}µs | {villes_new:>8.2f}µs '
+              f'| {communes_old:>10.0f}µs | {communes_new:>10.2f}µs | {communes_old / communes_new:>7.0f}x')
+
+
+if __name__ == '__main__':
+    tailles = [int(arg) for arg in sys.argv[1:]] or TAILLES
+    run(tailles)
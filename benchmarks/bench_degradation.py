@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark et contrôle de non-régression de predict_infrastructure_degradation.
+
+Compare la boucle iterrows d'origine à la version vectorisée : les deux
+sorties doivent être strictement identiques (avec et sans colonne
+etat_actuel, valeurs manquantes comprises). Au-delà de LIMITE_BOUCLE lignes,
+la durée de la boucle est extrapolée.
+
+Usage : python benchmarks/bench_degradation.py [nb_troncons ...]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from synthetic import generate_frame
+from models.resource_optimization import UrbanResourceOptimizer
+
+TAILLES = [10_000, 100_000, 1_000_000]
+LIMITE_BOUCLE = 100_000
+
+
+def reference_degradation(data):
+    """Implémentation d'origine, conservée comme référence"""
+    degradation_rate = 0.05
+
+    predictions = []
+    for _, row in data.iterrows():
+        current_state = row.get('etat_actuel', 0.8)
+
+        future_state = current_state * (1 - degradation_rate) ** 3
+
+        priority = 'Haute' if future_state < 0.5 else 'Moyenne' if future_state < 0.7 else 'Basse'
+
+        predictions.append({
+            'troncon': row['tronçon de voirie'],
+            'etat_actuel': current_state,
+            'etat_pred_3_ans': future_state,
+            'priorite_intervention': priority,
+            'annee_recommandee': 2024 + (3 if priority == 'Haute' else 5)
+        })
+
+    return predictions
+
+
+def same_records(expected, actual):
+    """Égalité stricte, NaN compris"""
+    if len(expected) != len(actual):
+        return False
+    for e, a in zip(expected, actual):
+        if e.keys() != a.keys():
+            return False
+        for key in e:
+            if e[key] != a[key] and not (e[key] != e[key] and a[key] != a[key]):
+                return False
+    return True
+
+
+def with_state(df, seed=1):
+    """Ajoute un état actuel aléatoire, avec 1 % de valeurs manquantes"""
+    rng = np.random.default_rng(seed)
+    state = rng.uniform(0.2, 1.0, len(df))
+    state[rng.random(len(df)) < 0.01] = np.nan
+    return df.assign(etat_actuel=state)
+
+
+def run(tailles):
+    optimizer = UrbanResourceOptimizer()
+
+    # Non-régression sur un petit jeu : sans état (défaut 0.8) puis avec état
+    for sample in (generate_frame(2_000), with_state(generate_frame(2_000))):
+        assert same_records(reference_degradation(sample),
+                            optimizer.predict_infrastructure_degradation(sample))
+    print('Sortie identique à la boucle iterrows ✅\n')
+
+    print(f"{'tronçons':>10} | {'iterrows':>14} | {'records':>9} | {'frame':>9} | {'gain frame':>10}")
+    print('-' * 66)
+    for n_rows in tailles:
+        df = with_state(generate_frame(n_rows))
+
+        sample = df.iloc[:min(n_rows, LIMITE_BOUCLE)]
+        start = time.perf_counter()
+        reference_degradation(sample)
+        loop_s = (time.perf_counter() - start) / len(sample) * n_rows
+        extrapolated = '*' if len(sample) < n_rows else ' '
+
+        start = time.perf_counter()
+        optimizer.predict_infrastructure_degradation(df)
+        records_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        optimizer.predict_infrastructure_degradation(df, output='frame')
+        frame_s = time.perf_counter() - start
+
+        print(f'{n_rows:>10} | {loop_s:>12.2f}s{extrapolated} | {records_s:>8.3f}s | '
+              f'{frame_s:>8.3f}s | {loop_s / frame_s:>9.0f}x')
+
+    print('\n* extrapolé')
+
+
+if __name__ == '__main__':
+    tailles = [int(arg) for arg in sys.argv[1:]] or TAILLES
+    run(tailles)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark : optimize_lighting d'origine contre la version à cache et pagination.
+
+Mesure la durée du clustering, celle d'un appel servi par le cache et la
+taille de la réponse JSON.
+
+Usage : python benchmarks/bench_lighting.py [nb_troncons ...]
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+from sklearn.cluster import KMeans
+from sklearn.preprocessing import StandardScaler
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from synthetic import generate_frame
+from models.features import FeatureMatrix
+from models.resource_optimization import UrbanResourceOptimizer
+
+TAILLES = [10_000, 100_000, 1_000_000]
+
+
+def reference_optimize_lighting(data):
+    """Implémentation d'origine, conservée comme référence"""
+    features = data[['linéaire_ml', 'points_lumineux', 'traffic_estimate']].values
+    features_scaled = StandardScaler().fit_transform(features)
+    clusters = KMeans(n_clusters=3, random_state=42).fit_predict(features_scaled)
+
+    recommendations = []
+    for i in range(3):
+        cluster_data = data[clusters == i]
+        avg_lights = float(cluster_data['points_lumineux'].mean())
+        optimal_lights = max(10, int(cluster_data['linéaire_ml'].mean() / 30))
+        recommendations.append({
+            'cluster': i,
+            'troncons': len(cluster_data),
+            'eclairage_actuel_moyen': avg_lights,
+            'eclairage_recommande': optimal_lights,
+            'economie_potentielle': avg_lights - optimal_lights,
+            'troncons_cibles': cluster_data['tronçon de voirie'].tolist()
+        })
+    return recommendations
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def payload_kb(result):
+    return len(json.dumps(result, ensure_ascii=False).encode('utf-8')) / 1024
+
+
+def run(tailles):
+    print(f"{'tronçons':>10} | {'origine':>9} | {'JSON':>9} | {'nouveau':>9} | {'en cache':>9} | {'JSON':>9}")
+    print('-' * 70)
+    for n_rows in tailles:
+        features = FeatureMatrix(generate_frame(n_rows))
+        optimizer = UrbanResourceOptimizer()
+
+        reference, reference_s = timed(lambda: reference_optimize_lighting(features.frame()))
+        result, fit_s = timed(lambda: optimizer.optimize_lighting(features, cache_key=n_rows))
+        _, cached_s = timed(lambda: optimizer.optimize_lighting(features, cache_key=n_rows))
+
+        # Même partition hors mode mini-lots (numérotation des groupes comprise)
+        if n_rows <= 50_000:
+            assert [r['troncons'] for r in result] == [r['troncons'] for r in reference]
+
+        print(f'{n_rows:>10} | {reference_s:>8.2f}s | {payload_kb(reference):>6.0f} Ko | '
+              f'{fit_s:>8.2f}s | {cached_s * 1e3:>7.2f}ms | {payload_kb(result):>6.1f} Ko')
+
+
+if __name__ == '__main__':
+    tailles = [int(arg) for arg in sys.argv[1:]] or TAILLES
+    run(tailles)
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Test de charge : clients concurrents contre un gunicorn local.
+
+Génère un jeu de données synthétique, démarre `gunicorn app:app` dessus
+(ou vise un serveur existant avec --url), puis chaque client se connecte
+et enchaîne des requêtes tirées selon un mélange pondéré (données,
+recommandations, galerie, miniatures, images). Débit, latences p50/p95/p99
+et erreurs par scénario sont écrits en JSON dans benchmarks/results/.
+
+Usage : python benchmarks/load_test.py [--clients 32] [--duree 30] [--workers 4]
+                                       [--lignes 100000] [--images 500] [--preload]
+        python benchmarks/load_test.py --url http://127.0.0.1:10000 --mot-de-passe ...
+"""
+
+import argparse
+import hashlib
+import http.client
+import json
+import os
+import random
+import secrets
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from urllib.parse import quote, urlencode, urlsplit
+
+ROOT = Path(__file__).resolve().parent.parent
+
+from results import Results, latency_stats
+from synthetic import generate_dataset
+
+# Scénario → poids dans le mélange de requêtes
+SCENARIOS = {
+    'villes': 5,
+    'communes': 10,
+    'indicateurs': 25,
+    'recommandations': 10,
+    'maintenance': 10,
+    'galerie': 10,
+    'miniature': 20,
+    'image': 5,
+    'sante': 5,
+}
+
+
+def train_model(excel_path, model_path):
+    """Modèle de maintenance sur priorités synthétiques, pour le scénario 'maintenance'"""
+    import pandas as pd
+    from bench_app import synthetic_labels
+    from models.features import FeatureMatrix
+    from models.predictive_maintenance import MaintenancePredictor
+
+    features = FeatureMatrix(pd.read_excel(excel_path))
+    MaintenancePredictor(str(model_path)).train(features.values, synthetic_labels(features))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_gunicorn(port, workers, env, preload=False):
+    """Démarre gunicorn et attend que /api/health réponde"""
+    command = [sys.executable, '-m', 'gunicorn', 'app:app', '--workers', str(workers),
+               '--bind', f'127.0.0.1:{port}', '--timeout', '120']
+    if preload:
+        command.append('--preload')
+    server = subprocess.Popen(command, cwd=ROOT, env=env)
+
+    deadline = time.monotonic() + 180
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f'gunicorn arrêté (code {server.returncode})')
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            connection.request('GET', '/api/health')
+            if connection.getresponse().status == 200:
+                return server
+        except OSError:
+            time.sleep(0.5)
+    server.terminate()
+    raise RuntimeError('gunicorn ne répond pas')
+
+
+class Client:
+    """Connexion HTTP persistante avec cookie de session"""
+
+    def __init__(self, base_url, password):
+        url = urlsplit(base_url)
+        self.connection = http.client.HTTPConnection(url.hostname, url.port, timeout=60)
+        self.cookie = None
+        status, _ = self.request('POST', '/login', urlencode({'password': password}),
+                                 {'Content-Type': 'application/x-www-form-urlencoded'})
+        if self.cookie is None:
+            raise RuntimeError(f'Connexion refusée (statut {status})')
+
+    def request(self, method, path, body=None, headers=None):
+        headers = dict(headers or {})
+        if self.cookie:
+            headers['Cookie'] = self.cookie
+        try:
+            self.connection.request(method, path, body, headers)
+            response = self.connection.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            # Connexion fermée par le serveur : une seule nouvelle tentative
+            self.connection.close()
+            self.connection.request(method, path, body, headers)
+            response = self.connection.getresponse()
+            data = response.read()
+        set_cookie = response.getheader('Set-Cookie')
+        if set_cookie and set_cookie.startswith('session='):
+            self.cookie = set_cookie.split(';', 1)[0]
+        return response.status, data
+
+    def get_json(self, path):
+        status, data = self.request('GET', path)
+        if status != 200:
+            raise RuntimeError(f'{path}: statut {status}')
+        return json.loads(data)
+
+
+def discover(client):
+    """Villes, communes et images du serveur, pour paramétrer les scénarios"""
+    villes = client.get_json('/api/villes')
+    villes = villes.get('villes', villes) if isinstance(villes, dict) else villes
+    communes = []
+    for ville in villes:
+        found = client.get_json(f'/api/communes?ville={quote(ville)}')
+        communes.extend(found.get('communes', found) if isinstance(found, dict) else found)
+    images = [image['chemin'] for image in client.get_json('/api/images?limit=1000')['images']]
+    return villes, communes, images
+
+
+def scenario_path(name, rng, villes, communes, images):
+    if name == 'villes':
+        return '/api/villes'
+    if name == 'communes':
+        return f'/api/communes?ville={quote(rng.choice(villes))}'
+    if name == 'indicateurs':
+        return f'/api/indicateurs?commune={quote(rng.choice(communes))}'
+    if name == 'recommandations':
+        return f'/api/ai/smart-recommendations?ville={quote(rng.choice(villes))}'
+    if name == 'maintenance':
+        return f'/api/ai/predict-maintenance?commune={quote(rng.choice(communes))}'
+    if name == 'galerie':
+        return f'/api/images?commune={quote(rng.choice(communes))}'
+    if name == 'miniature':
+        return f'/uploads/{quote(rng.choice(images))}?w=320'
+    if name == 'image':
+        return f'/uploads/{quote(rng.choice(images))}'
+    return '/api/health'
+
+
+def run_clients(base_url, password, n_clients, duration, seed=0):
+    """Enchaîne les scénarios pendant `duration` secondes ; retourne {scénario: [(durée, statut)]}"""
+    discovery = discover(Client(base_url, password))
+    scenarios = [name for name in SCENARIOS if name not in ('miniature', 'image') or discovery[2]]
+    weights = [SCENARIOS[name] for name in scenarios]
+    samples = {name: [] for name in scenarios}
+    lock = threading.Lock()
+    start_barrier = threading.Barrier(n_clients + 1)
+
+    def worker(index):
+        rng = random.Random(seed + index)
+        client = Client(base_url, password)
+        local = {name: [] for name in scenarios}
+        start_barrier.wait()
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            name = rng.choices(scenarios, weights)[0]
+            path = scenario_path(name, rng, *discovery)
+            started = time.perf_counter()
+            try:
+                status, _ = client.request('GET', path, headers={'Accept': 'image/webp,*/*'})
+            except Exception:
+                status = 0
+            local[name].append((time.perf_counter() - started, status))
+        with lock:
+            for name, values in local.items():
+                samples[name].extend(values)
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(n_clients)]
+    for thread in threads:
+        thread.start()
+    start_barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - started
+
+
+def report(results, samples, elapsed):
+    total = sum(len(values) for values in samples.values())
+    errors = sum(1 for values in samples.values() for _, status in values if status >= 400 or status == 0)
+    results.add('charge/debit', total / elapsed, 'req/s')
+    results.add('charge/erreurs', 100 * errors / max(total, 1), '%')
+    for name, values in samples.items():
+        if not values:
+            continue
+        stats = latency_stats([duration for duration, _ in values])
+        for key in ('p50_ms', 'p95_ms', 'p99_ms'):
+            results.add(f'charge/{name}_{key[:-3]}', stats[key], 'ms')
+        failed = sum(1 for _, status in values if status >= 400 or status == 0)
+        if failed:
+            print(f'  ⚠️  {name}: {failed} erreurs sur {len(values)}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge contre un gunicorn local")
+    parser.add_argument('--url', default=None, help='serveur existant (pas de gunicorn lancé)')
+    parser.add_argument('--mot-de-passe', default=None, help='mot de passe du serveur existant')
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--duree', type=float, default=30, help='durée de la charge (s)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='workers gunicorn')
+    parser.add_argument('--preload', action='store_true', help='gunicorn --preload et PRELOAD_MODELS=1')
+    parser.add_argument('--lignes', type=int, default=100_000, help='tronçons du classeur synthétique')
+    parser.add_argument('--images', type=int, default=500, help='photos synthétiques')
+    parser.add_argument('--output', default=None, help='fichier JSON (défaut : benchmarks/results/)')
+    args = parser.parse_args()
+
+    results = Results('charge', {
+        'clients': args.clients, 'duree_s': args.duree, 'workers': args.workers,
+        'preload': args.preload, 'lignes': args.lignes, 'images': args.images, 'url': args.url,
+    })
+
+    if args.url:
+        samples, elapsed = run_clients(args.url, args.mot_de_passe, args.clients, args.duree)
+        report(results, samples, elapsed)
+        results.save(args.output)
+        return
+
+    workdir = Path(tempfile.mkdtemp(prefix='urban_ai_load_'))
+    server = None
+    try:
+        print(f"⏳ Génération: {args.lignes} tronçons, {args.images} photos")
+        excel_path, upload_dir = generate_dataset(workdir, args.lignes, args.images)
+        train_model(excel_path, workdir / 'maintenance_model.pkl')
+        password = secrets.token_hex(8)
+        env = {
+            **os.environ,
+            'EXCEL_PATH': str(excel_path),
+            'UPLOAD_FOLDER': str(upload_dir),
+            'UPLOAD_INDEX_PATH': str(workdir / 'upload_index.sqlite3'),
+            'MAINTENANCE_MODEL_PATH': str(workdir / 'maintenance_model.pkl'),
+            'METRICS_DIR': str(workdir / 'metrics'),
+            'PASSWORD_HASH': hashlib.sha256(password.encode()).hexdigest(),
+            # Même clé de session dans tous les workers
+            'SECRET_KEY': secrets.token_hex(32),
+            'PRELOAD_MODELS': '1' if args.preload else '0',
+        }
+        port = free_port()
+        print(f"⏳ gunicorn: {args.workers} workers sur le port {port}")
+        server = start_gunicorn(port, args.workers, env, args.preload)
+
+        print(f"🚀 Charge: {args.clients} clients pendant {args.duree:.0f}s")
+        samples, elapsed = run_clients(f'http://127.0.0.1:{port}', password, args.clients, args.duree)
+        report(results, samples, elapsed)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+        shutil.rmtree(workdir, ignore_errors=True)
+    results.save(args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Résultats de benchmark au format JSON, comparables d'un commit à l'autre.
+
+Chaque fichier contient l'environnement (commit, Python, cœurs) et une
+liste de mesures {nom, valeur, unite}. La comparaison signale les mesures
+qui se dégradent au-delà d'un seuil :
+
+    python benchmarks/results.py ancien.json nouveau.json [--seuil 0.10]
+
+Code de sortie 1 en cas de régression.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = ROOT / 'benchmarks' / 'results'
+
+# Unités dont une valeur plus grande est meilleure (débits)
+HIGHER_IS_BETTER = {'req/s', 'lignes/s', 'images/s'}
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    return {
+        'commit': git_commit(),
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'plateforme': platform.platform(),
+        'coeurs': os.cpu_count(),
+    }
+
+
+def latency_stats(durations_s):
+    """Moyenne et percentiles (ms) d'une série de durées en secondes"""
+    values = np.asarray(durations_s) * 1e3
+    if not len(values):
+        return {'n': 0}
+    return {
+        'n': int(len(values)),
+        'moyenne_ms': round(float(values.mean()), 3),
+        'p50_ms': round(float(np.percentile(values, 50)), 3),
+        'p95_ms': round(float(np.percentile(values, 95)), 3),
+        'p99_ms': round(float(np.percentile(values, 99)), 3),
+    }
+
+
+class Results:
+    """Mesures d'une exécution de benchmark"""
+
+    def __init__(self, suite, parametres=None):
+        self.suite = suite
+        self.parametres = parametres or {}
+        self.mesures = []
+
+    def add(self, nom, valeur, unite, **details):
+        self.mesures.append({'nom': nom, 'valeur': round(float(valeur), 4), 'unite': unite, **details})
+        print(f'  {nom:<55} {valeur:>12.3f} {unite}')
+
+    def save(self, output=None):
+        """Écrit le JSON (par défaut benchmarks/results/<suite>-<commit>-<date>.json)"""
+        env = environment()
+        if output is None:
+            RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+            output = RESULTS_DIR / f"{self.suite}-{env['commit'] or 'local'}-{time.strftime('%Y%m%d_%H%M%S')}.json"
+        output = Path(output)
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump({'suite': self.suite, 'environnement': env, 'parametres': self.parametres,
+                       'mesures': self.mesures}, f, ensure_ascii=False, indent=2)
+        print(f'📄 Résultats: {output}')
+        return output
+
+
+def compare(old_path, new_path, threshold=0.10):
+    """Affiche l'évolution de chaque mesure ; retourne les régressions"""
+    with open(old_path, encoding='utf-8') as f:
+        old = {m['nom']: m for m in json.load(f)['mesures']}
+    with open(new_path, encoding='utf-8') as f:
+        new = json.load(f)['mesures']
+
+    regressions = []
+    print(f"{'mesure':<55} | {'avant':>10} | {'après':>10} | {'écart':>7}")
+    print('-' * 92)
+    for mesure in new:
+        before = old.get(mesure['nom'])
+        if before is None or not before['valeur']:
+            continue
+        change = mesure['valeur'] / before['valeur'] - 1
+        worse = -change if mesure['unite'] in HIGHER_IS_BETTER else change
+        flag = ' ⚠️' if worse > threshold else ''
+        if flag:
+            regressions.append(mesure['nom'])
+        print(f"{mesure['nom']:<55} | {before['valeur']:>10.3f} | {mesure['valeur']:>10.3f} | "
+              f"{change:>+6.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Comparaison de deux résultats de benchmark")
+    parser.add_argument('ancien')
+    parser.add_argument('nouveau')
+    parser.add_argument('--seuil', type=float, default=0.10, help='dégradation tolérée (0.10 = 10 %%)')
+    args = parser.parse_args()
+
+    regressions = compare(args.ancien, args.nouveau, args.seuil)
+    if regressions:
+        print(f"\n❌ {len(regressions)} régression(s) au-delà de {args.seuil:.0%}")
+        sys.exit(1)
+    print("\n✅ Aucune régression")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Génération de données synthétiques au schéma du classeur indicateurs_urbains.xlsx
+
+Usage :
+    python benchmarks/synthetic.py DOSSIER [--rows 100000] [--images 2000] [--image-size 1280]
+
+crée DOSSIER/indicateurs_urbains.xlsx et les photos des tronçons et des
+taudis dans DOSSIER/uploads/{troncons,taudis}.
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+CLASSES_VOIRIE = np.array(['Primaire', 'Secondaire', 'Tertiaire'], dtype=object)
+
+# Limite de lignes d'une feuille Excel (en-tête compris)
+EXCEL_MAX_ROWS = 1_048_575
+
+
+def generate_frame(n_rows, n_villes=10, communes_par_ville=30, seed=42, n_images=None):
+    """DataFrame synthétique de n_rows tronçons
+
+    n_images : nombre de photos de tronçons distinctes (troncon_<k>.jpg) ;
+    par défaut une photo par commune.
+    """
+    rng = np.random.default_rng(seed)
+    villes = np.array([f'Ville {v}' for v in range(n_villes)], dtype=object)
+    communes = np.array([f'Ville {v} - {c}' for v in range(n_villes)
+                         for c in range(communes_par_ville)], dtype=object)
+    ville_idx = rng.integers(0, n_villes, n_rows)
+    commune_idx = ville_idx * communes_par_ville + rng.integers(0, communes_par_ville, n_rows)
+
+    # Environ un tronçon sur trois est rattaché à une poche de taudis
+    taudis = np.where(rng.random(n_rows) < 0.3,
+                      np.char.add('Quartier ', rng.integers(0, 5000, n_rows).astype(str)).astype(object),
+                      None)
+
+    if n_images is None:
+        images = np.char.add(communes[commune_idx].astype(str), '.jpg').astype(object)
+    else:
+        images = troncon_image_names(n_images)[np.arange(n_rows) % n_images]
+
+    return pd.DataFrame({
+        'Ville': villes[ville_idx],
+        'Nom de la Commune': communes[commune_idx],
+        'Nom de la poche du quartier de taudis': taudis,
+        'superficie de la poche du quartier de taudis': np.where(
+            taudis != None, rng.uniform(0.5, 120, n_rows).round(3), np.nan),  # noqa: E711
+        'présence du nid de poule': rng.integers(0, 2, n_rows).astype(float),
+        'tronçon de voirie': np.char.add('ligne ', np.arange(1, n_rows + 1).astype(str)).astype(object),
+        'linéaire de voirie(ml)': rng.uniform(50, 15000, n_rows).round(),
+        'classe de voirie': CLASSES_VOIRIE[rng.integers(0, 3, n_rows)],
+        'Nombre de point lumineux sur le tronçon': rng.integers(0, 120, n_rows).astype(float),
+        'image_troncon': images,
+        'image_taudis': np.where(taudis != None, 'taudis 1.jpg', None),  # noqa: E711
+    })
+
+
+def troncon_image_names(n_images):
+    return np.array([f'troncon_{k:06d}.jpg' for k in range(n_images)], dtype=object)
+
+
+def write_workbook(path, n_rows, **kwargs):
+    """Écrit un classeur synthétique de n_rows tronçons ; retourne le DataFrame"""
+    if n_rows > EXCEL_MAX_ROWS:
+        raise ValueError(f'Une feuille Excel est limitée à {EXCEL_MAX_ROWS} lignes')
+    df = generate_frame(n_rows, **kwargs)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_excel(path, index=False)
+    return df
+
+
+def render_image(path, size, seed):
+    """Photo de chaussée synthétique : texture basse fréquence et taches sombres
+    (contours détectés par detect_potholes), compressée en JPEG comme une vraie photo"""
+    from PIL import Image, ImageDraw
+
+    rng = np.random.default_rng(seed)
+    height = size * 3 // 4
+    texture = rng.integers(90, 170, (height // 16 + 1, size // 16 + 1, 3), dtype=np.uint8)
+    img = Image.fromarray(texture).resize((size, height), Image.BILINEAR)
+
+    draw = ImageDraw.Draw(img)
+    for _ in range(rng.integers(0, 6)):
+        x, y = rng.integers(0, size), rng.integers(0, height)
+        rx, ry = rng.integers(size // 80 + 4, size // 16 + 8, 2)
+        draw.ellipse((x - rx, y - ry, x + rx, y + ry), fill=tuple(int(v) for v in rng.integers(10, 50, 3)))
+    img.save(path, 'JPEG', quality=85)
+
+
+def generate_images(upload_dir, names, image_type='troncons', size=1280, seed=0, workers=None):
+    """Écrit les photos demandées dans upload_dir/image_type (en parallèle)"""
+    type_dir = Path(upload_dir) / image_type
+    type_dir.mkdir(parents=True, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(lambda item: render_image(type_dir / item[1], size, seed + item[0]),
+                      enumerate(names)))
+    return len(names)
+
+
+def generate_dataset(root, n_rows, n_images=None, image_size=1280, seed=42):
+    """Classeur et photos référencées ; retourne (chemin du classeur, dossier des uploads)"""
+    root = Path(root)
+    excel_path = root / 'indicateurs_urbains.xlsx'
+    upload_dir = root / 'uploads'
+    df = write_workbook(excel_path, n_rows, seed=seed, n_images=n_images)
+    generate_images(upload_dir, sorted(df['image_troncon'].dropna().unique()), 'troncons',
+                    image_size, seed)
+    generate_images(upload_dir, sorted(df['image_taudis'].dropna().unique()), 'taudis',
+                    image_size, seed)
+    return excel_path, upload_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Classeur et photos synthétiques")
+    parser.add_argument('root', help='dossier de sortie')
+    parser.add_argument('--rows', type=int, default=100_000, help='tronçons (1 000 à 1 000 000)')
+    parser.add_argument('--images', type=int, default=None, help='photos de tronçons (défaut : une par commune)')
+    parser.add_argument('--image-size', type=int, default=1280, help='largeur des photos (px)')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    excel_path, upload_dir = generate_dataset(args.root, args.rows, args.images, args.image_size, args.seed)
+    n_images = sum(1 for p in upload_dir.rglob('*.jpg'))
+    print(f"✅ {excel_path} ({args.rows} tronçons) et {n_images} photos dans {upload_dir} "
+          f"en {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+# data_cache.py
+"""
+Cache binaire colonnaire du classeur indicateurs_urbains.xlsx.
+
+La lecture Excel (openpyxl) est l'étape la plus lente du démarrage d'un
+worker. Le DataFrame est donc enregistré à côté du classeur, une colonne par
+fichier .npy, dans un dossier identifié par le SHA-256 du fichier source :
+
+    data/.indicateurs_urbains.xlsx.cache/<sha256>/
+        meta.json      colonnes, types, catégories des colonnes texte
+        col_0.npy      valeurs numériques ou codes des colonnes texte
+        ...
+
+Les .npy sont ouverts en mémoire partagée (mmap), sans analyse : les colonnes
+numériques du DataFrame obtenu sont donc en lecture seule. Le cache est
+reconstruit automatiquement dès que le contenu du classeur change.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CACHE_FORMAT = 1
+META_FILE = 'meta.json'
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """SHA-256 du contenu d'un fichier"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_root(excel_path):
+    """Dossier de cache situé à côté du classeur"""
+    excel_path = Path(excel_path)
+    return excel_path.parent / f'.{excel_path.name}.cache'
+
+
+def load_frame(cache_dir):
+    """Charge un DataFrame depuis un dossier de cache (None si absent)"""
+    cache_dir = Path(cache_dir)
+    try:
+        with open(cache_dir / META_FILE, encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if meta.get('format') != CACHE_FORMAT:
+        return None
+
+    data = {}
+    for i, column in enumerate(meta['columns']):
+        values = np.load(cache_dir / f'col_{i}.npy', mmap_mode='r')
+        categories = column.get('categories')
+        if categories is not None:
+            # Colonne texte : codes entiers → valeurs, -1 = manquant
+            lookup = np.empty(len(categories) + 1, dtype=object)
+            lookup[:-1] = categories
+            lookup[-1] = np.nan
+            values = lookup[values]
+        data[column['name']] = values
+
+    return pd.DataFrame(data, columns=[c['name'] for c in meta['columns']], copy=False)
+
+
+def write_frame(cache_dir, df, source_sha256):
+    """Écrit un DataFrame dans un dossier de cache de façon atomique"""
+    cache_dir = Path(cache_dir)
+    tmp_dir = cache_dir.with_name(f'{cache_dir.name}.tmp-{os.getpid()}')
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    try:
+        columns = []
+        for i, name in enumerate(df.columns):
+            serie = df[name]
+            column = {'name': str(name)}
+            if serie.dtype.kind in 'biufM':
+                values = serie.to_numpy()
+            else:
+                codes, uniques = pd.factorize(serie, use_na_sentinel=True)
+                values = codes.astype(np.int32)
+                column['categories'] = [_to_json(v) for v in uniques]
+            np.save(tmp_dir / f'col_{i}.npy', np.ascontiguousarray(values), allow_pickle=False)
+            columns.append(column)
+
+        meta = {
+            'format': CACHE_FORMAT,
+            'source_sha256': source_sha256,
+            'rows': len(df),
+            'columns': columns,
+        }
+        # meta.json est écrit en dernier : sa présence valide le cache
+        with open(tmp_dir / META_FILE, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+        try:
+            os.rename(tmp_dir, cache_dir)
+        except OSError:
+            # Un autre worker a écrit le même cache entre-temps
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+
+def _to_json(value):
+    """Convertit une catégorie en valeur JSON (types numpy → Python)"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (str, int, float, bool)):
+        return value
+    raise TypeError(f'Valeur non sérialisable en cache: {type(value).__name__}')
+
+
+def _prune(root, keep):
+    """Supprime les caches des anciennes versions du classeur"""
+    for entry in root.iterdir():
+        if entry.name != keep and entry.is_dir() and '.tmp-' not in entry.name:
+            shutil.rmtree(entry, ignore_errors=True)
+
+
+def read_excel_cached(excel_path):
+    """Lit le classeur via le cache colonnaire, reconstruit si le fichier a changé"""
+    digest = file_sha256(excel_path)
+    root = cache_root(excel_path)
+    cache_dir = root / digest
+
+    df = load_frame(cache_dir)
+    if df is not None:
+        logger.info(f"⚡ Données chargées depuis le cache ({digest[:12]})")
+        return df
+
+    df = pd.read_excel(excel_path)
+    try:
+        write_frame(cache_dir, df, digest)
+        _prune(root, keep=digest)
+        logger.info(f"💾 Cache colonnaire écrit: {cache_dir}")
+    except Exception as e:
+        # Le cache est une optimisation : un échec d'écriture n'empêche pas le chargement
+        logger.warning(f"Cache colonnaire non écrit: {e}")
+    return df
@@ -0,0 +1,243 @@
+# data_index.py
+"""
+Index en mémoire des indicateurs urbains.
+
+Les index (ville → communes triées, commune → positions des lignes,
+commune → tronçons / quartiers de taudis) sont construits une seule fois
+au chargement du classeur, afin que les routes de l'API n'aient plus à
+parcourir tout le DataFrame à chaque requête.
+"""
+
+import hashlib
+import json
+import math
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# Colonnes du classeur indicateurs_urbains.xlsx
+COL_VILLE = 'Ville'
+COL_COMMUNE = 'Nom de la Commune'
+COL_TRONCON = 'tronçon de voirie'
+COL_LINEAIRE = 'linéaire de voirie(ml)'
+COL_CLASSE = 'classe de voirie'
+COL_NID_POULE = 'présence du nid de poule'
+COL_POINTS_LUMINEUX = 'Nombre de point lumineux sur le tronçon'
+COL_TAUDIS = 'Nom de la poche du quartier de taudis'
+COL_SUPERFICIE_TAUDIS = 'superficie de la poche du quartier de taudis'
+COL_IMAGE_TRONCON = 'image_troncon'
+COL_IMAGE_TAUDIS = 'image_taudis'
+
+# État publié par DataManager : remplacé d'un bloc lors d'un rechargement, afin
+# qu'une requête ne voie jamais un DataFrame, des index et des features de
+# versions différentes
+DataSnapshot = namedtuple('DataSnapshot', ['df', 'index', 'features', 'signature'])
+
+
+def normalize_columns(df):
+    """Supprime les espaces parasites des en-têtes du classeur (en place)"""
+    df.columns = [c.strip() if isinstance(c, str) else c for c in df.columns]
+    return df
+
+
+def _numeric(df, column):
+    """Colonne convertie en nombres (valeurs non numériques → NaN)"""
+    if column not in df.columns:
+        return pd.Series(np.nan, index=df.index)
+    return pd.to_numeric(df[column], errors='coerce')
+
+
+def _oui_non(df, column):
+    """Colonne Oui/Non ou 1/0 convertie en 1.0 / 0.0 (inconnu → NaN)"""
+    if column not in df.columns:
+        return pd.Series(np.nan, index=df.index)
+    serie = df[column]
+    texte = serie.astype(str).str.strip().str.lower().map({'oui': 1.0, 'non': 0.0})
+    return pd.to_numeric(serie, errors='coerce').clip(0, 1).fillna(texte)
+
+
+def _present(df, column):
+    if column not in df.columns:
+        return pd.Series(False, index=df.index)
+    return df[column].notna()
+
+
+def _json_value(value):
+    """Valeur Python sérialisable (types numpy → natifs, NaN → None)"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def _records(rows, columns):
+    """Convertit des lignes en liste de dicts JSON (NaN → None)"""
+    values = {}
+    for key, col in columns.items():
+        if col in rows.columns:
+            serie = rows[col].astype(object)
+            values[key] = serie.where(serie.notna(), None).tolist()
+        else:
+            values[key] = [None] * len(rows)
+
+    keys = list(values)
+    return [dict(zip(keys, row)) for row in zip(*values.values())]
+
+
+class DataIndex:
+    """Index précalculés sur le DataFrame des indicateurs"""
+
+    TRONCON_FIELDS = {
+        'nom': COL_TRONCON,
+        'image': COL_IMAGE_TRONCON,
+        'lineaire_ml': COL_LINEAIRE,
+        'classe': COL_CLASSE,
+    }
+
+    TAUDIS_FIELDS = {
+        'nom': COL_TAUDIS,
+        'image': COL_IMAGE_TAUDIS,
+        'superficie_m2': COL_SUPERFICIE_TAUDIS,
+    }
+
+    def __init__(self, df):
+        self.df = df
+        self.villes = []
+        self.communes_par_ville = {}
+        self.lignes_par_commune = {}
+
+        self.indicateurs = {}
+
+        # Construits à la première demande puis mémorisés
+        self._troncons = {}
+        self._taudis = {}
+        self._payloads = {}
+
+        self._build()
+
+    def _build(self):
+        """Construit les index ville/commune en une seule passe groupby"""
+        df = self.df
+        if COL_VILLE not in df.columns or COL_COMMUNE not in df.columns:
+            return
+
+        paires = df[[COL_VILLE, COL_COMMUNE]].dropna().drop_duplicates()
+        self.communes_par_ville = {
+            ville: sorted(communes.tolist())
+            for ville, communes in paires.groupby(COL_VILLE, sort=False)[COL_COMMUNE]
+        }
+        self.villes = sorted(df[COL_VILLE].dropna().unique().tolist())
+
+        # Positions (iloc) des lignes de chaque commune
+        self.lignes_par_commune = df.groupby(COL_COMMUNE, sort=False).indices
+        self.indicateurs = self._build_indicateurs()
+
+    def _build_indicateurs(self):
+        """Agrégats de toutes les communes, calculés en un seul groupby"""
+        df = self.df
+        colonnes = pd.DataFrame({
+            'commune': df[COL_COMMUNE],
+            'ville': df[COL_VILLE],
+            'troncon': _present(df, COL_TRONCON),
+            'lineaire': _numeric(df, COL_LINEAIRE),
+            'nid_poule': _oui_non(df, COL_NID_POULE),
+            'points': _numeric(df, COL_POINTS_LUMINEUX),
+            'taudis': _present(df, COL_TAUDIS),
+            'superficie': _numeric(df, COL_SUPERFICIE_TAUDIS),
+        })
+
+        agg = colonnes.groupby('commune', sort=False).agg(
+            ville=('ville', 'first'),
+            nombre_troncons=('troncon', 'sum'),
+            lineaire_total_ml=('lineaire', 'sum'),
+            troncons_nids_poule=('nid_poule', 'sum'),
+            troncons_renseignes=('nid_poule', 'count'),
+            points_lumineux=('points', 'sum'),
+            points_renseignes=('points', 'count'),
+            nombre_quartiers_taudis=('taudis', 'sum'),
+            superficie_taudis_totale=('superficie', 'sum'),
+        )
+
+        # Part des tronçons renseignés présentant des nids de poule
+        agg['part_nids_poule'] = (
+            agg['troncons_nids_poule'] / agg['troncons_renseignes'].replace(0, np.nan)
+        ).round(4)
+
+        # Points lumineux par km de voirie (NaN si l'éclairage n'est pas renseigné)
+        km = (agg['lineaire_total_ml'] / 1000).replace(0, np.nan)
+        agg['densite_eclairage_par_km'] = (agg['points_lumineux'] / km).round(2)
+        agg.loc[agg['points_renseignes'] == 0, ['points_lumineux', 'densite_eclairage_par_km']] = np.nan
+        agg.loc[agg['troncons_renseignes'] == 0, 'troncons_nids_poule'] = np.nan
+        agg['superficie_taudis_totale'] = agg['superficie_taudis_totale'].round(3)
+
+        agg = agg.drop(columns=['troncons_renseignes', 'points_renseignes'])
+        return {
+            commune: {key: _json_value(value) for key, value in valeurs.items()}
+            for commune, valeurs in agg.to_dict('index').items()
+        }
+
+    def get_villes(self):
+        """Liste triée des villes"""
+        return self.villes
+
+    def get_communes(self, ville):
+        """Communes triées d'une ville"""
+        return self.communes_par_ville.get(ville, [])
+
+    def has_commune(self, commune):
+        """Indique si la commune existe dans les données"""
+        return commune in self.lignes_par_commune
+
+    def get_rows(self, commune):
+        """Lignes du DataFrame pour une commune"""
+        positions = self.lignes_par_commune.get(commune)
+        if positions is None:
+            return self.df.iloc[0:0]
+        return self.df.iloc[positions]
+
+    def get_indicateurs(self, commune):
+        """Indicateurs agrégés d'une commune (None si inconnue)"""
+        return self.indicateurs.get(commune)
+
+    def get_indicateurs_json(self, commune):
+        """Réponse JSON de /api/indicateurs et son ETag, sérialisées une seule fois"""
+        payload = self._payloads.get(commune)
+        if payload is None:
+            indicateurs = self.get_indicateurs(commune)
+            if indicateurs is None:
+                return None
+            body = json.dumps({
+                'commune': commune,
+                'indicateurs': indicateurs,
+                'troncons_voirie': self.get_troncons(commune),
+                'quartiers_taudis': self.get_taudis(commune),
+            }, ensure_ascii=False, allow_nan=False, default=_json_value).encode('utf-8')
+            payload = (body, hashlib.sha256(body).hexdigest()[:32])
+            self._payloads[commune] = payload
+        return payload
+
+    def get_troncons(self, commune):
+        """Tronçons de voirie d'une commune"""
+        troncons = self._troncons.get(commune)
+        if troncons is None:
+            troncons = self._select(commune, COL_TRONCON, self.TRONCON_FIELDS)
+            self._troncons[commune] = troncons
+        return troncons
+
+    def get_taudis(self, commune):
+        """Quartiers de taudis d'une commune"""
+        taudis = self._taudis.get(commune)
+        if taudis is None:
+            taudis = self._select(commune, COL_TAUDIS, self.TAUDIS_FIELDS)
+            self._taudis[commune] = taudis
+        return taudis
+
+    def _select(self, commune, key_column, fields):
+        rows = self.get_rows(commune)
+        if key_column not in rows.columns:
+            return []
+        rows = rows[rows[key_column].notna()]
+        return _records(rows, fields)
+
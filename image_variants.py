@@ -0,0 +1,178 @@
+# image_variants.py
+"""
+Variantes redimensionnées des images uploadées (miniatures, taille moyenne).
+
+Une variante est générée une seule fois, à l'upload ou à la première
+demande, puis servie depuis data/uploads/.variants. Son nom contient la
+version de l'original (mtime et taille) : une image remplacée produit de
+nouvelles variantes, et les anciennes sont supprimées.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from werkzeug.security import safe_join
+
+logger = logging.getLogger(__name__)
+
+VARIANTS_DIR = '.variants'
+
+# Largeurs disponibles (?w= est arrondi à la largeur supérieure) ; les
+# miniatures de la galerie et la taille de la fenêtre d'aperçu sont
+# générées dès l'upload
+VARIANT_WIDTHS = (320, 640, 1280)
+UPLOAD_WIDTHS = (320, 1280)
+
+# Format → (format Pillow, type MIME)
+FORMATS = {
+    'webp': ('WEBP', 'image/webp'),
+    'jpeg': ('JPEG', 'image/jpeg'),
+}
+QUALITY = 80
+
+# Threads de génération en arrière-plan : un lot de 200 photos attend dans
+# la file au lieu de lancer 200 threads
+BACKGROUND_WORKERS = 2
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def snap_width(requested):
+    """Plus petite largeur disponible couvrant la largeur demandée"""
+    for width in VARIANT_WIDTHS:
+        if requested <= width:
+            return width
+    return VARIANT_WIDTHS[-1]
+
+
+def choose_format(accept_mimetypes):
+    """WebP si le navigateur l'accepte, JPEG sinon"""
+    return 'webp' if accept_mimetypes['image/webp'] else 'jpeg'
+
+
+def source_path(upload_dir, image_type, filename):
+    """Chemin de l'original, ou None s'il est absent ou hors du dossier"""
+    path = safe_join(str(Path(upload_dir) / image_type), filename)
+    if path is None or not os.path.isfile(path):
+        return None
+    return Path(path)
+
+
+def image_version(mtime_ns, size):
+    """Version d'un original (mtime, taille) : change dès qu'il est remplacé"""
+    return f'{mtime_ns:x}-{size:x}'
+
+
+def _version(stat):
+    return image_version(stat.st_mtime_ns, stat.st_size)
+
+
+def _variant_dir(upload_dir, image_type, width):
+    return Path(upload_dir) / VARIANTS_DIR / image_type / str(width)
+
+
+def render_variant(source, target, width, fmt):
+    """Redimensionne l'original et l'écrit atomiquement dans target"""
+    from PIL import Image, ImageOps
+
+    with Image.open(source) as img:
+        # Décodage JPEG réduit (DCT) au plus près de la taille voulue
+        img.draft('RGB', (width, width))
+        img = ImageOps.exif_transpose(img)
+        if img.mode not in ('RGB', 'RGBA') or (fmt == 'jpeg' and img.mode == 'RGBA'):
+            img = img.convert('RGB')
+        # Réduction seulement : une petite image n'est jamais agrandie
+        img.thumbnail((width, width * 8), Image.LANCZOS)
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(f'{target.name}.tmp-{os.getpid()}-{threading.get_ident()}')
+        try:
+            img.save(tmp_path, FORMATS[fmt][0], quality=QUALITY)
+            os.replace(tmp_path, target)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+
+def get_variant(upload_dir, image_type, filename, width, fmt):
+    """(chemin, ETag) de la variante, générée si besoin ; None si l'original n'existe pas"""
+    source = source_path(upload_dir, image_type, filename)
+    if source is None:
+        return None
+
+    width = snap_width(width)
+    version = _version(source.stat())
+    variant_dir = _variant_dir(upload_dir, image_type, width)
+    target = variant_dir / f'{source.name}.{version}.{fmt}'
+
+    if not target.exists():
+        render_variant(source, target, width, fmt)
+        _remove_old_versions(variant_dir, source.name, version)
+
+    # ETag fort : le contenu ne dépend que de l'original, de la largeur et du format
+    etag = hashlib.sha256(f'{image_type}/{source.name}|{version}|{width}|{fmt}'.encode()).hexdigest()[:32]
+    return target, etag
+
+
+def _remove_old_versions(variant_dir, name, version):
+    """Supprime les variantes d'une version précédente de l'original"""
+    prefix = f'{name}.'
+    for entry in variant_dir.iterdir():
+        if entry.name.startswith(prefix):
+            # Un autre original peut partager le préfixe (ex. « a.jpg.png »)
+            parts = entry.name[len(prefix):].split('.')
+            if len(parts) == 2 and parts[1] in FORMATS and parts[0] != version:
+                try:
+                    entry.unlink()
+                except OSError:
+                    pass
+
+
+def create_upload_variants(upload_dir, image_type, filename):
+    """Génère les variantes usuelles d'une image tout juste uploadée"""
+    for width in UPLOAD_WIDTHS:
+        for fmt in FORMATS:
+            try:
+                get_variant(upload_dir, image_type, filename, width, fmt)
+            except Exception as e:
+                logger.warning(f"Variante {width}px {fmt} non générée pour {filename}: {e}")
+                return
+
+
+def _background_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=BACKGROUND_WORKERS,
+                                           thread_name_prefix='image-variants')
+        return _executor
+
+
+def _reset_executor():
+    # Les threads du pool n'existent pas dans un processus forké
+    global _executor, _executor_lock
+    _executor = None
+    _executor_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_executor)
+
+
+def create_upload_variants_async(upload_dir, image_type, filename):
+    """Génère les variantes en arrière-plan, sans retarder la réponse à l'upload"""
+    return _background_executor().submit(create_upload_variants, upload_dir, image_type, filename)
+
+
+def wait_for_variants():
+    """Attend la fin des générations en arrière-plan (tests, arrêt)"""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
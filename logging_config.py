@@ -1,26 +1,243 @@
-# logging_config.py
-import logging
-from logging.handlers import RotatingFileHandler
-
-def setup_logging():
-    """Configuration des logs pour Hugging Face"""
-    
-    # Créer le dossier logs
-    import os
-    os.makedirs('logs', exist_ok=True)
-    
-    # Configuration
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            RotatingFileHandler(
-                'logs/urban_ai.log',
-                maxBytes=10485760,  # 10MB
-                backupCount=5
-            ),
-            logging.StreamHandler()  # Pour Hugging Face logs
-        ]
-    )
-    
-    return logging.getLogger(__name__)
\ No newline at end of file
+# logging_config.py
+"""
+Journaux non bloquants en lignes JSON.
+
+Les loggers n'écrivent que dans une file (QueueHandler) : le formatage JSON
+et les écritures fichier / console se font dans le thread d'un
+QueueListener, hors des threads de requête. Chaque ligne porte
+l'identifiant de la requête en cours (set_request_id) ; le journal d'accès
+(ACCESS_LOGGER) est échantillonné au-delà d'un débit maximal, les erreurs
+étant toujours gardées.
+
+Après un fork (workers gunicorn avec --preload), le processus enfant
+repart d'une file et d'un thread d'écriture neufs ; un fichier dont le nom
+contient {pid} est ouvert par processus.
+"""
+
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+DEFAULT_LOG_FILE = 'logs/urban_ai.log'
+ACCESS_LOGGER = 'urban_ai.access'
+
+# Lignes en attente d'écriture ; au-delà, les nouvelles lignes sont perdues
+QUEUE_SIZE = 10000
+
+# Attributs propres à LogRecord, exclus des champs supplémentaires
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_request_id = contextvars.ContextVar('request_id', default=None)
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+def set_request_id(request_id):
+    """Identifiant de requête ajouté aux lignes du contexte courant (None : aucun)"""
+    _request_id.set(request_id)
+
+
+def get_request_id():
+    return _request_id.get()
+
+
+class JsonFormatter(logging.Formatter):
+    """Une ligne JSON compacte par enregistrement, champs `extra` compris"""
+
+    def format(self, record):
+        entry = {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(record.created))
+                    + f'.{int(record.msecs):03d}',
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'pid': record.process,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and value is not None:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str, separators=(',', ':'))
+
+
+class RequestIdFilter(logging.Filter):
+    """Ajoute request_id, lu dans le thread qui journalise"""
+
+    def filter(self, record):
+        if getattr(record, 'request_id', None) is None:
+            record.request_id = _request_id.get()
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """Seau à jetons : au plus `rate` lignes par seconde (pointes de `burst`)
+
+    Les lignes WARNING et plus passent toujours. La ligne suivant des lignes
+    ignorées indique leur nombre (champ 'sampled_out').
+    """
+
+    def __init__(self, rate, burst=None):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst or max(rate, 1)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._dropped = 0
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if self.rate <= 0:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1 and record.levelno < logging.WARNING:
+                self._dropped += 1
+                return False
+            self._tokens = max(self._tokens - 1, 0)
+            dropped, self._dropped = self._dropped, 0
+        if dropped:
+            record.sampled_out = dropped
+        return True
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler qui ne bloque jamais : file pleine, la ligne est comptée et perdue"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Message et trace figés dans ce thread ; le formatage JSON se fait à l'écriture
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        if self.dropped:
+            record.queue_dropped, self.dropped = self.dropped, 0
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _Pipeline:
+    """File, handler de file et thread d'écriture d'un processus"""
+
+    def __init__(self, log_file, json_format, access_rate):
+        self.log_file = log_file
+        self.json_format = json_format
+        self.queue_handler = _NonBlockingQueueHandler(queue.Queue(QUEUE_SIZE))
+        self.queue_handler.addFilter(RequestIdFilter())
+        self.access_filter = RateLimitFilter(access_rate)
+        self.listener = None
+        self.start()
+
+    def output_handlers(self):
+        if self.json_format:
+            formatter = JsonFormatter()
+        else:
+            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        handlers = [logging.StreamHandler()]
+        if self.log_file:
+            path = self.log_file.format(pid=os.getpid())
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            handlers.append(RotatingFileHandler(path, maxBytes=10485760, backupCount=5,  # 10MB
+                                                encoding='utf-8'))
+        for handler in handlers:
+            handler.setFormatter(formatter)
+        return handlers
+
+    def start(self):
+        self.listener = QueueListener(self.queue_handler.queue, *self.output_handlers(),
+                                      respect_handler_level=True)
+        self.listener.start()
+
+    def stop(self):
+        """Écrit les lignes en attente et ferme les fichiers"""
+        try:
+            self.listener.stop()
+        except queue.Full:
+            pass
+        for handler in self.listener.handlers:
+            handler.close()
+
+    def after_fork(self):
+        # Le thread d'écriture n'existe pas dans l'enfant et la file a pu être
+        # copiée verrouillée : file et thread neufs, lignes du parent ignorées
+        self.queue_handler.queue = queue.Queue(QUEUE_SIZE)
+        self.queue_handler.dropped = 0
+        if '{pid}' in (self.log_file or ''):
+            for handler in self.listener.handlers:
+                handler.close()
+            handlers = self.output_handlers()
+        else:
+            handlers = self.listener.handlers
+        self.listener = QueueListener(self.queue_handler.queue, *handlers,
+                                      respect_handler_level=True)
+        self.listener.start()
+
+
+def _after_fork_in_child():
+    if _pipeline is not None:
+        _pipeline.after_fork()
+
+
+def _stop_pipeline():
+    if _pipeline is not None:
+        _pipeline.stop()
+
+
+def setup_logging(level=None, log_file=DEFAULT_LOG_FILE, json_format=None, access_rate=None):
+    """Configuration des logs : file d'attente et écriture en arrière-plan
+
+    level : niveau racine (défaut LOG_LEVEL ou INFO).
+    log_file : fichier avec rotation, None = console seule ; '{pid}' dans le
+    nom donne un fichier par processus.
+    json_format : lignes JSON (défaut), False = texte (LOG_FORMAT=text).
+    access_rate : lignes/s du journal d'accès (défaut ACCESS_LOG_RATE ou 50,
+    0 = pas d'échantillonnage).
+    """
+    global _pipeline
+    level = level or os.environ.get('LOG_LEVEL', 'INFO')
+    if json_format is None:
+        json_format = os.environ.get('LOG_FORMAT', 'json') != 'text'
+    if access_rate is None:
+        access_rate = float(os.environ.get('ACCESS_LOG_RATE', 50))
+
+    with _pipeline_lock:
+        if _pipeline is not None:
+            return logging.getLogger(__name__)
+
+        _pipeline = _Pipeline(log_file, json_format, access_rate)
+        root = logging.getLogger()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+            handler.close()
+        root.addHandler(_pipeline.queue_handler)
+        root.setLevel(level)
+        logging.getLogger(ACCESS_LOGGER).addFilter(_pipeline.access_filter)
+
+        atexit.register(_stop_pipeline)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=_after_fork_in_child)
+
+    return logging.getLogger(__name__)
@@ -0,0 +1,361 @@
+# metrics.py
+"""
+Métriques de latence et de débit, exportées au format texte Prometheus.
+
+Chaque processus compte en mémoire (un verrou, un dictionnaire, une
+recherche de bucket par mesure) et publie périodiquement son état dans
+METRICS_DIR/<pid>.json. L'export additionne les fichiers des processus
+vivants : /api/metrics donne la même vue quel que soit le worker gunicorn
+qui répond. Comme le mode multiprocessus de prometheus_client, les
+compteurs et histogrammes d'un processus terminé sont ajoutés à
+METRICS_DIR/archive.json avant la suppression de son fichier : les totaux
+ne baissent pas quand un worker redémarre. Ses jauges sont abandonnées.
+
+L'archive vaut pour une version déployée : le dossier par défaut contient
+l'identifiant de la version (METRICS_RELEASE, ou le commit fourni par
+Render ou Vercel), et les compteurs repartent de zéro au déploiement
+suivant, comme tout redémarrage vu par Prometheus. Sans identifiant, ou
+avec un METRICS_DIR explicite, l'archive dure tant que le dossier existe.
+"""
+
+import bisect
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows : archivage sans verrou inter-processus
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Un dossier par installation et par version déployée : deux applications
+# (ou un benchmark) sur le même hôte ne mélangent pas leurs métriques, et
+# une nouvelle version n'hérite pas des compteurs de la précédente
+BASE_DIR = Path(__file__).resolve().parent
+RELEASE = (os.environ.get('METRICS_RELEASE') or os.environ.get('RENDER_GIT_COMMIT')
+           or os.environ.get('VERCEL_GIT_COMMIT_SHA') or 'local')
+DEFAULT_METRICS_DIR = Path(tempfile.gettempdir()) / \
+    f"urban_ai_metrics_{hashlib.sha256(str(BASE_DIR).encode()).hexdigest()[:12]}" / RELEASE[:40]
+ARCHIVE_FILE = 'archive.json'
+FLUSH_INTERVAL = 10
+
+# Processus archivés dont l'identifiant est conservé (fichier archivé deux fois)
+ARCHIVED_INSTANCES_KEPT = 1000
+
+# Bornes (s) des histogrammes de durée
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+HTTP_REQUESTS = 'urban_ai_http_requests_total'
+HTTP_DURATION = 'urban_ai_http_request_duration_seconds'
+OPERATION_DURATION = 'urban_ai_operation_duration_seconds'
+MODEL_LOAD = 'urban_ai_model_load_seconds'
+RESIDENT_MEMORY = 'urban_ai_process_resident_memory_bytes'
+INFERENCE_REQUESTS = 'urban_ai_inference_requests_total'
+INFERENCE_QUEUE_WAIT = 'urban_ai_inference_queue_wait_seconds'
+INFERENCE_BATCH_SIZE = 'urban_ai_inference_batch_size'
+INFERENCE_BATCH_FILL = 'urban_ai_inference_batch_fill_ratio'
+INFERENCE_BATCH_DURATION = 'urban_ai_inference_batch_duration_seconds'
+
+# Nom → (type, description)
+DEFINITIONS = {
+    HTTP_REQUESTS: ('counter', 'Requêtes HTTP par route, méthode et statut'),
+    HTTP_DURATION: ('histogram', 'Durée des requêtes HTTP par route'),
+    OPERATION_DURATION: ('histogram', 'Durée des opérations internes (modèles, données)'),
+    MODEL_LOAD: ('gauge', 'Durée du dernier chargement de chaque modèle, par processus'),
+    RESIDENT_MEMORY: ('gauge', 'Mémoire résidente de chaque processus'),
+    INFERENCE_REQUESTS: ('counter', "Entrées déposées dans la file d'inférence, acceptées ou rejetées"),
+    INFERENCE_QUEUE_WAIT: ('histogram', "Attente d'une entrée dans la file d'inférence avant son lot"),
+    INFERENCE_BATCH_SIZE: ('histogram', "Nombre d'entrées par lot d'inférence"),
+    INFERENCE_BATCH_FILL: ('histogram', 'Remplissage des lots (taille / taille maximale)'),
+    INFERENCE_BATCH_DURATION: ('histogram', "Durée de l'inférence d'un lot"),
+}
+
+# Bornes des histogrammes qui ne mesurent pas une durée
+HISTOGRAM_BUCKETS = {
+    INFERENCE_BATCH_SIZE: (1, 2, 4, 8, 16, 32, 64, 128),
+    INFERENCE_BATCH_FILL: (0.125, 0.25, 0.5, 0.75, 1),
+}
+
+
+def _key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _merge(counters, histograms, state):
+    """Ajoute les compteurs et histogrammes d'un état JSON aux dictionnaires"""
+    for name, labels, value in state['counters']:
+        key = (name, _key(labels))
+        counters[key] = counters.get(key, 0) + value
+    for name, labels, buckets, total, count in state['histograms']:
+        key = (name, _key(labels))
+        merged = histograms.setdefault(key, [[0] * len(buckets), 0.0, 0])
+        merged[0] = [a + b for a, b in zip(merged[0], buckets)]
+        merged[1] += total
+        merged[2] += count
+
+
+def _empty_archive():
+    return {'instances': [], 'counters': [], 'histograms': []}
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class Metrics:
+    def __init__(self, metrics_dir=DEFAULT_METRICS_DIR, flush_interval=FLUSH_INTERVAL):
+        self.metrics_dir = Path(metrics_dir)
+        self.flush_interval = flush_interval
+        self._reset()
+        # Un worker gunicorn ne doit pas republier les mesures du maître
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        # Après un fork, le verrou a pu être copié dans l'état verrouillé
+        self._counters = {}
+        self._histograms = {}
+        self._gauges = {}
+        self._last_flush = 0.0
+        self._lock = threading.Lock()
+        # Identifie ce processus même si son pid est réutilisé plus tard
+        self._instance = f'{os.getpid()}-{time.time_ns()}'
+        self._published = False
+
+    # ---------- Mesures ----------
+    def inc(self, name, value=1, **labels):
+        key = (name, _key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, _key(labels))
+        bounds = HISTOGRAM_BUCKETS.get(name, BUCKETS)
+        index = bisect.bisect_left(bounds, value)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [[0] * (len(bounds) + 1), 0.0, 0]
+            histogram[0][index] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def set_gauge(self, name, value, **labels):
+        with self._lock:
+            self._gauges[(name, _key(labels))] = value
+
+    @contextmanager
+    def timer(self, name=OPERATION_DURATION, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def timed(self, operation):
+        """Décorateur : durée de chaque appel dans urban_ai_operation_duration_seconds"""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(OPERATION_DURATION, time.perf_counter() - start, operation=operation)
+            return wrapper
+        return decorator
+
+    # ---------- Publication inter-processus ----------
+    def state(self):
+        """État du processus, sérialisable en JSON"""
+        from models.registry import current_rss_bytes
+        self.set_gauge(RESIDENT_MEMORY, current_rss_bytes())
+        with self._lock:
+            return {
+                'instance': self._instance,
+                'counters': [[n, dict(k), v] for (n, k), v in self._counters.items()],
+                'histograms': [[n, dict(k), *h] for (n, k), h in self._histograms.items()],
+                'gauges': [[n, dict(k), v] for (n, k), v in self._gauges.items()],
+            }
+
+    def flush(self):
+        """Publie l'état du processus pour les autres workers (écriture atomique)"""
+        self._last_flush = time.monotonic()
+        self.metrics_dir.mkdir(parents=True, exist_ok=True)
+        target = self.metrics_dir / f'{os.getpid()}.json'
+        if not self._published:
+            # Fichier laissé par un processus terminé dont le pid est réutilisé
+            with self._archive_lock():
+                self._archive(target)
+            self._published = True
+        tmp_path = target.with_name(f'.{target.name}.tmp-{threading.get_ident()}')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state(), f)
+        os.replace(tmp_path, target)
+
+    def maybe_flush(self):
+        """Publie l'état si la dernière publication date de plus de flush_interval"""
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            try:
+                self.flush()
+            except OSError as e:
+                logger.warning(f"Métriques non publiées: {e}")
+
+    @contextmanager
+    def _archive_lock(self):
+        """Verrou exclusif, entre processus, de l'archive"""
+        with open(self.metrics_dir / f'.{ARCHIVE_FILE}.lock', 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    def load_archive(self):
+        """Compteurs et histogrammes cumulés des processus terminés"""
+        path = self.metrics_dir / ARCHIVE_FILE
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return _empty_archive()
+
+    def _archive(self, path):
+        """Ajoute compteurs et histogrammes d'un processus terminé à l'archive, puis supprime son fichier
+
+        Appelé avec le verrou de l'archive.
+        """
+        try:
+            with open(path, encoding='utf-8') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return  # Déjà archivé par un autre worker
+        except ValueError:
+            path.unlink(missing_ok=True)
+            return
+
+        archive = self.load_archive()
+        instance = state.get('instance')
+        if instance not in archive['instances']:
+            counters, histograms = {}, {}
+            _merge(counters, histograms, archive)
+            _merge(counters, histograms, state)
+            archive = {
+                'instances': (archive['instances'] + [instance])[-ARCHIVED_INSTANCES_KEPT:],
+                'counters': [[n, dict(k), v] for (n, k), v in counters.items()],
+                'histograms': [[n, dict(k), *h] for (n, k), h in histograms.items()],
+            }
+            target = self.metrics_dir / ARCHIVE_FILE
+            tmp_path = target.with_name(f'.{target.name}.tmp-{os.getpid()}-{threading.get_ident()}')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(archive, f)
+            os.replace(tmp_path, target)
+        # Un arrêt ici laisse le fichier, mais l'instance est déjà dans l'archive
+        path.unlink(missing_ok=True)
+
+    def collect(self):
+        """(archive, états des processus vivants) ; les processus terminés sont d'abord archivés
+
+        Lu sous le verrou de l'archive : un processus n'est jamais compté
+        à la fois dans l'archive et parmi les vivants, ni oublié entre les deux.
+        Dossier inaccessible (disque plein, nettoyage de /tmp) : l'export
+        continue avec ce qui reste lisible et l'état en mémoire du processus.
+        """
+        own_state = None
+        try:
+            self.flush()
+        except OSError as e:
+            logger.warning(f"Métriques non publiées: {e}")
+            own_state = self.state()
+
+        states, archive = {}, _empty_archive()
+        try:
+            with self._archive_lock():
+                for path in self.metrics_dir.glob('*.json'):
+                    pid = int(path.stem) if path.stem.isdigit() else None
+                    if pid is None:
+                        continue
+                    if not _pid_alive(pid):
+                        try:
+                            self._archive(path)
+                        except OSError as e:
+                            logger.warning(f"Métriques du processus {pid} non archivées: {e}")
+                        continue
+                    try:
+                        with open(path, encoding='utf-8') as f:
+                            states[pid] = json.load(f)
+                    except (OSError, ValueError):
+                        continue
+                archive = self.load_archive()
+        except (OSError, ValueError) as e:
+            logger.warning(f"Métriques des autres processus illisibles: {e}")
+
+        if own_state is not None:
+            states[os.getpid()] = own_state
+        return archive, states
+
+    # ---------- Export ----------
+    def render(self):
+        """Métriques de tous les workers au format texte Prometheus"""
+        counters, histograms, gauges = {}, {}, {}
+        archive, states = self.collect()
+        # Processus terminés : leurs totaux restent dans les compteurs
+        _merge(counters, histograms, archive)
+        for pid, state in states.items():
+            _merge(counters, histograms, state)
+            # Jauges : une série par processus
+            for name, labels, value in state['gauges']:
+                gauges[(name, _key({**labels, 'pid': str(pid)}))] = value
+
+        lines = []
+        for name, (kind, description) in DEFINITIONS.items():
+            series = {'counter': counters, 'histogram': histograms, 'gauge': gauges}[kind]
+            keys = sorted(k for k in series if k[0] == name)
+            if not keys:
+                continue
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} {kind}')
+            for key in keys:
+                labels = dict(key[1])
+                if kind != 'histogram':
+                    lines.append(f'{name}{_format_labels(labels)} {_format_value(series[key])}')
+                    continue
+                buckets, total, count = series[key]
+                cumulative = 0
+                for bound, n in zip((*HISTOGRAM_BUCKETS.get(name, BUCKETS), '+Inf'), buckets):
+                    cumulative += n
+                    lines.append(f'{name}_bucket{_format_labels({**labels, "le": str(bound)})} {cumulative}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(total)}')
+                lines.append(f'{name}_count{_format_labels(labels)} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in sorted(labels.items())) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# Métriques du processus
+metrics = Metrics(os.environ.get('METRICS_DIR', DEFAULT_METRICS_DIR))
@@ -1,47 +1,230 @@
-import os
-import shutil
-from path import Path
-
-def migrate_images():
-    """Migre les images de uploads/ vers data/uploads/"""
-    
-    # Ancien chemin
-    old_uploads = Path('uploads')
-    
-    # Nouveau chemin
-    new_uploads = Path('data/uploads')
-    
-    if not old_uploads.exists():
-        print("❌ Ancien dossier uploads/ non trouvé")
-        return
-    
-    # Créer la nouvelle structure
-    new_uploads.makedirs_p()
-    (new_uploads / 'troncons').makedirs_p()
-    (new_uploads / 'taudis').makedirs_p()
-    
-    # Migrer les images
-    migrated = 0
-    
-    # Migrer troncons
-    old_troncons = old_uploads / 'troncons'
-    if old_troncons.exists():
-        for img in old_troncons.files('*.jpg') + old_troncons.files('*.png'):
-            shutil.copy2(img, new_uploads / 'troncons' / img.name)
-            migrated += 1
-            print(f"✅ Migré: {img.name}")
-    
-    # Migrer taudis
-    old_taudis = old_uploads / 'taudis'
-    if old_taudis.exists():
-        for img in old_taudis.files('*.jpg') + old_taudis.files('*.png'):
-            shutil.copy2(img, new_uploads / 'taudis' / img.name)
-            migrated += 1
-            print(f"✅ Migré: {img.name}")
-    
-    print(f"\n🎉 Migration terminée: {migrated} images migrées")
-    print(f"📁 Ancien: {old_uploads}")
-    print(f"📁 Nouveau: {new_uploads}")
-
-if __name__ == '__main__':
-    migrate_images()
\ No newline at end of file
+#!/usr/bin/env python3
+"""
+Migration des images de uploads/ vers data/uploads/.
+
+Les fichiers (png, jpg, jpeg, gif, webp, sous-dossiers compris) sont
+transférés par un pool de threads : lien physique si la source et la
+destination sont sur le même disque (rename avec --move), sinon copie
+vérifiée par SHA-256. Chaque fichier terminé est ajouté au manifeste
+data/uploads/.migration.jsonl : une relance après interruption saute les
+fichiers déjà migrés, ainsi que ceux déjà présents à l'identique.
+
+Usage : python migrate_images.py [--source uploads] [--dest data/uploads] [--workers 16] [--move]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from data_cache import file_sha256
+from upload_index import DEFAULT_DB_PATH, UploadIndex
+
+BASE_DIR = Path(__file__).parent
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.gif', '.webp'}
+IMAGE_TYPES = ['troncons', 'taudis']
+MANIFEST_NAME = '.migration.jsonl'
+CHUNK_SIZE = 1024 * 1024
+
+
+def list_images(source):
+    """Chemins relatifs des images de troncons/ et taudis/ (dossiers cachés exclus)"""
+    images = []
+    for image_type in IMAGE_TYPES:
+        type_dir = source / image_type
+        if type_dir.is_dir():
+            images.extend(
+                path.relative_to(source) for path in type_dir.rglob('*')
+                if path.suffix.lower() in IMAGE_EXTENSIONS and path.is_file()
+                and not any(part.startswith('.') for part in path.relative_to(type_dir).parts)
+            )
+    return sorted(images)
+
+
+def load_manifest(manifest):
+    """Chemin relatif → entrée des fichiers déjà traités (lignes tronquées ignorées)"""
+    done = {}
+    if not manifest.exists():
+        return done
+    with open(manifest, encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            done[entry['chemin']] = entry
+    return done
+
+
+def end_truncated_line(output):
+    """Termine une ligne laissée incomplète par un arrêt brutal"""
+    if output.exists() and output.stat().st_size:
+        with open(output, 'rb+') as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                f.write(b'\n')
+
+
+def _temp_path(target):
+    return target.with_name(f'.{target.name}.tmp-{os.getpid()}-{threading.get_ident()}')
+
+
+def copy_verified(src, target):
+    """Copie atomique de src vers target ; SHA-256 calculé à la lecture, vérifié à la relecture"""
+    tmp_path = _temp_path(target)
+    digest = hashlib.sha256()
+    try:
+        with open(src, 'rb') as fin, open(tmp_path, 'wb') as fout:
+            for chunk in iter(lambda: fin.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+                fout.write(chunk)
+        shutil.copystat(src, tmp_path)
+        sha256 = digest.hexdigest()
+        if file_sha256(tmp_path) != sha256:
+            raise OSError('somme de contrôle différente après copie')
+        os.replace(tmp_path, target)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return sha256
+
+
+def link_or_copy(src, target):
+    """Lien physique si même disque (aucune donnée copiée), sinon copie vérifiée"""
+    tmp_path = _temp_path(target)
+    try:
+        os.link(src, tmp_path)
+    except OSError:
+        return 'copie', copy_verified(src, target)
+    try:
+        os.replace(tmp_path, target)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return 'lien', None
+
+
+def migrate_file(source, dest, relative_path, move=False):
+    """Migre une image ; exécuté dans un thread du pool"""
+    src, target = source / relative_path, dest / relative_path
+    stat = src.stat()
+    entry = {'chemin': relative_path.as_posix(), 'taille': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    start = time.perf_counter()
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        sha256 = None
+        if target.exists() and target.stat().st_size == stat.st_size:
+            # Déjà présent (migration sans manifeste, upload) : comparaison du contenu
+            sha256 = file_sha256(src)
+            if file_sha256(target) == sha256:
+                entry.update(mode='identique', sha256=sha256)
+                return entry
+        if move and os.stat(target.parent).st_dev == stat.st_dev:
+            os.replace(src, target)
+            mode = 'deplacement'
+        else:
+            mode, copied_sha256 = link_or_copy(src, target)
+            sha256 = copied_sha256 or sha256
+            if move:
+                src.unlink()
+        entry.update(mode=mode, sha256=sha256 or file_sha256(target))
+    except Exception as e:
+        entry['erreur'] = str(e)
+    finally:
+        entry['duree_s'] = round(time.perf_counter() - start, 3)
+    return entry
+
+
+def is_done(entry, source, dest, relative_path):
+    """Fichier migré par une exécution précédente, et inchangé depuis ?"""
+    if entry is None or 'erreur' in entry:
+        return False
+    try:
+        target_size = (dest / relative_path).stat().st_size
+    except OSError:
+        return False
+    try:
+        stat = (source / relative_path).stat()
+    except OSError:
+        # Source déjà déplacée (--move) : la destination fait foi
+        return target_size == entry['taille']
+    return (stat.st_size, stat.st_mtime_ns) == (entry['taille'], entry['mtime_ns']) \
+        and target_size == stat.st_size
+
+
+def migrate_images(source='uploads', dest='data/uploads', workers=None, move=False, index=None):
+    """Migre les images de source vers dest en parallèle, avec reprise sur manifeste"""
+    source, dest = Path(source), Path(dest)
+    if not source.exists():
+        print(f"❌ Ancien dossier {source}/ non trouvé")
+        return 0
+
+    # Créer la nouvelle structure
+    for image_type in IMAGE_TYPES:
+        (dest / image_type).mkdir(parents=True, exist_ok=True)
+
+    manifest = dest / MANIFEST_NAME
+    done = load_manifest(manifest)
+    images = list_images(source)
+    todo = [p for p in images if not is_done(done.get(p.as_posix()), source, dest, p)]
+    print(f"📷 {len(todo)} images à migrer ({len(images) - len(todo)} déjà migrées)")
+    if not todo:
+        return 0
+
+    # Transferts limités par les entrées/sorties : plus de threads que de cœurs
+    workers = workers or min(32, (os.cpu_count() or 1) * 4)
+    modes = {}
+    transferred = 0
+    start = time.perf_counter()
+
+    end_truncated_line(manifest)
+    with open(manifest, 'a', encoding='utf-8') as out, \
+            ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(migrate_file, source, dest, path, move) for path in todo]
+        for count, future in enumerate(as_completed(futures), 1):
+            entry = future.result()
+            out.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            out.flush()
+
+            mode = entry.get('mode', 'erreur')
+            modes[mode] = modes.get(mode, 0) + 1
+            if 'erreur' in entry:
+                print(f"❌ {entry['chemin']}: {entry['erreur']}")
+            else:
+                transferred += entry['taille']
+                # L'index ne couvre que les images servies (premier niveau du dossier)
+                image_type, _, name = entry['chemin'].partition('/')
+                if index is not None and '/' not in name:
+                    index.record_file(dest, image_type, name, sha256=entry['sha256'])
+
+            if count % 100 == 0 or count == len(todo):
+                elapsed = time.perf_counter() - start
+                print(f"  {count}/{len(todo)} images ({count / elapsed:.1f} images/s, "
+                      f"{transferred / 2**20 / elapsed:.1f} Mo/s)")
+
+    elapsed = time.perf_counter() - start
+    print(f"\n🎉 Migration terminée: {len(todo)} images, {transferred / 2**20:.1f} Mo "
+          f"en {elapsed:.1f}s ({', '.join(f'{mode}: {n}' for mode, n in sorted(modes.items()))})")
+    print(f"📁 Ancien: {source}")
+    print(f"📁 Nouveau: {dest}")
+    return len(todo)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migration des images de uploads/ vers data/uploads/")
+    parser.add_argument('--source', default='uploads')
+    parser.add_argument('--dest', default=str(BASE_DIR / 'data' / 'uploads'))
+    parser.add_argument('--workers', type=int, default=None, help='threads (défaut : 4 par cœur, 32 au plus)')
+    parser.add_argument('--move', action='store_true', help='déplacer au lieu de copier')
+    parser.add_argument('--index', default=str(DEFAULT_DB_PATH), help="index des images ('' : aucun)")
+    args = parser.parse_args()
+
+    index = UploadIndex(args.index) if args.index else None
+    migrate_images(args.source, args.dest, args.workers, args.move, index)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+# features.py
+"""
+Features des modèles IA, construites une seule fois par version du classeur.
+
+Les colonnes du classeur (`linéaire de voirie(ml)`, `Nombre de point
+lumineux sur le tronçon`, ...) sont converties en une matrice float32
+contiguë, une ligne par tronçon. L'entraînement, la prédiction par lot et
+l'optimisation des ressources la réutilisent telle quelle, sans renommer ni
+copier le DataFrame à chaque requête.
+"""
+
+import numpy as np
+import pandas as pd
+
+from data_index import COL_CLASSE, COL_LINEAIRE, COL_POINTS_LUMINEUX, COL_TRONCON
+
+# Ordre des colonnes attendu par les modèles
+FEATURES = [
+    'linéaire_ml', 'classe_voirie_encoded',
+    'points_lumineux', 'age_infrastructure',
+    'traffic_estimate', 'precipitation'
+]
+
+CLASSE_VOIRIE_CODES = {'Primaire': 2, 'Secondaire': 1, 'Tertiaire': 0}
+
+# Colonnes facultatives du classeur
+COL_ANNEE_CONSTRUCTION = 'annee_construction'
+COL_PRECIPITATION = 'precipitation'
+
+ANNEE_REFERENCE = 2024
+ANNEE_CONSTRUCTION_DEFAUT = 2010
+
+
+def _column(df, column, default=0.0):
+    """Colonne numérique en float32 (absente ou non numérique → valeur par défaut)"""
+    if column not in df.columns:
+        return np.full(len(df), default, dtype=np.float32)
+    values = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=np.float32, na_value=np.nan)
+    values[np.isnan(values)] = default
+    return values
+
+
+def _classe_codes(df):
+    """Classe de voirie encodée, en ne traduisant que les valeurs distinctes"""
+    if COL_CLASSE not in df.columns:
+        return np.zeros(len(df), dtype=np.float32)
+    codes, uniques = pd.factorize(df[COL_CLASSE])
+    table = np.array([CLASSE_VOIRIE_CODES.get(str(u).strip(), 0) for u in uniques] + [0],
+                     dtype=np.float32)
+    # factorize code les valeurs manquantes -1 : dernière case de la table
+    return table[codes]
+
+
+class FeatureMatrix:
+    """Matrice (tronçons × FEATURES) en float32, ordre C"""
+
+    def __init__(self, df):
+        if COL_TRONCON in df.columns:
+            self.positions = np.flatnonzero(df[COL_TRONCON].notna().to_numpy())
+            self.troncons = df[COL_TRONCON].to_numpy()[self.positions]
+        else:
+            self.positions = np.array([], dtype=np.intp)
+            self.troncons = np.array([], dtype=object)
+
+        points = _column(df, COL_POINTS_LUMINEUX)
+        columns = {
+            'linéaire_ml': _column(df, COL_LINEAIRE),
+            'classe_voirie_encoded': _classe_codes(df),
+            'points_lumineux': points,
+            'age_infrastructure': ANNEE_REFERENCE - _column(df, COL_ANNEE_CONSTRUCTION,
+                                                            ANNEE_CONSTRUCTION_DEFAUT),
+            # Estimation du trafic
+            'traffic_estimate': points * 100,
+            'precipitation': _column(df, COL_PRECIPITATION),
+        }
+
+        # Déjà au format attendu par scikit-learn : predict ne recopie rien
+        self.values = np.empty((len(self.positions), len(FEATURES)), dtype=np.float32)
+        for j, name in enumerate(FEATURES):
+            self.values[:, j] = columns[name][self.positions]
+
+        self._frame = None
+
+    def __len__(self):
+        return len(self.positions)
+
+    def column(self, name):
+        """Vue (sans copie) sur une colonne de la matrice"""
+        return self.values[:, FEATURES.index(name)]
+
+    def frame(self):
+        """DataFrame des features et noms de tronçons, construit sur la matrice"""
+        if self._frame is None:
+            frame = pd.DataFrame(self.values, columns=FEATURES, copy=False)
+            frame[COL_TRONCON] = self.troncons
+            self._frame = frame
+        return self._frame
+
+
+def as_frame(data):
+    """DataFrame de features, que l'on reçoive un DataFrame ou une FeatureMatrix"""
+    return data.frame() if isinstance(data, FeatureMatrix) else data
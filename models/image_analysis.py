@@ -1,61 +1,230 @@
-# image_analysis.py
-import cv2
-import numpy as np
-from tensorflow.keras.models import load_model
-from tensorflow.keras.preprocessing import image
-
-class RoadDefectDetector:
-    def __init__(self, model_path='models/defect_detector.h5'):
-        self.model = load_model(model_path)
-        self.classes = ['bon_etat', 'nids_poule', 'fissures', 'deformation']
-    
-    def preprocess_image(self, img_path):
-        """Prépare l'image pour l'analyse"""
-        img = image.load_img(img_path, target_size=(224, 224))
-        img_array = image.img_to_array(img)
-        img_array = np.expand_dims(img_array, axis=0)
-        img_array /= 255.0
-        
-        return img_array
-    
-    def analyze_road_image(self, img_path):
-        """Analyse une image de route"""
-        processed_img = self.preprocess_image(img_path)
-        predictions = self.model.predict(processed_img)
-        class_idx = np.argmax(predictions[0])
-        
-        return {
-            'etat': self.classes[class_idx],
-            'confiance': float(predictions[0][class_idx]),
-            'details': dict(zip(self.classes, predictions[0].tolist()))
-        }
-    
-    def detect_potholes(self, img_path):
-        """Détection spécifique des nids-de-poule"""
-        img = cv2.imread(img_path)
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        
-        # Détection des contours
-        blurred = cv2.GaussianBlur(gray, (5, 5), 0)
-        edges = cv2.Canny(blurred, 50, 150)
-        
-        # Trouver les contours
-        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        
-        # Filtrer les contours (nids-de-poule)
-        potholes = []
-        for contour in contours:
-            area = cv2.contourArea(contour)
-            if 100 < area < 10000:  # Taille raisonnable pour un nid-de-poule
-                x, y, w, h = cv2.boundingRect(contour)
-                potholes.append({
-                    'position': {'x': x, 'y': y},
-                    'dimensions': {'largeur': w, 'hauteur': h},
-                    'superficie': area
-                })
-        
-        return {
-            'nombre_nids_poule': len(potholes),
-            'superficie_totale': sum(p['superficie'] for p in potholes),
-            'details': potholes
+# image_analysis.py
+import io
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from metrics import metrics
+from models.registry import registry
+from models.result_cache import FileVersion, content_hash, image_bytes
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_PATH = 'models/defect_detector.h5'
+INPUT_SIZE = (224, 224)
+
+# Types d'analyse dans le cache ; la détection des nids-de-poule ne dépend pas
+# du modèle Keras, sa version est celle de l'algorithme
+ANALYSE_KIND = 'analyse'
+POTHOLES_KIND = 'nids_poule'
+POTHOLES_VERSION = 'contours-1'
+
+
+def load_keras_model(model_path):
+    """Charge un modèle Keras (TensorFlow n'est importé qu'ici)"""
+    from tensorflow.keras.models import load_model
+    return load_model(model_path)
+
+
+def load_image_into(img_path, out):
+    """Décode une image et l'écrit, redimensionnée et normalisée, dans `out`"""
+    from PIL import Image
+    
+    # Même prétraitement que keras.preprocessing.image.load_img (RGB, plus proche voisin)
+    with Image.open(img_path) as img:
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        if img.size != INPUT_SIZE:
+            img = img.resize(INPUT_SIZE, Image.NEAREST)
+        out[...] = np.asarray(img)
+    out /= 255.0
+
+
+def registry_name(model_path):
+    """Nom du modèle dans le registre"""
+    return f'defect_detector:{os.path.abspath(model_path)}'
+
+
+def register_defect_detector(model_path=DEFAULT_MODEL_PATH):
+    """Déclare le détecteur dans le registre, sans le charger"""
+    name = registry_name(model_path)
+    registry.register(name, lambda: load_keras_model(model_path))
+    return name
+
+
+class RoadDefectDetector:
+    def __init__(self, model_path=DEFAULT_MODEL_PATH, cache=None):
+        self.model_path = model_path
+        self.model_name = register_defect_detector(model_path)
+        self.classes = ['bon_etat', 'nids_poule', 'fissures', 'deformation']
+        
+        # Cache de résultats (AnalysisCache) optionnel, indexé par version du modèle
+        self.cache = cache
+        self._model_file = FileVersion(model_path)
+        self._loaded_version = None
+    
+    @property
+    def model_version(self):
+        """Empreinte du fichier .h5 ; change dès que le fichier est remplacé"""
+        return self._model_file.get()
+    
+    @property
+    def model(self):
+        """Modèle Keras partagé, chargé une seule fois par processus"""
+        version = self.model_version
+        if self._loaded_version is not None and version != self._loaded_version:
+            logger.info(f"🔄 Nouveau modèle détecté: {self.model_path}")
+            registry.unload(self.model_name)
+        model = registry.get(self.model_name)
+        self._loaded_version = version
+        return model
+    
+    def _read_source(self, source):
+        """Octets d'une image et leur SHA-256 (None si illisible)"""
+        try:
+            data = image_bytes(source)
+        except OSError:
+            return source, None
+        return io.BytesIO(data), content_hash(data)
+    
+    def preprocess_image(self, img_path):
+        """Prépare l'image pour l'analyse"""
+        img_array = np.empty((1, *INPUT_SIZE, 3), dtype=np.float32)
+        load_image_into(img_path, img_array[0])
+        
+        return img_array
+    
+    def format_prediction(self, prediction):
+        """Résultat d'analyse à partir du vecteur de probabilités d'une image"""
+        class_idx = int(np.argmax(prediction))
+        
+        return {
+            'etat': self.classes[class_idx],
+            'confiance': float(prediction[class_idx]),
+            'details': dict(zip(self.classes, prediction.tolist()))
+        }
+    
+    @metrics.timed('analyze_road_image')
+    def analyze_road_image(self, img_path):
+        """Analyse une image de route"""
+        source, digest = self._read_source(img_path)
+        version = self.model_version
+        if self.cache is not None and digest:
+            cached = self.cache.get(ANALYSE_KIND, version, digest)
+            if cached is not None:
+                return cached
+        
+        processed_img = self.preprocess_image(source)
+        predictions = self.model.predict(processed_img, verbose=0)
+        result = self.format_prediction(predictions[0])
+        
+        if self.cache is not None and digest:
+            self.cache.put(ANALYSE_KIND, version, digest, result)
+        return result
+    
+    def _submit_batch(self, pool, img_paths):
+        """Lance le décodage parallèle d'un lot directement dans son tenseur"""
+        batch = np.empty((len(img_paths), *INPUT_SIZE, 3), dtype=np.float32)
+        futures = [pool.submit(load_image_into, path, batch[i]) for i, path in enumerate(img_paths)]
+        return batch, futures
+    
+    @metrics.timed('analyze_road_images')
+    def analyze_road_images(self, img_paths, batch_size=32, workers=None):
+        """Analyse un lot d'images : un seul predict par lot de `batch_size` images
+        
+        Retourne une liste dans l'ordre de `img_paths`, au format de
+        analyze_road_image ; une image illisible donne {'erreur': ...}.
+        """
+        img_paths = list(img_paths)
+        results = [None] * len(img_paths)
+        version = self.model_version
+        
+        workers = workers or min(8, os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # Images déjà analysées : servies depuis le cache, sans décodage
+            todo = list(enumerate(img_paths))
+            digests = {}
+            if self.cache is not None:
+                todo = []
+                for position, (source, digest) in enumerate(pool.map(self._read_source, img_paths)):
+                    cached = self.cache.get(ANALYSE_KIND, version, digest) if digest else None
+                    if cached is not None:
+                        results[position] = cached
+                    else:
+                        todo.append((position, source))
+                        digests[position] = digest
+            
+            chunks = [todo[i:i + batch_size] for i in range(0, len(todo), batch_size)]
+            pending = self._submit_batch(pool, [s for _, s in chunks[0]]) if chunks else None
+            
+            for k, chunk in enumerate(chunks):
+                batch, futures = pending
+                
+                # Le lot suivant est décodé pendant l'inférence du lot courant
+                if k + 1 < len(chunks):
+                    pending = self._submit_batch(pool, [s for _, s in chunks[k + 1]])
+                
+                valid = []
+                for i, future in enumerate(futures):
+                    try:
+                        future.result()
+                        valid.append(i)
+                    except Exception as e:
+                        results[chunk[i][0]] = {'erreur': str(e)}
+                
+                if valid:
+                    tensor = batch if len(valid) == len(futures) else batch[valid]
+                    predictions = self.model.predict(tensor, batch_size=len(valid), verbose=0)
+                    for i, prediction in zip(valid, predictions):
+                        position = chunk[i][0]
+                        results[position] = self.format_prediction(prediction)
+                        if digests.get(position):
+                            self.cache.put(ANALYSE_KIND, version, digests[position], results[position])
+        
+        return results
+    
+    @metrics.timed('detect_potholes')
+    def detect_potholes(self, img_path):
+        """Détection spécifique des nids-de-poule"""
+        source, digest = self._read_source(img_path)
+        if self.cache is not None and digest:
+            cached = self.cache.get(POTHOLES_KIND, POTHOLES_VERSION, digest)
+            if cached is not None:
+                return cached
+        
+        result = self._detect_potholes(source)
+        if self.cache is not None and digest:
+            self.cache.put(POTHOLES_KIND, POTHOLES_VERSION, digest, result)
+        return result
+    
+    def _detect_potholes(self, source):
+        img = cv2.imdecode(np.frombuffer(image_bytes(source), np.uint8), cv2.IMREAD_COLOR)
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        
+        # Détection des contours
+        blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+        edges = cv2.Canny(blurred, 50, 150)
+        
+        # Trouver les contours
+        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        
+        # Filtrer les contours (nids-de-poule)
+        potholes = []
+        for contour in contours:
+            area = cv2.contourArea(contour)
+            if 100 < area < 10000:  # Taille raisonnable pour un nid-de-poule
+                x, y, w, h = cv2.boundingRect(contour)
+                potholes.append({
+                    'position': {'x': x, 'y': y},
+                    'dimensions': {'largeur': w, 'hauteur': h},
+                    'superficie': area
+                })
+        
+        return {
+            'nombre_nids_poule': len(potholes),
+            'superficie_totale': sum(p['superficie'] for p in potholes),
+            'details': potholes
         }
\ No newline at end of file
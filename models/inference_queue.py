@@ -0,0 +1,157 @@
+# inference_queue.py
+"""
+File d'inférence à micro-lots.
+
+Les requêtes concurrentes déposent leur image dans une file ; un thread
+unique regroupe jusqu'à `max_batch_size` images (ou attend au plus
+`max_wait_ms` après la première), lance un seul predict pour le lot et
+résout le Future de chaque appelant. Attente en file, taille, remplissage
+et durée des lots sont publiés dans /api/metrics (label queue).
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+from metrics import (INFERENCE_BATCH_DURATION, INFERENCE_BATCH_FILL, INFERENCE_BATCH_SIZE,
+                     INFERENCE_QUEUE_WAIT, INFERENCE_REQUESTS, metrics)
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """La file d'inférence a atteint sa profondeur maximale"""
+
+
+class BatchingQueue:
+    def __init__(self, predict_batch, max_batch_size=16, max_wait_ms=10, max_queue=256,
+                 name='inference'):
+        """
+        predict_batch : fonction liste d'entrées → liste de résultats (même ordre)
+        name : valeur du label queue des métriques Prometheus
+        """
+        self.predict_batch = predict_batch
+        self.name = name
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_queue = max_queue
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._worker_pid = None
+        self._start_lock = threading.Lock()
+
+        # Métriques
+        self._stats_lock = threading.Lock()
+        self._requests = 0
+        self._rejected = 0
+        self._batches = 0
+        self._batched_items = 0
+        self._queue_latencies = deque(maxlen=1024)
+        self._batch_durations = deque(maxlen=256)
+
+    def submit(self, item):
+        """Dépose une entrée dans la file et retourne son Future"""
+        self._ensure_worker()
+        future = Future()
+        try:
+            self._queue.put_nowait((item, future, time.perf_counter()))
+        except queue.Full:
+            with self._stats_lock:
+                self._rejected += 1
+            metrics.inc(INFERENCE_REQUESTS, queue=self.name, status='rejected')
+            raise QueueFullError(f"File d'inférence pleine ({self.max_queue})")
+
+        with self._stats_lock:
+            self._requests += 1
+        metrics.inc(INFERENCE_REQUESTS, queue=self.name, status='accepted')
+        return future
+
+    def _ensure_worker(self):
+        # Le thread ne survit pas au fork des workers gunicorn
+        if self._worker_pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._worker_pid == os.getpid():
+                return
+            self._worker_pid = os.getpid()
+            threading.Thread(target=self._run, name='inference-batcher', daemon=True).start()
+
+    def _collect(self):
+        """Attend une première entrée, puis complète le lot jusqu'à la taille ou au délai"""
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+
+            # Les Future annulés par l'appelant (timeout) ne sont pas inférés
+            batch = [entry for entry in batch if entry[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            try:
+                results = self.predict_batch([item for item, _, _ in batch])
+                for (_, future, _), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                logger.error(f"Erreur inférence par lot: {e}")
+                for _, future, _ in batch:
+                    future.set_exception(e)
+
+            duration = time.perf_counter() - started
+            waits = [started - queued for _, _, queued in batch]
+            with self._stats_lock:
+                self._batches += 1
+                self._batched_items += len(batch)
+                self._queue_latencies.extend(waits)
+                self._batch_durations.append(duration)
+
+            for wait in waits:
+                metrics.observe(INFERENCE_QUEUE_WAIT, wait, queue=self.name)
+            metrics.observe(INFERENCE_BATCH_SIZE, len(batch), queue=self.name)
+            metrics.observe(INFERENCE_BATCH_FILL, len(batch) / self.max_batch_size, queue=self.name)
+            metrics.observe(INFERENCE_BATCH_DURATION, duration, queue=self.name)
+
+    def metrics(self):
+        """Latence d'attente, remplissage des lots et état de la file"""
+        with self._stats_lock:
+            latencies = np.array(self._queue_latencies) * 1000
+            durations = np.array(self._batch_durations) * 1000
+            batches = self._batches
+            items = self._batched_items
+            requests, rejected = self._requests, self._rejected
+
+        def percentile(values, q):
+            return round(float(np.percentile(values, q)), 2) if len(values) else None
+
+        return {
+            'requetes': requests,
+            'rejetees': rejected,
+            'lots': batches,
+            'profondeur_file': self._queue.qsize(),
+            'taille_moyenne_lot': round(items / batches, 2) if batches else None,
+            'remplissage_moyen_lot': round(items / (batches * self.max_batch_size), 3) if batches else None,
+            'attente_file_ms': {'p50': percentile(latencies, 50), 'p95': percentile(latencies, 95),
+                                'max': percentile(latencies, 100)},
+            'duree_lot_ms': {'p50': percentile(durations, 50), 'p95': percentile(durations, 95)},
+            'config': {'taille_lot_max': self.max_batch_size, 'attente_max_ms': self.max_wait * 1000,
+                       'profondeur_max': self.max_queue},
+        }
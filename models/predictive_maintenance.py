@@ -1,60 +1,224 @@
-# predictive_maintenance.py
-import pandas as pd
-import numpy as np
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-import joblib
-
-class MaintenancePredictor:
-    def __init__(self):
-        self.model = None
-        self.features = [
-            'linéaire_ml', 'classe_voirie_encoded', 
-            'points_lumineux', 'age_infrastructure',
-            'traffic_estimate', 'precipitation'
-        ]
-    
-    def prepare_features(self, df):
-        """Prépare les données pour la prédiction"""
-        # Encodage des classes de voirie
-        class_mapping = {'Primaire': 2, 'Secondaire': 1, 'Tertiaire': 0}
-        df['classe_voirie_encoded'] = df['classe de voirie'].map(class_mapping)
-        
-        # Calcul de l'âge estimé
-        df['age_infrastructure'] = 2024 - df.get('annee_construction', 2010)
-        
-        # Estimation du trafic
-        df['traffic_estimate'] = df['points_lumineux'] * 100  # Estimation
-        
-        return df
-    
-    def train(self, X, y):
-        """Entraîne le modèle"""
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2)
-        
-        self.model = RandomForestClassifier(n_estimators=100, random_state=42)
-        self.model.fit(X_train, y_train)
-        
-        # Sauvegarde du modèle
-        joblib.dump(self.model, 'models/maintenance_model.pkl')
-        
-        return self.model.score(X_test, y_test)
-    
-    def predict_priority(self, troncon_data):
-        """Prédit la priorité de maintenance"""
-        priority_labels = {
-            0: 'Basse priorité',
-            1: 'Priorité moyenne', 
-            2: 'Haute priorité',
-            3: 'Urgence'
-        }
-        
-        prediction = self.model.predict_proba([troncon_data])
-        priority_level = np.argmax(prediction)
-        
-        return {
-            'niveau': priority_level,
-            'label': priority_labels.get(priority_level, 'Inconnu'),
-            'probabilite': float(prediction[0][priority_level]),
-            'details': prediction[0].tolist()
-        }
\ No newline at end of file
+# predictive_maintenance.py
+import pandas as pd
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
+import joblib
+import logging
+import os
+
+from metrics import metrics
+from models.features import FEATURES, FeatureMatrix
+from models.registry import registry
+from models.result_cache import FileVersion
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_PATH = 'models/maintenance_model.pkl'
+
+PRIORITY_LABELS = {
+    0: 'Basse priorité',
+    1: 'Priorité moyenne', 
+    2: 'Haute priorité',
+    3: 'Urgence'
+}
+
+def load_maintenance_model(model_path, mmap_mode='r'):
+    """Charge le modèle sauvegardé par train()
+    
+    mmap_mode='r' lit les tableaux du fichier sans tampon intermédiaire. Les
+    arbres scikit-learn recopient toutefois leurs nœuds : le partage entre
+    workers gunicorn vient du préchargement (PRELOAD_MODELS) avant le fork.
+    """
+    return joblib.load(model_path, mmap_mode=mmap_mode)
+
+
+def registry_name(model_path):
+    """Nom du modèle dans le registre"""
+    return f'maintenance:{os.path.abspath(model_path)}'
+
+
+def register_maintenance_model(model_path=DEFAULT_MODEL_PATH):
+    """Déclare le modèle de maintenance dans le registre, sans le charger"""
+    name = registry_name(model_path)
+    registry.register(name, lambda: load_maintenance_model(model_path))
+    return name
+
+
+class MaintenancePredictor:
+    def __init__(self, model_path=DEFAULT_MODEL_PATH):
+        self.model_path = model_path
+        self.model_name = register_maintenance_model(model_path)
+        self._model = None
+        self._model_file = FileVersion(model_path)
+        self._loaded_version = None
+        self.features = list(FEATURES)
+    
+    @property
+    def model_version(self):
+        """Empreinte du fichier .pkl ; change dès que le modèle est réentraîné"""
+        return self._model_file.get()
+    
+    @property
+    def model(self):
+        """Modèle entraîné dans ce processus, sinon celui du fichier (chargé une fois)"""
+        if self._model is not None:
+            return self._model
+        version = self.model_version
+        if self._loaded_version is not None and version != self._loaded_version:
+            logger.info(f"🔄 Nouveau modèle de maintenance détecté: {self.model_path}")
+            registry.unload(self.model_name)
+        model = registry.get(self.model_name)
+        self._loaded_version = version
+        return model
+    
+    @model.setter
+    def model(self, model):
+        self._model = model
+    
+    def is_available(self):
+        """Indique si un modèle est entraîné ou sauvegardé"""
+        return self._model is not None or os.path.exists(self.model_path)
+    
+    def prepare_features(self, df):
+        """Prépare les données pour la prédiction
+        
+        Retourne une FeatureMatrix (une ligne par tronçon, colonnes
+        self.features) sans modifier le DataFrame du classeur.
+        """
+        return FeatureMatrix(df)
+    
+    def train(self, X, y):
+        """Entraîne le modèle"""
+        if isinstance(X, FeatureMatrix):
+            X = X.values
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2)
+        
+        self.model = RandomForestClassifier(n_estimators=100, random_state=42)
+        self.model.fit(X_train, y_train)
+        
+        # Sauvegarde non compressée : rechargeable en mmap par load_maintenance_model
+        joblib.dump(self.model, self.model_path)
+        registry.unload(self.model_name)
+        
+        return self.model.score(X_test, y_test)
+    
+    @metrics.timed('predict_priority')
+    def predict_priority(self, troncon_data):
+        """Prédit la priorité de maintenance"""
+        return self.predict_priority_batch([troncon_data], as_dicts=True)[0]
+    
+    @metrics.timed('predict_priority_batch')
+    def predict_priority_batch(self, X, n_jobs=None, as_dicts=False):
+        """Prédit la priorité de maintenance de tous les tronçons en un seul appel
+        
+        X : FeatureMatrix, DataFrame (colonnes self.features) ou tableau 2-D.
+        n_jobs : parallélisme (threads) du parcours des arbres, None = défaut joblib.
+        Retourne des tableaux 'niveau', 'label', 'probabilite' et 'details'
+        (probabilités par classe), ou une liste de dicts si as_dicts=True.
+        """
+        if isinstance(X, FeatureMatrix):
+            X = X.values
+        elif isinstance(X, pd.DataFrame):
+            if all(feature in X.columns for feature in self.features):
+                X = X[self.features]
+            # Modèle entraîné sur un tableau sans noms de colonnes
+            if not hasattr(self.model, 'feature_names_in_'):
+                X = X.to_numpy(dtype=np.float32)
+        else:
+            X = np.asarray(X, dtype=np.float32)
+            if X.ndim == 1:
+                X = X.reshape(1, -1)
+        
+        # Le modèle garde n_jobs=None : le contexte joblib fixe le parallélisme
+        with joblib.parallel_backend('threading', n_jobs=n_jobs):
+            proba = self.model.predict_proba(X)
+        
+        levels = proba.argmax(axis=1)
+        label_table = np.array([PRIORITY_LABELS.get(i, 'Inconnu') for i in range(proba.shape[1])],
+                               dtype=object)
+        result = {
+            'niveau': levels,
+            'label': label_table[levels],
+            'probabilite': proba[np.arange(len(levels)), levels],
+            'details': proba
+        }
+        
+        if as_dicts:
+            return [
+                {'niveau': niveau, 'label': label, 'probabilite': probabilite, 'details': details}
+                for niveau, label, probabilite, details in zip(
+                    levels.tolist(), result['label'].tolist(),
+                    result['probabilite'].tolist(), proba.tolist())
+            ]
+        return result
+    
+    @metrics.timed('score_troncons')
+    def score_troncons(self, features, n_jobs=None):
+        """Priorités de tous les tronçons du classeur
+        
+        features : FeatureMatrix (ou DataFrame du classeur, converti ici).
+        Retourne les positions (iloc) des lignes de tronçons et le résultat
+        de predict_priority_batch pour ces lignes.
+        """
+        if not isinstance(features, FeatureMatrix):
+            features = self.prepare_features(features)
+        if not len(features):
+            return features.positions, None
+        return features.positions, self.predict_priority_batch(features, n_jobs=n_jobs)
+
+
+class PriorityScores:
+    """Priorités précalculées de tous les tronçons, pour une version des données et du modèle"""
+    
+    def __init__(self, index, model_version, positions, predictions):
+        self.index = index
+        self.model_version = model_version
+        
+        # Priorité par ligne du DataFrame (-1 : ligne sans tronçon)
+        n_rows = len(index.df)
+        self.niveau = np.full(n_rows, -1, dtype=np.int8)
+        self.probabilite = np.zeros(n_rows, dtype=np.float32)
+        if predictions is not None:
+            self.niveau[positions] = predictions['niveau']
+            self.probabilite[positions] = predictions['probabilite']
+        self._communes = {}
+    
+    def is_current(self, index, model_version):
+        """Indique si les priorités correspondent à ces données et à ce modèle"""
+        return self.index is index and self.model_version == model_version
+    
+    def get_commune(self, commune):
+        """Tronçons d'une commune avec leur priorité (None si commune inconnue)"""
+        payload = self._communes.get(commune)
+        if payload is None:
+            if not self.index.has_commune(commune):
+                return None
+            positions = self.index.lignes_par_commune[commune]
+            positions = positions[self.niveau[positions] >= 0]
+            
+            troncons = [
+                {**troncon, 'prediction_ia': {
+                    'niveau': niveau,
+                    'label': PRIORITY_LABELS.get(niveau, 'Inconnu'),
+                    'probabilite': round(probabilite, 4)
+                }}
+                for troncon, niveau, probabilite in zip(
+                    self.index.get_troncons(commune),
+                    self.niveau[positions].tolist(),
+                    self.probabilite[positions].tolist())
+            ]
+            urgents = sorted(
+                (t for t in troncons if t['prediction_ia']['niveau'] >= 2),
+                key=lambda t: (-t['prediction_ia']['niveau'], -t['prediction_ia']['probabilite'])
+            )
+            payload = {
+                'commune': commune,
+                'troncons_avec_predictions': troncons,
+                'recommandations_globales': {
+                    'troncons_urgents': urgents,
+                    'priorite_max': max((t['prediction_ia']['niveau'] for t in troncons), default=None)
+                }
+            }
+            self._communes[commune] = payload
+        return payload
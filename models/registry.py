@@ -0,0 +1,117 @@
+# registry.py
+"""
+Registre des modèles IA, partagé par tout le processus.
+
+Chaque modèle est chargé une seule fois, à la première utilisation. Avec
+`gunicorn --preload`, les modèles préchargés dans le processus maître
+(variable PRELOAD_MODELS) sont partagés par les workers en copy-on-write.
+"""
+
+import logging
+import os
+import threading
+import time
+
+from metrics import MODEL_LOAD, metrics
+
+logger = logging.getLogger(__name__)
+
+
+def current_rss_bytes():
+    """Mémoire résidente du processus (octets), 0 si indisponible"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        # ru_maxrss : pic mémoire, en Ko sous Linux et en octets sous macOS
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if os.uname().sysname == 'Darwin' else rss * 1024
+    except (ImportError, AttributeError):
+        return 0
+
+
+class ModelRegistry:
+    """Chargement paresseux et unique des modèles, par nom"""
+
+    def __init__(self):
+        self._loaders = {}
+        self._models = {}
+        self._stats = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, loader):
+        """Déclare un modèle et la fonction qui le charge"""
+        with self._lock:
+            self._loaders[name] = loader
+
+    def is_loaded(self, name):
+        """Indique si le modèle est déjà chargé dans ce processus"""
+        return name in self._models
+
+    def get(self, name):
+        """Retourne le modèle, en le chargeant au premier appel"""
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        with self._lock:
+            loader = self._loaders.get(name)
+            lock = self._locks.setdefault(name, threading.Lock())
+
+        if loader is None:
+            raise KeyError(f'Modèle non enregistré: {name}')
+
+        # Un verrou par modèle : deux threads ne chargent jamais le même modèle
+        with lock:
+            model = self._models.get(name)
+            if model is None:
+                model = self._load(name, loader)
+        return model
+
+    def _load(self, name, loader):
+        rss_before = current_rss_bytes()
+        start = time.perf_counter()
+        model = loader()
+        load_time = time.perf_counter() - start
+
+        self._stats[name] = {
+            'load_time_s': round(load_time, 3),
+            'rss_delta_mb': round(max(current_rss_bytes() - rss_before, 0) / 2**20, 1),
+            'pid': os.getpid(),
+        }
+        self._models[name] = model
+        metrics.set_gauge(MODEL_LOAD, load_time, model=name)
+        logger.info(f"🧠 Modèle chargé: {name} en {load_time:.2f}s")
+        return model
+
+    def unload(self, name):
+        """Oublie un modèle chargé (il sera rechargé au prochain get)"""
+        with self._lock:
+            self._models.pop(name, None)
+            self._stats.pop(name, None)
+
+    def preload(self, names=None):
+        """Charge les modèles demandés (tous par défaut) ; à appeler avant le fork"""
+        names = list(self._loaders) if names is None else names
+        for name in names:
+            try:
+                self.get(name)
+            except Exception as e:
+                logger.error(f"Préchargement impossible pour {name}: {e}")
+
+    def stats(self):
+        """État, temps de chargement et empreinte mémoire de chaque modèle"""
+        with self._lock:
+            names = sorted(set(self._loaders) | set(self._models))
+        return {
+            name: {'charge': name in self._models, **self._stats.get(name, {})}
+            for name in names
+        }
+
+
+# Registre unique du processus
+registry = ModelRegistry()
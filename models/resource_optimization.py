@@ -1,63 +1,209 @@
-# resource_optimization.py
-import numpy as np
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
-
-class UrbanResourceOptimizer:
-    def __init__(self):
-        self.scaler = StandardScaler()
-    
-    def optimize_lighting(self, data):
-        """Optimise l'éclairage public"""
-        # Regroupement des tronçons par similarité
-        features = data[['linéaire_ml', 'points_lumineux', 'traffic_estimate']].values
-        features_scaled = self.scaler.fit_transform(features)
-        
-        # Clustering pour regrouper les tronçons similaires
-        kmeans = KMeans(n_clusters=3, random_state=42)
-        clusters = kmeans.fit_predict(features_scaled)
-        
-        # Recommandations par cluster
-        recommendations = []
-        for i in range(3):
-            cluster_data = data[clusters == i]
-            avg_lights = cluster_data['points_lumineux'].mean()
-            avg_length = cluster_data['linéaire_ml'].mean()
-            
-            # Calcul de l'éclairage optimal
-            optimal_lights = max(10, int(avg_length / 30))  # 1 point tous les 30m
-            
-            recommendations.append({
-                'cluster': i,
-                'troncons': len(cluster_data),
-                'eclairage_actuel_moyen': avg_lights,
-                'eclairage_recommande': optimal_lights,
-                'economie_potentielle': avg_lights - optimal_lights,
-                'troncons_cibles': cluster_data['tronçon de voirie'].tolist()
-            })
-        
-        return recommendations
-    
-    def predict_infrastructure_degradation(self, data):
-        """Prédit la dégradation future des infrastructures"""
-        # Simple modèle linéaire pour l'exemple
-        degradation_rate = 0.05  # 5% de dégradation par an
-        
-        predictions = []
-        for _, row in data.iterrows():
-            current_state = row.get('etat_actuel', 0.8)  # 0-1, 1 = parfait
-            age = row.get('age_infrastructure', 10)
-            
-            future_state = current_state * (1 - degradation_rate) ** 3  # 3 ans
-            
-            priority = 'Haute' if future_state < 0.5 else 'Moyenne' if future_state < 0.7 else 'Basse'
-            
-            predictions.append({
-                'troncon': row['tronçon de voirie'],
-                'etat_actuel': current_state,
-                'etat_pred_3_ans': future_state,
-                'priorite_intervention': priority,
-                'annee_recommandee': 2024 + (3 if priority == 'Haute' else 5)
-            })
-        
-        return predictions
\ No newline at end of file
+# resource_optimization.py
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.preprocessing import StandardScaler
+
+from metrics import metrics
+from models.features import ANNEE_REFERENCE, CLASSE_VOIRIE_CODES, as_frame
+
+# Dégradation par défaut : 5 % par an, projetée sur 3 ans
+DEGRADATION_RATE = 0.05
+DEFAULT_HORIZON = 3
+
+# Clustering de l'éclairage
+N_CLUSTERS = 3
+MINIBATCH_THRESHOLD = 50000
+MINIBATCH_SIZE = 4096
+TARGETS_PAGE_SIZE = 100
+MAX_CACHED_FITS = 64
+
+class LightingClusters:
+    """Résultat d'un clustering de l'éclairage : tronçons classés par groupe"""
+    
+    def __init__(self, scaler, kmeans, labels, troncons, recommendations):
+        self.scaler = scaler
+        self.kmeans = kmeans
+        self.recommendations = recommendations
+        self.troncons = troncons
+        
+        # Positions des tronçons triées par groupe : une page = une tranche
+        self.order = np.argsort(labels, kind='stable')
+        self.bounds = np.searchsorted(labels[self.order], np.arange(N_CLUSTERS + 1))
+    
+    def troncons_cibles(self, cluster, offset=0, limit=TARGETS_PAGE_SIZE):
+        """Noms des tronçons d'un groupe, par page (limit=None : tous)"""
+        if not 0 <= cluster < N_CLUSTERS:
+            return []
+        start, end = self.bounds[cluster], self.bounds[cluster + 1]
+        start = min(start + offset, end)
+        if limit is not None:
+            end = min(start + limit, end)
+        return self.troncons[self.order[start:end]].tolist()
+
+
+class UrbanResourceOptimizer:
+    def __init__(self, max_cached_fits=MAX_CACHED_FITS):
+        self.scaler = StandardScaler()
+        self.max_cached_fits = max_cached_fits
+        self._fits = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @metrics.timed('optimize_lighting')
+    def optimize_lighting(self, data, cache_key=None, page_size=TARGETS_PAGE_SIZE):
+        """Optimise l'éclairage public (DataFrame de features ou FeatureMatrix)
+        
+        cache_key : identifiant hashable des données (ex. ville et version du
+        classeur) ; le clustering est alors calculé une seule fois par clé.
+        page_size : nombre de noms de 'troncons_cibles' par groupe (None :
+        tous) ; la suite s'obtient avec get_troncons_cibles.
+        """
+        clusters = self._cached_fit(cache_key) if cache_key is not None else None
+        if clusters is None:
+            clusters = self._fit_lighting(as_frame(data))
+            if cache_key is not None:
+                self._remember_fit(cache_key, clusters)
+        
+        return [
+            {**recommendation,
+             'troncons_cibles': clusters.troncons_cibles(recommendation['cluster'], limit=page_size)}
+            for recommendation in clusters.recommendations
+        ]
+    
+    def get_troncons_cibles(self, cache_key, cluster, offset=0, limit=TARGETS_PAGE_SIZE):
+        """Page de tronçons cibles d'un groupe déjà calculé (None si la clé n'est plus en cache)"""
+        clusters = self._cached_fit(cache_key)
+        if clusters is None:
+            return None
+        return clusters.troncons_cibles(cluster, offset, limit)
+    
+    def _cached_fit(self, cache_key):
+        with self._lock:
+            clusters = self._fits.get(cache_key)
+            if clusters is not None:
+                self._fits.move_to_end(cache_key)
+            return clusters
+    
+    def _remember_fit(self, cache_key, clusters):
+        with self._lock:
+            self._fits[cache_key] = clusters
+            while len(self._fits) > self.max_cached_fits:
+                self._fits.popitem(last=False)
+    
+    def _fit_lighting(self, data):
+        """Regroupe les tronçons et calcule les recommandations de chaque groupe"""
+        # Regroupement des tronçons par similarité
+        features = data[['linéaire_ml', 'points_lumineux', 'traffic_estimate']].values
+        scaler = StandardScaler()
+        features_scaled = scaler.fit_transform(features)
+        self.scaler = scaler
+        
+        # Clustering pour regrouper les tronçons similaires ; au-delà de
+        # MINIBATCH_THRESHOLD tronçons, k-means par mini-lots sur un
+        # échantillon fixe, puis affectation de tous les tronçons
+        if len(features_scaled) > MINIBATCH_THRESHOLD:
+            sample = np.random.default_rng(42).choice(len(features_scaled), MINIBATCH_THRESHOLD,
+                                                      replace=False)
+            kmeans = MiniBatchKMeans(n_clusters=N_CLUSTERS, random_state=42,
+                                     batch_size=MINIBATCH_SIZE, n_init=1)
+            kmeans.fit(features_scaled[sample])
+            labels = kmeans.predict(features_scaled)
+        else:
+            kmeans = KMeans(n_clusters=N_CLUSTERS, random_state=42)
+            labels = kmeans.fit_predict(features_scaled)
+        
+        # Moyennes de tous les groupes en un seul groupby
+        stats = pd.DataFrame({
+            'points_lumineux': data['points_lumineux'].to_numpy(),
+            'lineaire': data['linéaire_ml'].to_numpy(),
+        }).groupby(labels).agg(
+            troncons=('lineaire', 'size'),
+            eclairage_actuel_moyen=('points_lumineux', 'mean'),
+            lineaire_moyen=('lineaire', 'mean'),
+        )
+        
+        # Recommandations par cluster
+        recommendations = []
+        for i, count, avg_lights, avg_length in stats.itertuples():
+            avg_lights = float(avg_lights)
+            
+            # Calcul de l'éclairage optimal
+            optimal_lights = max(10, int(avg_length / 30))  # 1 point tous les 30m
+            
+            recommendations.append({
+                'cluster': int(i),
+                'troncons': int(count),
+                'eclairage_actuel_moyen': avg_lights,
+                'eclairage_recommande': optimal_lights,
+                'economie_potentielle': avg_lights - optimal_lights
+            })
+        
+        troncons = data['tronçon de voirie'].to_numpy()
+        return LightingClusters(scaler, kmeans, labels, troncons, recommendations)
+    
+    @metrics.timed('predict_infrastructure_degradation')
+    def predict_infrastructure_degradation(self, data, horizon=DEFAULT_HORIZON,
+                                           degradation_rate=DEGRADATION_RATE,
+                                           annee_reference=ANNEE_REFERENCE, output='records'):
+        """Prédit la dégradation future des infrastructures
+        
+        Calcul vectorisé sur toutes les lignes à la fois.
+        horizon : nombre d'années de projection.
+        degradation_rate : taux annuel, unique ou par classe de voirie
+        ({'Primaire': 0.04, ...}, classes absentes → DEGRADATION_RATE).
+        output : 'records' (liste de dicts), 'columns' (JSON en colonnes)
+        ou 'frame' (DataFrame).
+        """
+        data = as_frame(data)
+        n_rows = len(data)
+        
+        # État actuel : 0-1, 1 = parfait
+        if 'etat_actuel' in data.columns:
+            current_state = data['etat_actuel'].to_numpy(dtype=np.float64, na_value=np.nan)
+        else:
+            current_state = np.full(n_rows, 0.8)
+        
+        future_state = current_state * (1 - self._degradation_rates(data, degradation_rate)) ** horizon
+        
+        # Comparaisons fausses pour un état inconnu (NaN) : priorité basse
+        priority = np.select([future_state < 0.5, future_state < 0.7], ['Haute', 'Moyenne'],
+                             default='Basse').astype(object)
+        
+        result = pd.DataFrame({
+            'troncon': data['tronçon de voirie'].to_numpy(),
+            'etat_actuel': current_state,
+            f'etat_pred_{horizon}_ans': future_state,
+            'priorite_intervention': priority,
+            'annee_recommandee': annee_reference + np.where(priority == 'Haute', 3, 5)
+        })
+        
+        if output == 'frame':
+            return result
+        columns = {column: result[column].tolist() for column in result.columns}
+        if output == 'columns':
+            return columns
+        return [dict(zip(columns, row)) for row in zip(*columns.values())]
+    
+    def _degradation_rates(self, data, degradation_rate):
+        """Taux de dégradation annuel de chaque ligne"""
+        if not isinstance(degradation_rate, dict):
+            return degradation_rate
+        
+        if 'classe de voirie' in data.columns:
+            classes = data['classe de voirie']
+            rates = degradation_rate
+        elif 'classe_voirie_encoded' in data.columns:
+            # FeatureMatrix : classes déjà encodées
+            classes = data['classe_voirie_encoded']
+            rates = {CLASSE_VOIRIE_CODES[classe]: rate for classe, rate in degradation_rate.items()
+                     if classe in CLASSE_VOIRIE_CODES}
+        else:
+            return DEGRADATION_RATE
+        
+        # Une seule traduction par valeur distincte
+        codes, uniques = pd.factorize(classes)
+        table = np.array([rates.get(u, DEGRADATION_RATE) for u in uniques] + [DEGRADATION_RATE])
+        return table[codes]
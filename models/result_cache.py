@@ -0,0 +1,158 @@
+# result_cache.py
+"""
+Cache des résultats d'analyse d'image, adressé par contenu.
+
+La clé combine le type d'analyse, la version du modèle et le SHA-256 des
+octets de l'image : une même photo renvoyée plusieurs fois n'est inférée
+qu'une seule fois, et un nouveau modèle rend automatiquement les anciennes
+entrées inaccessibles.
+
+Deux niveaux : un LRU borné en mémoire et, en option, un dossier sur disque
+(un fichier JSON par résultat, rangé par version de modèle).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+def image_bytes(source):
+    """Octets d'une image : chemin de fichier ou objet fichier (BytesIO, upload)"""
+    if hasattr(source, 'getvalue'):
+        return source.getvalue()
+    if hasattr(source, 'read'):
+        return source.read()
+    with open(source, 'rb') as f:
+        return f.read()
+
+
+def content_hash(data):
+    """SHA-256 hexadécimal des octets d'une image"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class FileVersion:
+    """Version d'un fichier modèle (SHA-256), recalculée seulement si mtime/taille changent"""
+
+    def __init__(self, path):
+        self.path = path
+        self._signature = None
+        self._version = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Version courante ('absent' si le fichier n'existe pas)"""
+        try:
+            stat = os.stat(self.path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return 'absent'
+
+        if signature != self._signature:
+            with self._lock:
+                if signature != self._signature:
+                    digest = hashlib.sha256()
+                    with open(self.path, 'rb') as f:
+                        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                            digest.update(chunk)
+                    self._version = digest.hexdigest()[:16]
+                    self._signature = signature
+        return self._version
+
+
+class AnalysisCache:
+    def __init__(self, max_entries=2048, disk_dir=None):
+        self.max_entries = max_entries
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._versions = {}
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, kind, version, digest):
+        """Résultat en cache, ou None"""
+        key = (kind, version, digest)
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+
+        result = self._read_disk(kind, version, digest)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, result)
+        return result
+
+    def put(self, kind, version, digest, result):
+        """Enregistre un résultat dans les deux niveaux"""
+        with self._lock:
+            self._remember((kind, version, digest), result)
+        self._write_disk(kind, version, digest, result)
+
+    def _remember(self, key, result):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    # ---------- Niveau disque ----------
+    def _path(self, kind, version, digest):
+        return self.disk_dir / kind / version / digest[:2] / f'{digest}.json'
+
+    def _read_disk(self, kind, version, digest):
+        if self.disk_dir is None:
+            return None
+        try:
+            with open(self._path(kind, version, digest), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, kind, version, digest, result):
+        if self.disk_dir is None:
+            return
+        path = self._path(kind, version, digest)
+        try:
+            self._prune_versions(kind, version)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f'{path.name}.tmp-{os.getpid()}-{threading.get_ident()}')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Cache d'analyse non écrit: {e}")
+
+    def _prune_versions(self, kind, version):
+        """Supprime du disque les résultats des anciennes versions du modèle"""
+        if self._versions.get(kind) == version:
+            return
+        self._versions[kind] = version
+        kind_dir = self.disk_dir / kind
+        if kind_dir.is_dir():
+            for entry in kind_dir.iterdir():
+                if entry.name != version:
+                    shutil.rmtree(entry, ignore_errors=True)
+
+    def stats(self):
+        """Compteurs de succès/échecs du cache"""
+        with self._lock:
+            return {
+                'entrees': len(self._entries),
+                'succes_memoire': self.hits,
+                'succes_disque': self.disk_hits,
+                'echecs': self.misses,
+            }
@@ -0,0 +1,113 @@
+# recommendation_store.py
+"""
+Recommandations précalculées par ville, servies en stale-while-revalidate.
+
+Chaque ville a une réponse JSON déjà sérialisée, calculée par un thread de
+fond : au démarrage, puis dès que la version des données ou des modèles
+change. Une requête reçoit toujours la dernière réponse disponible, même
+périmée, et ne paie jamais le coût des modèles ; elle se contente de
+signaler au thread qu'un recalcul est nécessaire.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+Entry = namedtuple('Entry', ['version', 'body', 'etag', 'computed_at'])
+
+
+class RecommendationStore:
+    def __init__(self, compute, current_version, keys, check_interval=30):
+        """
+        compute : fonction clé → corps JSON (bytes)
+        current_version : fonction → version courante des données et des modèles
+        keys : fonction → clés à précalculer (les villes)
+        """
+        self.compute = compute
+        self.current_version = current_version
+        self.keys = keys
+        self.check_interval = check_interval
+
+        self._entries = {}
+        self._failed = {}
+        self._wakeup = threading.Event()
+        self._worker_pid = None
+        self._start_lock = threading.Lock()
+        self.refreshes = 0
+        self.errors = 0
+
+    def get(self, key):
+        """(Entry, à jour) pour une clé, ou None si elle n'a jamais été calculée"""
+        self.ensure_worker()
+        entry = self._entries.get(key)
+        is_current = entry is not None and entry.version == self.current_version()
+        if not is_current:
+            # Le thread de fond recalcule toutes les clés absentes ou périmées
+            self._wakeup.set()
+        if entry is None:
+            return None
+        return entry, is_current
+
+    def refresh(self, key):
+        """Calcule et enregistre la réponse d'une clé (appel bloquant)"""
+        version = self.current_version()
+        start = time.perf_counter()
+        body = self.compute(key)
+        self._entries[key] = Entry(version, body, hashlib.sha256(body).hexdigest()[:32], time.time())
+        self.refreshes += 1
+        logger.info(f"💡 Recommandations recalculées: {key} en {time.perf_counter() - start:.2f}s")
+
+    def refresh_all(self):
+        """Recalcule les clés absentes ou périmées et oublie celles qui ont disparu"""
+        keys = set(self.keys())
+        for key in set(self._entries) - keys:
+            self._entries.pop(key, None)
+
+        version = self.current_version()
+        stale = {key for key in keys
+                 if (key not in self._entries or self._entries[key].version != version)
+                 and self._failed.get(key) != version}
+        for key in sorted(stale):
+            try:
+                self.refresh(key)
+                self._failed.pop(key, None)
+            except Exception as e:
+                # Pas de nouvel essai avant un changement de version
+                self._failed[key] = version
+                self.errors += 1
+                logger.error(f"Erreur recommandations {key}: {e}")
+
+    def ensure_worker(self):
+        """Démarre le thread de recalcul dans le processus courant"""
+        # Les threads ne survivent pas au fork des workers gunicorn
+        if self._worker_pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._worker_pid == os.getpid():
+                return
+            self._worker_pid = os.getpid()
+            self._wakeup.set()
+            threading.Thread(target=self._run, name='recommendations', daemon=True).start()
+
+    def _run(self):
+        while True:
+            # Réveil sur demande d'une requête, sinon vérification périodique des versions
+            self._wakeup.wait(self.check_interval)
+            self._wakeup.clear()
+            try:
+                self.refresh_all()
+            except Exception as e:
+                logger.error(f"Erreur recalcul des recommandations: {e}")
+
+    def stats(self):
+        """Nombre de réponses en mémoire, de recalculs et d'erreurs"""
+        return {
+            'entrees': len(self._entries),
+            'recalculs': self.refreshes,
+            'erreurs': self.errors,
+        }
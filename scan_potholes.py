@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Scan en masse des nids-de-poule sur les images de data/uploads.
+
+Les images sont réparties sur un pool de processus (un par cœur). Chaque
+résultat est ajouté au fichier JSONL dès qu'il est prêt : un arrêt brutal ne
+perd que les images en cours, et une relance saute les images déjà traitées
+(même chemin, taille et date de modification). Les résultats sont aussi
+enregistrés dans l'index des images (upload_index.py).
+
+Usage : python scan_potholes.py [--workers 8] [--force]
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from upload_index import DEFAULT_DB_PATH, UploadIndex
+
+BASE_DIR = Path(__file__).parent
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.gif', '.webp'}
+IMAGE_TYPES = ['troncons', 'taudis']
+
+_detector = None
+
+
+def list_images(upload_dir):
+    """Images des dossiers troncons/ et taudis/, triées"""
+    images = []
+    for image_type in IMAGE_TYPES:
+        type_dir = upload_dir / image_type
+        if type_dir.is_dir():
+            images.extend(
+                path for path in type_dir.rglob('*')
+                if path.suffix.lower() in IMAGE_EXTENSIONS and path.is_file()
+                and not any(part.startswith('.') for part in path.relative_to(type_dir).parts)
+            )
+    return sorted(images)
+
+
+def scan_key(relative_path, stat):
+    """Identifie une version d'image"""
+    return f'{relative_path}|{stat.st_size}|{stat.st_mtime_ns}'
+
+
+def load_done(output):
+    """Clés des images déjà traitées sans erreur (lignes tronquées ignorées)"""
+    done = set()
+    if not output.exists():
+        return done
+    with open(output, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            # Lignes des anciens scans en décodage réduit (mode supprimé) : à refaire
+            if 'erreur' not in record and record.get('reduction', 1) == 1:
+                done.add(record['cle'].removesuffix('|r1'))
+    return done
+
+
+def end_truncated_line(output):
+    """Termine une ligne laissée incomplète par un arrêt brutal"""
+    if output.exists() and output.stat().st_size:
+        with open(output, 'rb+') as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                f.write(b'\n')
+
+
+def scan_image(path, relative_path, key):
+    """Exécuté dans un processus du pool"""
+    global _detector
+    if _detector is None:
+        # Import dans le worker : OpenCV n'est chargé qu'une fois par processus
+        from models.image_analysis import RoadDefectDetector
+        _detector = RoadDefectDetector()
+
+    record = {'cle': key, 'image': relative_path}
+    start = time.perf_counter()
+    try:
+        result = _detector.detect_potholes(path)
+        record.update({
+            'nombre_nids_poule': result['nombre_nids_poule'],
+            'superficie_totale': result['superficie_totale'],
+            'details': result['details'],
+        })
+    except Exception as e:
+        record['erreur'] = str(e)
+    record['duree_s'] = round(time.perf_counter() - start, 3)
+    return record
+
+
+def index_record(index, record):
+    """Enregistre le résultat d'une image dans l'index des images"""
+    from models.image_analysis import POTHOLES_KIND, POTHOLES_VERSION
+    result = {k: record[k] for k in ('nombre_nids_poule', 'superficie_totale', 'details')}
+    index.record_analysis(POTHOLES_KIND, POTHOLES_VERSION, result, chemin=record['image'])
+
+
+def scan_uploads(upload_dir, output, workers=None, force=False, index=None):
+    """Analyse les images non encore traitées et ajoute les résultats au JSONL"""
+    upload_dir, output = Path(upload_dir), Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    done = set() if force else load_done(output)
+
+    todo = []
+    for path in list_images(upload_dir):
+        relative_path = path.relative_to(upload_dir).as_posix()
+        key = scan_key(relative_path, path.stat())
+        if key not in done:
+            todo.append((str(path), relative_path, key))
+
+    print(f"📷 {len(todo)} images à analyser ({len(done)} déjà traitées)")
+    if not todo:
+        return 0
+
+    workers = workers or os.cpu_count() or 1
+    errors = 0
+    start = time.perf_counter()
+
+    end_truncated_line(output)
+    with open(output, 'a', encoding='utf-8') as out, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(scan_image, *item) for item in todo]
+        for count, future in enumerate(as_completed(futures), 1):
+            record = future.result()
+            errors += 'erreur' in record
+            out.write(json.dumps(record, ensure_ascii=False) + '\n')
+            out.flush()
+            if index is not None and 'erreur' not in record:
+                index_record(index, record)
+            if count % 100 == 0 or count == len(todo):
+                rate = count / (time.perf_counter() - start)
+                print(f"  {count}/{len(todo)} images ({rate:.1f} images/s)")
+
+    print(f"🎉 Scan terminé: {len(todo) - errors} images, {errors} erreurs → {output}")
+    return len(todo)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scan des nids-de-poule sur les images uploadées")
+    parser.add_argument('--uploads', default=str(BASE_DIR / 'data' / 'uploads'))
+    parser.add_argument('--output', default=str(BASE_DIR / 'data' / 'scans' / 'nids_poule.jsonl'))
+    parser.add_argument('--workers', type=int, default=None, help='processus (défaut : nombre de cœurs)')
+    parser.add_argument('--force', action='store_true', help='ré-analyser toutes les images')
+    parser.add_argument('--index', default=str(DEFAULT_DB_PATH), help="index des images ('' : aucun)")
+    args = parser.parse_args()
+
+    index = UploadIndex(args.index) if args.index else None
+    scan_uploads(args.uploads, args.output, args.workers, args.force, index)
+
+
+if __name__ == '__main__':
+    main()
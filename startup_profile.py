@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Profil du démarrage à froid de l'application.
+
+Les phases d'initialisation (données, index des images, préchargement des
+modèles) sont chronométrées avec phase(). Le profil importe l'application
+dans un processus neuf lancé avec `python -X importtime`, envoie les
+premières requêtes (/api/health, /login, puis une requête qui lit les
+données) et affiche :
+
+- le temps d'import par paquet et par module du projet ;
+- les paquets lourds (pandas, scikit-learn, TensorFlow...) déjà chargés
+  quand l'import rend la main ;
+- la durée des phases et des premières requêtes ;
+- le temps jusqu'à la première réponse, comparé au budget.
+
+Usage : python app.py --profile-startup [--mode lazy] [--budget 10]
+        python startup_profile.py [--module api.handler] [--mode background] [--top 15]
+
+Code de sortie 1 si le budget est dépassé.
+"""
+
+import argparse
+import importlib
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+
+# Budget (s) de l'import et de la première réponse ; Vercel coupe à 60 s
+DEFAULT_BUDGET = float(os.environ.get('STARTUP_BUDGET', 10))
+
+# Paquets dont le chargement pendant l'import est signalé
+HEAVY_PACKAGES = ['pandas', 'numpy', 'sklearn', 'scipy', 'joblib', 'tensorflow', 'cv2', 'PIL',
+                  'pyarrow', 'openpyxl']
+
+# Préfixe de la ligne de résultats du processus profilé
+RESULT_MARKER = '@@startup-profile@@'
+IMPORTTIME = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|\s+(\S+)')
+
+# Phases d'initialisation du processus : {phase, debut (perf_counter), duree_s, thread}
+PHASES = []
+_phases_lock = threading.Lock()
+
+
+@contextmanager
+def phase(name):
+    """Chronomètre une phase d'initialisation (lue par le profil)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        with _phases_lock:
+            PHASES.append({'phase': name, 'debut': start, 'duree_s': round(duration, 4),
+                           'thread': threading.current_thread().name})
+
+
+# ---------- Processus profilé ----------
+def profile_child(module_name, wait):
+    """Importe l'application, envoie les premières requêtes ; écrit le résultat en JSON"""
+    t0 = time.perf_counter()
+    module = importlib.import_module(module_name)
+    import_s = time.perf_counter() - t0
+    loaded = sorted(name for name in HEAVY_PACKAGES if name in sys.modules)
+
+    client = module.app.test_client()
+    requests = []
+
+    def first(label, url):
+        start = time.perf_counter()
+        response = client.get(url)
+        response.close()
+        end = time.perf_counter()
+        requests.append({'requete': label, 'statut': response.status_code,
+                         'duree_s': round(end - start, 4), 'depuis_debut_s': round(end - t0, 4)})
+
+    first('GET /api/health', '/api/health')
+    first('GET /login', '/login')
+    with client.session_transaction() as session:
+        session['logged_in'] = True
+    first('GET /api/villes (données)', '/api/villes')
+
+    # Fin du préchauffage en arrière-plan, pour en chronométrer les phases
+    for thread in threading.enumerate():
+        if thread.name in ('warm-up', 'upload-index'):
+            thread.join(wait)
+    # Lancé en script, ce fichier est __main__ : les phases sont dans le module importé
+    phases = list(importlib.import_module('startup_profile').PHASES)
+
+    print(RESULT_MARKER + json.dumps({
+        'module': module_name,
+        'mode': module.app.config.get('STARTUP_MODE'),
+        'import_s': round(import_s, 4),
+        'paquets_lourds_import': loaded,
+        'requetes': requests,
+        'phases': [{**p, 'debut_s': round(p.pop('debut') - t0, 4)} for p in phases],
+    }, ensure_ascii=False), flush=True)
+
+
+# ---------- Rapport ----------
+def parse_importtime(stderr):
+    """Lignes de `-X importtime` → [(module, temps propre µs, temps cumulé µs)]"""
+    entries = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME.match(line)
+        if match:
+            self_us, cumulative_us, name = match.groups()
+            entries.append((name, int(self_us), int(cumulative_us)))
+    return entries
+
+
+def project_modules():
+    """Modules et paquets de premier niveau du dépôt"""
+    names = {path.stem for path in ROOT.glob('*.py')}
+    names.update(path.name for path in ROOT.iterdir() if path.is_dir() and any(path.glob('*.py')))
+    return names
+
+
+def summarize_imports(entries, top):
+    """Temps propre par paquet, et temps cumulé des modules du projet"""
+    by_package = {}
+    for name, self_us, _ in entries:
+        package = name.split('.')[0]
+        by_package[package] = by_package.get(package, 0) + self_us
+    packages = sorted(by_package.items(), key=lambda item: -item[1])[:top]
+
+    ours = project_modules()
+    project = [(name, cumulative_us) for name, _, cumulative_us in entries
+               if name.split('.')[0] in ours]
+    project.sort(key=lambda item: -item[1])
+    return packages, project[:top]
+
+
+def print_report(result, entries, wall_s, budget, top):
+    packages, project = summarize_imports(entries, top)
+    first_response = result['requetes'][0]['depuis_debut_s'] if result['requetes'] else result['import_s']
+
+    print("\n" + "=" * 60)
+    print(f"⏱️  DÉMARRAGE À FROID: {result['module']} (mode {result['mode']})")
+    print("=" * 60)
+    print(f"Processus complet (interpréteur compris): {wall_s:7.3f} s")
+    print(f"Import de l'application:                  {result['import_s']:7.3f} s")
+    print(f"Première réponse:                         {first_response:7.3f} s")
+    heavy = ', '.join(result['paquets_lourds_import']) or 'aucun'
+    print(f"Paquets lourds chargés par l'import:      {heavy}")
+
+    print(f"\n📦 Import par paquet (temps propre, top {top})")
+    for package, self_us in packages:
+        print(f"  {package:<40} {self_us / 1e3:9.1f} ms")
+
+    print("\n🧩 Modules du projet (temps cumulé)")
+    for name, cumulative_us in project:
+        print(f"  {name:<40} {cumulative_us / 1e3:9.1f} ms")
+
+    print("\n🔧 Phases d'initialisation")
+    for p in sorted(result['phases'], key=lambda p: p['debut_s']):
+        print(f"  {p['phase']:<24} début {p['debut_s']:7.3f} s  durée {p['duree_s']:7.3f} s  [{p['thread']}]")
+    if not result['phases']:
+        print("  aucune")
+
+    print("\n🌐 Premières requêtes")
+    for r in result['requetes']:
+        print(f"  {r['requete']:<30} {r['statut']}  {r['duree_s']:7.3f} s  (à {r['depuis_debut_s']:.3f} s)")
+
+    within = first_response <= budget
+    print(f"\n{'✅' if within else '❌'} Première réponse en {first_response:.3f} s "
+          f"(budget {budget:.1f} s)")
+    return within
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profil du démarrage à froid de l'application")
+    parser.add_argument('--module', default='app', help="module exposant `app` (app, api.handler)")
+    parser.add_argument('--mode', choices=['eager', 'background', 'lazy'], default=None,
+                        help='STARTUP_MODE du processus profilé (défaut : environnement)')
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET, help='budget (s) de la première réponse')
+    parser.add_argument('--top', type=int, default=15, help='paquets et modules affichés')
+    parser.add_argument('--attente', type=float, default=120, help='attente max (s) du préchauffage')
+    parser.add_argument('--json', default=None, help='écrit aussi le profil dans ce fichier')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        sys.path.insert(0, str(ROOT))
+        profile_child(args.module, args.attente)
+        return 0
+
+    env = dict(os.environ)
+    if args.mode:
+        env['STARTUP_MODE'] = args.mode
+    command = [sys.executable, '-X', 'importtime', str(Path(__file__).resolve()),
+               '--child', '--module', args.module, '--attente', str(args.attente)]
+    start = time.perf_counter()
+    child = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True)
+    wall_s = time.perf_counter() - start
+
+    lines = [line for line in child.stdout.splitlines() if line.startswith(RESULT_MARKER)]
+    if child.returncode != 0 or not lines:
+        sys.stderr.write(child.stderr[-4000:])
+        print(f"❌ Échec du démarrage de {args.module} (code {child.returncode})")
+        return 2
+
+    result = json.loads(lines[-1][len(RESULT_MARKER):])
+    entries = parse_importtime(child.stderr)
+    within = print_report(result, entries, wall_s, args.budget, args.top)
+    if args.json:
+        packages, project = summarize_imports(entries, args.top)
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({**result, 'processus_s': round(wall_s, 4), 'budget_s': args.budget,
+                       'import_par_paquet_ms': {name: round(us / 1e3, 1) for name, us in packages},
+                       'modules_projet_ms': {name: round(us / 1e3, 1) for name, us in project}},
+                      f, ensure_ascii=False, indent=2)
+    return 0 if within else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
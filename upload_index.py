@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Index SQLite des images uploadées.
+
+Une ligne par image de data/uploads/{troncons,taudis} : chemin, type,
+ville / commune / tronçon, taille, dimensions, SHA-256 et résultats
+d'analyse. Les galeries et les analyses interrogent l'index au lieu de
+lister et de comparer les noms de fichiers du disque.
+
+L'index est alimenté par l'upload, migrate_images.py et scan_potholes.py,
+et peut être reconstruit entièrement depuis le disque :
+
+    python upload_index.py rebuild [--uploads data/uploads] [--excel data/indicateurs_urbains.xlsx]
+"""
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+# data_cache et data_index (pandas) sont importés à l'usage : l'application
+# ouvre l'index sans attendre pandas
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).parent
+DEFAULT_DB_PATH = BASE_DIR / 'data' / 'upload_index.sqlite3'
+IMAGE_TYPES = ['troncons', 'taudis']
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.gif', '.webp'}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    chemin TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    nom TEXT NOT NULL,
+    ville TEXT,
+    commune TEXT,
+    troncon TEXT,
+    taille INTEGER,
+    largeur INTEGER,
+    hauteur INTEGER,
+    sha256 TEXT,
+    mtime_ns INTEGER,
+    analyses TEXT NOT NULL DEFAULT '{}',
+    maj_le REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_images_commune ON images (commune, type);
+CREATE INDEX IF NOT EXISTS idx_images_ville ON images (ville, type);
+CREATE INDEX IF NOT EXISTS idx_images_troncon ON images (troncon);
+CREATE INDEX IF NOT EXISTS idx_images_nom ON images (type, nom);
+CREATE INDEX IF NOT EXISTS idx_images_sha256 ON images (sha256);
+"""
+
+
+def image_size(path):
+    """(largeur, hauteur) lues dans l'en-tête de l'image, (None, None) si illisible"""
+    try:
+        from PIL import Image
+        with Image.open(path) as img:
+            return img.size
+    except Exception:
+        return None, None
+
+
+class UploadIndex:
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.db_path = Path(db_path)
+        self._local = threading.local()
+
+    def connect(self):
+        """Connexion du thread courant (une par thread et par processus)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), timeout=30)
+            conn.row_factory = sqlite3.Row
+            # WAL : lectures des workers gunicorn non bloquées par une écriture
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    # ---------- Écriture ----------
+    def record_file(self, upload_dir, image_type, filename, sha256=None,
+                    ville=None, commune=None, troncon=None):
+        """Indexe (ou met à jour) une image présente sur le disque"""
+        from data_cache import file_sha256
+        path = Path(upload_dir) / image_type / filename
+        stat = path.stat()
+        largeur, hauteur = image_size(path)
+        row = {
+            'chemin': f'{image_type}/{filename}',
+            'type': image_type,
+            'nom': filename,
+            'ville': ville,
+            'commune': commune,
+            'troncon': troncon,
+            'taille': stat.st_size,
+            'largeur': largeur,
+            'hauteur': hauteur,
+            'sha256': sha256 or file_sha256(path),
+            'mtime_ns': stat.st_mtime_ns,
+        }
+        self.upsert([row])
+        return row
+
+    def upsert(self, rows):
+        """Insère ou met à jour des lignes ; rattachement et analyses sont conservés
+        si la nouvelle ligne ne les précise pas (analyses effacées si le contenu change)"""
+        now = time.time()
+        conn = self.connect()
+        with conn:
+            conn.executemany("""
+                INSERT INTO images (chemin, type, nom, ville, commune, troncon, taille,
+                                    largeur, hauteur, sha256, mtime_ns, analyses, maj_le)
+                VALUES (:chemin, :type, :nom, :ville, :commune, :troncon, :taille,
+                        :largeur, :hauteur, :sha256, :mtime_ns, :analyses, :maj_le)
+                ON CONFLICT (chemin) DO UPDATE SET
+                    ville = COALESCE(excluded.ville, images.ville),
+                    commune = COALESCE(excluded.commune, images.commune),
+                    troncon = COALESCE(excluded.troncon, images.troncon),
+                    taille = excluded.taille,
+                    largeur = excluded.largeur,
+                    hauteur = excluded.hauteur,
+                    analyses = CASE WHEN images.sha256 IS excluded.sha256
+                                    THEN images.analyses ELSE excluded.analyses END,
+                    sha256 = excluded.sha256,
+                    mtime_ns = excluded.mtime_ns,
+                    maj_le = excluded.maj_le
+            """, [{'analyses': '{}', 'maj_le': now, **row} for row in rows])
+
+    def record_analysis(self, kind, version, result, chemin=None, sha256=None):
+        """Enregistre un résultat d'analyse pour une image (par chemin) ou pour
+        toutes les images d'un même contenu (par SHA-256)"""
+        column, value = ('chemin', chemin) if chemin is not None else ('sha256', sha256)
+        conn = self.connect()
+        with conn:
+            cursor = conn.execute(f"""
+                UPDATE images SET analyses = json_set(analyses, '$.' || ?, json(?)), maj_le = ?
+                WHERE {column} = ?
+            """, (kind, json.dumps({'version': version, 'resultat': result}, ensure_ascii=False),
+                  time.time(), value))
+        return cursor.rowcount
+
+    def link_workbook(self, df):
+        """Rattache les images référencées par le classeur à leur ville, commune et tronçon"""
+        links = workbook_links(df)
+        conn = self.connect()
+        with conn:
+            conn.executemany("""
+                UPDATE images SET ville = ?, commune = ?, troncon = ?
+                WHERE type = ? AND nom = ?
+            """, [(*link, image_type, nom) for (image_type, nom), link in links.items()])
+        return len(links)
+
+    def remove_missing(self, chemins):
+        """Supprime les lignes dont le fichier n'existe plus"""
+        conn = self.connect()
+        with conn:
+            conn.executemany('DELETE FROM images WHERE chemin = ?', [(c,) for c in chemins])
+
+    # ---------- Lecture ----------
+    def _query(self, sql, params=()):
+        rows = self.connect().execute(sql, params).fetchall()
+        return [{**dict(row), 'analyses': json.loads(row['analyses'])} for row in rows]
+
+    def get(self, chemin):
+        """Ligne d'une image, ou None"""
+        rows = self._query('SELECT * FROM images WHERE chemin = ?', (chemin,))
+        return rows[0] if rows else None
+
+    def find(self, image_type=None, ville=None, commune=None, troncon=None, limit=None, offset=0):
+        """Images filtrées par type et rattachement (requêtes indexées)"""
+        conditions, params = [], []
+        for column, value in (('type', image_type), ('ville', ville),
+                              ('commune', commune), ('troncon', troncon)):
+            if value is not None:
+                conditions.append(f'{column} = ?')
+                params.append(value)
+        sql = 'SELECT * FROM images'
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        sql += ' ORDER BY chemin LIMIT ? OFFSET ?'
+        params += [-1 if limit is None else limit, offset]
+        return self._query(sql, params)
+
+    def find_by_sha256(self, sha256):
+        """Images ayant ce contenu"""
+        return self._query('SELECT * FROM images WHERE sha256 = ? ORDER BY chemin', (sha256,))
+
+    def all_signatures(self):
+        """chemin → (taille, mtime_ns, sha256, largeur, hauteur) de toutes les images indexées"""
+        rows = self.connect().execute(
+            'SELECT chemin, taille, mtime_ns, sha256, largeur, hauteur FROM images')
+        return {row['chemin']: (row['taille'], row['mtime_ns'], row['sha256'],
+                                row['largeur'], row['hauteur'])
+                for row in rows}
+
+    def stats(self):
+        """Nombre d'images par type"""
+        rows = self.connect().execute('SELECT type, COUNT(*) AS n FROM images GROUP BY type')
+        return {row['type']: row['n'] for row in rows}
+
+
+def workbook_links(df):
+    """Rattachement des images au classeur : nom → (ville, commune, tronçon)
+
+    Une image partagée par plusieurs tronçons n'est rattachée qu'à sa
+    commune (ou à sa ville si elle couvre plusieurs communes).
+    """
+    from data_index import (COL_COMMUNE, COL_IMAGE_TAUDIS, COL_IMAGE_TRONCON, COL_TAUDIS,
+                            COL_TRONCON, COL_VILLE)
+    links = {}
+    for image_type, image_col, name_col in (('troncons', COL_IMAGE_TRONCON, COL_TRONCON),
+                                            ('taudis', COL_IMAGE_TAUDIS, COL_TAUDIS)):
+        if image_col not in df.columns:
+            continue
+        columns = [c for c in (COL_VILLE, COL_COMMUNE, name_col) if c in df.columns]
+        rows = df[df[image_col].notna()]
+        for image, group in rows.groupby(rows[image_col].astype(str).str.strip(), sort=False)[columns]:
+            link = []
+            for column in (COL_VILLE, COL_COMMUNE, name_col):
+                values = group[column].dropna().unique() if column in group else []
+                link.append(str(values[0]) if len(values) == 1 else None)
+            ville, commune, nom = link
+            links[(image_type, image)] = (ville, commune if ville else None,
+                                          nom if commune else None)
+    return links
+
+
+def rebuild(index, upload_dir, excel_path=None):
+    """Reconstruit l'index depuis le disque (hachage et lecture des dimensions
+    seulement pour les fichiers modifiés)
+
+    Retourne {'images', 'supprimees', 'duree_s'}.
+    """
+    from data_cache import file_sha256, read_excel_cached
+    from data_index import normalize_columns
+    upload_dir = Path(upload_dir)
+    known = index.all_signatures()
+
+    rows, seen = [], set()
+    start = time.perf_counter()
+    for image_type in IMAGE_TYPES:
+        type_dir = upload_dir / image_type
+        if not type_dir.is_dir():
+            continue
+        for path in sorted(type_dir.iterdir()):
+            if path.name.startswith('.') or path.suffix.lower() not in IMAGE_EXTENSIONS:
+                continue
+            chemin = f'{image_type}/{path.name}'
+            stat = path.stat()
+            signature = known.get(chemin)
+            if signature and signature[:2] == (stat.st_size, stat.st_mtime_ns) \
+                    and signature[3] is not None:
+                # Fichier inchangé : ni relu ni haché
+                sha256, largeur, hauteur = signature[2:]
+            else:
+                sha256 = file_sha256(path)
+                largeur, hauteur = image_size(path)
+            rows.append({
+                'chemin': chemin, 'type': image_type, 'nom': path.name,
+                'ville': None, 'commune': None, 'troncon': None,
+                'taille': stat.st_size, 'largeur': largeur, 'hauteur': hauteur,
+                'sha256': sha256, 'mtime_ns': stat.st_mtime_ns,
+            })
+            seen.add(chemin)
+
+    index.upsert(rows)
+    removed = set(known) - seen
+    index.remove_missing(removed)
+    if excel_path and Path(excel_path).exists():
+        index.link_workbook(normalize_columns(read_excel_cached(str(excel_path))))
+    summary = {'images': len(rows), 'supprimees': len(removed),
+               'duree_s': round(time.perf_counter() - start, 2)}
+    logger.info(f"🗂️  Index reconstruit: {summary['images']} images, {summary['supprimees']} "
+                f"supprimées en {summary['duree_s']:.1f}s → {index.db_path}")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index SQLite des images uploadées")
+    parser.add_argument('command', choices=['rebuild', 'stats'])
+    parser.add_argument('--uploads', default=str(BASE_DIR / 'data' / 'uploads'))
+    parser.add_argument('--excel', default=str(BASE_DIR / 'data' / 'indicateurs_urbains.xlsx'))
+    parser.add_argument('--db', default=str(DEFAULT_DB_PATH))
+    args = parser.parse_args()
+
+    index = UploadIndex(args.db)
+    if args.command == 'rebuild':
+        summary = rebuild(index, args.uploads, args.excel)
+        print(f"🗂️  Index reconstruit: {summary['images']} images, {summary['supprimees']} "
+              f"supprimées en {summary['duree_s']:.1f}s → {index.db_path}")
+    else:
+        print(json.dumps(index.stats(), ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
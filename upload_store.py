@@ -0,0 +1,231 @@
+# upload_store.py
+"""
+Réception des images uploadées en flux, avec déduplication par contenu.
+
+Chaque fichier de la requête est écrit par blocs dans un fichier temporaire
+(sur le même disque que data/uploads) et haché au fil de l'écriture : rien
+n'est gardé en mémoire. Le contenu est ensuite rangé une seule fois dans
+data/uploads/.blobs sous son SHA-256, puis publié sous son nom par un lien
+physique et un rename atomique. Un contenu déjà connu n'est pas réécrit, et
+un fichier identique au contenu déjà publié sous le même nom est laissé tel
+quel. Le blob d'un contenu remplacé qui n'est plus publié sous aucun nom est
+supprimé.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+
+from flask import Request, current_app
+
+BLOBS_DIR = '.blobs'
+TMP_DIR = '.tmp'
+CHUNK_SIZE = 1024 * 1024
+
+# Droits des fichiers publiés, comme un open() ordinaire (0644 sous umask 022) :
+# NamedTemporaryFile crée en 0600, illisible pour un serveur statique
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+FILE_MODE = 0o666 & ~_UMASK
+
+
+class FileTooLargeError(ValueError):
+    """Fichier uploadé au-delà de la taille maximale par fichier"""
+
+
+def format_size(size):
+    """Taille lisible : '16 Mo', '512 Ko', '100 octets'"""
+    for unit, factor in (('Mo', 2**20), ('Ko', 2**10)):
+        if size >= factor:
+            return f'{size / factor:.4g} {unit}'
+    return f'{size} octets'
+
+
+def _file_sha256(path):
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+class HashingTempFile:
+    """Fichier temporaire qui calcule le SHA-256 de ce qu'on y écrit"""
+
+    def __init__(self, tmp_dir, max_size=None):
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        self._file = tempfile.NamedTemporaryFile(dir=tmp_dir, prefix='upload-', delete=False)
+        self.path = Path(self._file.name)
+        self.max_size = max_size
+        self.size = 0
+        self.too_large = False
+        self._digest = hashlib.sha256()
+
+    def write(self, data):
+        self.size += len(data)
+        if self.max_size is not None and self.size > self.max_size:
+            # Pas d'exception pendant l'analyse du formulaire : la suite du
+            # fichier est ignorée et save() le refuse, sans toucher aux
+            # autres fichiers de la requête
+            self.too_large = True
+        if self.too_large:
+            return len(data)
+        self._digest.update(data)
+        return self._file.write(data)
+
+    def hexdigest(self):
+        return self._digest.hexdigest()
+
+    def discard(self):
+        """Ferme et supprime le fichier temporaire s'il n'a pas été rangé"""
+        self._file.close()
+        self.path.unlink(missing_ok=True)
+
+    def __getattr__(self, name):
+        # seek, read, flush, close... : délégués au fichier temporaire
+        return getattr(self._file, name)
+
+
+class UploadStore:
+    def __init__(self, upload_dir, max_file_size=None):
+        self.upload_dir = Path(upload_dir)
+        self.max_file_size = max_file_size
+
+    def temp_file(self):
+        """Fichier temporaire de réception, sur le même disque que les uploads"""
+        return HashingTempFile(self.upload_dir / TMP_DIR, self.max_file_size)
+
+    def save(self, file, image_type, filename):
+        """Range un fichier reçu (FileStorage) et le publie sous image_type/filename"""
+        stream = file.stream
+        if not isinstance(stream, HashingTempFile):
+            # Fichier reçu hors du flux de StreamingUploadRequest : copie par blocs
+            stream = self.temp_file()
+            try:
+                shutil.copyfileobj(file.stream, stream, CHUNK_SIZE)
+            except Exception:
+                stream.discard()
+                raise
+        if stream.too_large:
+            stream.discard()
+            raise FileTooLargeError(f'Fichier supérieur à {format_size(self.max_file_size)}')
+
+        digest = stream.hexdigest()
+        size = stream.size
+        stream.close()
+
+        blob = self.blob_path(digest)
+        duplicate = blob.exists()
+        if duplicate:
+            stream.discard()
+            # Blob rangé en 0600 par une version précédente
+            if blob.stat().st_mode & 0o777 != FILE_MODE:
+                os.chmod(blob, FILE_MODE)
+        else:
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            os.chmod(stream.path, FILE_MODE)
+            os.replace(stream.path, blob)
+
+        target = self.upload_dir / image_type / filename
+        unchanged = self._same_content(blob, target, digest, size)
+        if not unchanged:
+            replaced = self._private_blob(target)
+            self._publish(blob, target)
+            if replaced is not None:
+                self._remove_orphan(*replaced)
+
+        return {
+            'filename': filename,
+            'sha256': digest,
+            'taille': size,
+            'doublon': duplicate,
+            'inchange': unchanged,
+        }
+
+    def blob_path(self, digest):
+        return self.upload_dir / BLOBS_DIR / digest[:2] / digest
+
+    def _private_blob(self, target):
+        """(blob, inode) du contenu publié sous target s'il n'est publié sous aucun autre nom"""
+        try:
+            stat = target.stat()
+        except OSError:
+            return None
+        # Deux liens : le nom et son blob ; au-delà, le contenu reste publié ailleurs,
+        # en deçà, fichier copié ou publié avant la déduplication
+        if stat.st_nlink != 2:
+            return None
+        blob = self.blob_path(_file_sha256(target))
+        try:
+            if blob.stat().st_ino != stat.st_ino:
+                return None
+        except OSError:
+            return None
+        return blob, stat.st_ino
+
+    def _remove_orphan(self, blob, inode):
+        """Supprime le blob d'un contenu remplacé s'il n'est plus publié"""
+        try:
+            stat = blob.stat()
+            # Republié entre-temps (lien supplémentaire) ou remplacé par un autre fichier
+            if stat.st_ino == inode and stat.st_nlink == 1:
+                blob.unlink()
+        except OSError:
+            pass
+
+    def _same_content(self, blob, target, digest, size):
+        """Le fichier publié a-t-il déjà ce contenu ?"""
+        try:
+            if os.path.samefile(blob, target):
+                return True
+            if target.stat().st_size != size:
+                return False
+        except OSError:
+            return False
+
+        # Fichier publié avant la déduplication : comparaison par hachage
+        return _file_sha256(target) == digest
+
+    def _publish(self, blob, target):
+        """Publie le contenu sous son nom : lien physique (ou copie) puis rename atomique"""
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(f'.{target.name}.tmp-{os.getpid()}-{threading.get_ident()}')
+        try:
+            try:
+                os.link(blob, tmp_path)
+            except OSError:
+                # Système de fichiers sans liens physiques
+                shutil.copyfile(blob, tmp_path)
+            os.replace(tmp_path, target)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+
+class StreamingUploadRequest(Request):
+    """Requête Flask dont les fichiers uploadés sont écrits et hachés au fil de l'eau"""
+
+    # Endpoints dont les fichiers passent par l'UploadStore de l'application
+    streaming_endpoints = {'upload_image'}
+
+    @property
+    def max_content_length(self):
+        # Un lot de photos dépasse la limite globale ; chaque fichier reste limité
+        if self.endpoint in self.streaming_endpoints:
+            return current_app.config['UPLOAD_MAX_REQUEST_SIZE']
+        return super().max_content_length
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if self.endpoint not in self.streaming_endpoints:
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+        stream = current_app.extensions['upload_store'].temp_file()
+        self.__dict__.setdefault('_upload_streams', []).append(stream)
+        return stream
+
+    def close(self):
+        super().close()
+        # Fichiers temporaires d'une requête interrompue ou refusée
+        for stream in self.__dict__.get('_upload_streams', []):
+            stream.discard()